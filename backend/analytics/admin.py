@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from core.pagination import EstimatedCountPaginator
+from .models import Rollup
+
+
+@admin.register(Rollup)
+class RollupAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for analytics rollups (rebuild with manage.py backfill_rollups)
+    """
+    list_display = ('user', 'granularity', 'bucket', 'metric', 'value')
+    list_filter = ('granularity', 'metric')
+    list_select_related = ('user',)
+    ordering = ('-bucket',)
+    search_fields = ('^user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import BACKFILL_CHUNK_SIZE, backfill
+
+
+class Command(BaseCommand):
+    help = "Rebuild analytics rollups from post and check-in history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only this user id (repeatable)")
+        parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SIZE, help="Users per transaction")
+
+    def handle(self, *args, **options):
+        rebuilt = backfill(user_ids=options['users'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups of {rebuilt} user(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import compact
+
+
+class Command(BaseCommand):
+    help = "Drop expired daily rollups and fold expired weekly rollups into months (run nightly)"
+
+    def handle(self, *args, **options):
+        days, weeks = compact()
+        self.stdout.write(self.style.SUCCESS(f"Dropped {days} daily and folded {weeks} weekly rollup(s)."))
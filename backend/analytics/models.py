@@ -0,0 +1,45 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Rollup(models.Model):
+    """
+    One metric of one user summed over a day, week or month, see analytics.rollups.
+
+    Rows are keyed by metric name ('posts_generated', 'tone:casual', ...)
+    so new metrics need no schema change. Counter rows are upserted on
+    every recorded event, so like core.UsageRollup this skips BaseModel's
+    audit fields.
+    """
+    GRANULARITY_DAY = 'day'
+    GRANULARITY_WEEK = 'week'
+    GRANULARITY_MONTH = 'month'
+    GRANULARITY_CHOICES = [
+        (GRANULARITY_DAY, 'Day'),
+        (GRANULARITY_WEEK, 'Week'),
+        (GRANULARITY_MONTH, 'Month'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rollups')
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket = models.DateField(help_text="First day of the period (weeks start on Monday)")
+    metric = models.CharField(max_length=50)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Rollup"
+        verbose_name_plural = "Rollups"
+        constraints = [
+            # Also serves dashboard reads: one user's buckets of one granularity in date order
+            models.UniqueConstraint(
+                fields=['user', 'granularity', 'bucket', 'metric'],
+                name='rollup_user_bucket_metric_uniq',
+            ),
+        ]
+        indexes = [
+            # Compaction scans old buckets across all users
+            models.Index(fields=['granularity', 'bucket'], name='rollup_granularity_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} of user {self.user_id} for {self.granularity} {self.bucket}: {self.value}"
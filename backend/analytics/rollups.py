@@ -0,0 +1,305 @@
+"""
+Per-user activity rollups for the analytics dashboard.
+
+Write paths report events with record() (a post generated, published or
+suggested, a challenge check-in). Once the writing transaction commits,
+each event is added to the user's day and week Rollup rows with one
+INSERT ... ON CONFLICT DO UPDATE per granularity, so the dashboard reads a
+few weekly rows instead of aggregating posts and check-ins.
+
+Consistency is tracked as active days: the first activity event of a day
+(detected from the RETURNING value of that day's 'events' counter, so
+concurrent writers can't both count it) adds 1 to the day's and week's
+'active_days'.
+
+compact() keeps rollups small over time: day rows older than
+ANALYTICS_DAILY_RETENTION_DAYS are dropped (their weeks already hold the
+totals) and week rows older than ANALYTICS_WEEKLY_RETENTION_DAYS are folded
+into month rows, each week counted in the month its Monday falls in.
+
+Rollups count events as they happened; deleting a post or check-in later
+doesn't rewrite history. backfill() rebuilds everything from the source
+tables, including soft-deleted rows, after schema or metric changes.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from core import metrics
+from core.db import upsert_increment
+from .models import Rollup
+
+logger = logging.getLogger(__name__)
+
+DAY = Rollup.GRANULARITY_DAY
+WEEK = Rollup.GRANULARITY_WEEK
+MONTH = Rollup.GRANULARITY_MONTH
+
+# Events that make a day count as active
+ACTIVITY_METRICS = frozenset(['posts_generated', 'posts_published', 'check_ins'])
+
+# Users rebuilt per transaction by backfill()
+BACKFILL_CHUNK_SIZE = 500
+
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _as_date(value):
+    # Raw cursors on SQLite return dates as text
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def record(user_id, metric, value=1, day=None):
+    """
+    Count an event for the user on `day` (today by default) once the current transaction commits
+    """
+    record_many([(user_id, metric, value, day)])
+
+
+def record_many(events):
+    """
+    Count several (user_id, metric, value, day) events at once
+    """
+    today = timezone.localdate()
+    totals = defaultdict(int)
+    for user_id, metric, value, day in events:
+        totals[(user_id, day or today, metric)] += value
+    if totals:
+        transaction.on_commit(lambda: _apply(totals))
+
+
+def _apply(totals):
+    try:
+        with transaction.atomic():
+            _write(totals)
+    except Exception:
+        # Analytics must never fail a write path; backfill() repairs gaps
+        logger.exception(f"Failed to record {len(totals)} rollup event(s)")
+        metrics.increment('analytics_rollup_writes_total', result='failed')
+        return
+    metrics.increment('analytics_rollup_writes_total', result='succeeded')
+
+
+def _rows(totals):
+    rows = defaultdict(int)
+    for (user_id, day, metric), value in totals.items():
+        rows[(user_id, DAY, day, metric)] += value
+        rows[(user_id, WEEK, week_start(day), metric)] += value
+    return [
+        {'user_id': user_id, 'granularity': granularity, 'bucket': bucket, 'metric': metric, 'value': value}
+        for (user_id, granularity, bucket, metric), value in rows.items()
+    ]
+
+
+def _write(totals):
+    conflict = ('user_id', 'granularity', 'bucket', 'metric')
+    upsert_increment(Rollup, _rows(totals), conflict, ('value',))
+
+    activity = defaultdict(int)
+    for (user_id, day, metric), value in totals.items():
+        if metric in ACTIVITY_METRICS:
+            activity[(user_id, day)] += value
+    if not activity:
+        return
+
+    returned = upsert_increment(
+        Rollup,
+        [
+            {'user_id': user_id, 'granularity': DAY, 'bucket': day, 'metric': 'events', 'value': value}
+            for (user_id, day), value in activity.items()
+        ],
+        conflict,
+        ('value',),
+        returning=('user_id', 'bucket', 'value'),
+    )
+    # The counter equals what was just added only for the day's first events
+    first = {
+        (user_id, _as_date(day), 'active_days'): 1
+        for user_id, day, value in returned
+        if value == activity[(user_id, _as_date(day))]
+    }
+    upsert_increment(Rollup, _rows(first), conflict, ('value',))
+
+
+def compact(today=None):
+    """
+    Drop expired day rows and fold expired week rows into months; return (days dropped, weeks folded)
+    """
+    today = today or timezone.localdate()
+    day_cutoff = today - datetime.timedelta(days=settings.ANALYTICS_DAILY_RETENTION_DAYS)
+    week_cutoff = week_start(today - datetime.timedelta(days=settings.ANALYTICS_WEEKLY_RETENTION_DAYS))
+
+    with transaction.atomic():
+        days, _details = Rollup.objects.filter(granularity=DAY, bucket__lt=day_cutoff).delete()
+
+        old_weeks = Rollup.objects.filter(granularity=WEEK, bucket__lt=week_cutoff)
+        months = (
+            old_weeks.annotate(month=TruncMonth('bucket'))
+            .values('user_id', 'month', 'metric')
+            .annotate(total=Sum('value'))
+            .order_by()
+        )
+        upsert_increment(
+            Rollup,
+            [
+                {'user_id': row['user_id'], 'granularity': MONTH, 'bucket': row['month'], 'metric': row['metric'],
+                 'value': row['total']}
+                for row in months
+            ],
+            ('user_id', 'granularity', 'bucket', 'metric'),
+            ('value',),
+        )
+        weeks, _details = old_weeks.delete()
+
+    metrics.increment('analytics_rollups_compacted_total', days, granularity=DAY)
+    metrics.increment('analytics_rollups_compacted_total', weeks, granularity=WEEK)
+    logger.info(f"Rollup compaction dropped {days} day row(s) and folded {weeks} week row(s) into months")
+    return days, weeks
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _history(user_ids):
+    """
+    Yield (user_id, day, metric, value) for the users' posts and check-ins, aggregated in the database
+    """
+    from challenges.models import CheckIn
+    from posts.models import Post
+
+    posts = Post.objects.filter(user_id__in=user_ids)
+    generated = (
+        posts.annotate(day=TruncDate('created_at'))
+        .values_list('user_id', 'day', 'status', 'tone')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for user_id, day, status, tone, count in generated:
+        if status == 'suggested':
+            yield user_id, day, 'posts_suggested', count
+        else:
+            yield user_id, day, 'posts_generated', count
+            yield user_id, day, f'tone:{tone}', count
+
+    # Posts published before published_at was set on every publish fall back to their last update
+    published = (
+        posts.filter(Q(published_at__isnull=False) | Q(status='published'))
+        .annotate(day=TruncDate(Coalesce('published_at', 'updated_at')))
+        .values_list('user_id', 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for user_id, day, count in published:
+        yield user_id, day, 'posts_published', count
+
+    check_ins = (
+        CheckIn.objects.filter(user_id__in=user_ids)
+        .values_list('user_id', 'date')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for user_id, day, count in check_ins:
+        yield user_id, day, 'check_ins', count
+
+
+def backfill(user_ids=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Rebuild all rollups of the given users (everyone by default) from history, then compact.
+
+    Returns the number of users rebuilt.
+    """
+    from challenges.models import CheckIn
+    from posts.models import Post
+
+    if user_ids is None:
+        user_ids = sorted(
+            set(Post.objects.values_list('user_id', flat=True).distinct())
+            | set(CheckIn.objects.values_list('user_id', flat=True).distinct())
+            | set(Rollup.objects.values_list('user_id', flat=True).distinct())
+        )
+
+    rebuilt = 0
+    for chunk in _chunks(user_ids, chunk_size):
+        totals = defaultdict(int)
+        activity = defaultdict(int)
+        for user_id, day, metric, value in _history(chunk):
+            totals[(user_id, day, metric)] += value
+            if metric in ACTIVITY_METRICS:
+                activity[(user_id, day)] += value
+        for (user_id, day), value in activity.items():
+            totals[(user_id, day, 'events')] += value
+            totals[(user_id, day, 'active_days')] = 1
+
+        rows = [row for row in _rows(totals) if not (row['granularity'] == WEEK and row['metric'] == 'events')]
+        with transaction.atomic():
+            Rollup.objects.filter(user_id__in=chunk).delete()
+            Rollup.objects.bulk_create([Rollup(**row) for row in rows], batch_size=1000)
+        rebuilt += len(chunk)
+        logger.info(f"Rebuilt rollups of {rebuilt}/{len(user_ids)} user(s)")
+
+    compact()
+    return rebuilt
+
+
+def dashboard(user, weeks):
+    """
+    Weekly activity, tone usage and consistency over the user's last `weeks` weeks
+    """
+    today = timezone.localdate()
+    first_week = week_start(today) - datetime.timedelta(weeks=weeks - 1)
+    values = defaultdict(dict)
+    rows = Rollup.objects.filter(user=user, granularity=WEEK, bucket__gte=first_week).values_list(
+        'bucket', 'metric', 'value'
+    )
+    for bucket, metric, value in rows:
+        values[bucket][metric] = value
+
+    series = []
+    tones = defaultdict(int)
+    totals = defaultdict(int)
+    elapsed_days = 0
+    for index in range(weeks):
+        start = first_week + datetime.timedelta(weeks=index)
+        week = values.get(start, {})
+        # The current week only counts the days so far
+        days = min(7, (today - start).days + 1)
+        elapsed_days += days
+        for metric, value in week.items():
+            if metric.startswith('tone:'):
+                tones[metric[len('tone:'):]] += value
+            else:
+                totals[metric] += value
+        series.append({
+            'week_start': start,
+            'posts_generated': week.get('posts_generated', 0),
+            'posts_published': week.get('posts_published', 0),
+            'posts_suggested': week.get('posts_suggested', 0),
+            'check_ins': week.get('check_ins', 0),
+            'active_days': week.get('active_days', 0),
+            'consistency_rate': round(week.get('active_days', 0) / days, 3),
+        })
+
+    return {
+        'weeks': series,
+        'tones': dict(sorted(tones.items(), key=lambda item: -item[1])),
+        'totals': {
+            'posts_generated': totals['posts_generated'],
+            'posts_published': totals['posts_published'],
+            'posts_suggested': totals['posts_suggested'],
+            'check_ins': totals['check_ins'],
+            'active_days': totals['active_days'],
+        },
+        'consistency_rate': round(totals['active_days'] / elapsed_days, 3) if elapsed_days else 0.0,
+    }
@@ -0,0 +1,112 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from challenges.models import Challenge
+from challenges.streaks import record_check_in
+from posts.models import Post
+from .models import Rollup
+from .rollups import DAY, MONTH, WEEK, backfill, compact, record
+
+MONDAY = datetime.date(2026, 3, 2)
+
+
+def at(day, hour=12):
+    return datetime.datetime.combine(day, datetime.time(hour), tzinfo=datetime.timezone.utc)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+
+    def values(self, granularity):
+        rows = Rollup.objects.filter(user=self.user, granularity=granularity)
+        return {(row.bucket, row.metric): row.value for row in rows}
+
+    def test_events_are_written_on_commit_to_day_and_week(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record(self.user.pk, 'posts_generated', day=MONDAY)
+            record(self.user.pk, 'check_ins', day=MONDAY)
+            record(self.user.pk, 'posts_generated', day=MONDAY + datetime.timedelta(days=2))
+        self.assertFalse(Rollup.objects.exists())
+
+        for callback in callbacks:
+            callback()
+
+        days = self.values(DAY)
+        self.assertEqual(days[(MONDAY, 'posts_generated')], 1)
+        self.assertEqual(days[(MONDAY, 'events')], 2)
+        # Two events on Monday, but one active day
+        self.assertEqual(days[(MONDAY, 'active_days')], 1)
+        weeks = self.values(WEEK)
+        self.assertEqual(weeks[(MONDAY, 'posts_generated')], 2)
+        self.assertEqual(weeks[(MONDAY, 'active_days')], 2)
+
+    def test_rolled_back_events_are_not_written(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    record(self.user.pk, 'posts_generated', day=MONDAY)
+                    raise RuntimeError()
+            except RuntimeError:
+                pass
+        self.assertFalse(Rollup.objects.exists())
+
+    @override_settings(ANALYTICS_DAILY_RETENTION_DAYS=30, ANALYTICS_WEEKLY_RETENTION_DAYS=60)
+    def test_compact_drops_old_days_and_folds_old_weeks_into_months(self):
+        today = datetime.date(2026, 6, 1)
+        march_weeks = [datetime.date(2026, 3, 2), datetime.date(2026, 3, 9), datetime.date(2026, 3, 23)]
+        for bucket in march_weeks:
+            Rollup.objects.create(user=self.user, granularity=WEEK, bucket=bucket, metric='posts_generated', value=2)
+        Rollup.objects.create(user=self.user, granularity=DAY, bucket=MONDAY, metric='posts_generated', value=2)
+        recent = Rollup.objects.create(
+            user=self.user, granularity=WEEK, bucket=datetime.date(2026, 5, 25), metric='posts_generated', value=1
+        )
+
+        self.assertEqual(compact(today=today), (1, 3))
+
+        self.assertEqual(self.values(DAY), {})
+        # Each week counts in the month its Monday falls in
+        self.assertEqual(self.values(MONTH), {(datetime.date(2026, 3, 1), 'posts_generated'): 6})
+        self.assertEqual(list(Rollup.objects.filter(granularity=WEEK)), [recent])
+
+    def test_backfill_rebuilds_from_history(self):
+        challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+        record_check_in(self.user, challenge, MONDAY)
+        generated = Post.objects.create(user=self.user, input_text="Note", content="Post", tone='casual')
+        published = Post.objects.create(user=self.user, input_text="Note", content="Post", tone='technical')
+        Post.objects.filter(pk=generated.pk).update(created_at=at(MONDAY))
+        # Published on Tuesday, edited again on Thursday
+        Post.objects.filter(pk=published.pk).update(
+            created_at=at(MONDAY),
+            status='published',
+            published_at=at(MONDAY + datetime.timedelta(days=1)),
+            updated_at=at(MONDAY + datetime.timedelta(days=3)),
+        )
+        Rollup.objects.create(user=self.user, granularity=DAY, bucket=MONDAY, metric='stale', value=9)
+
+        with override_settings(ANALYTICS_DAILY_RETENTION_DAYS=3650):
+            self.assertEqual(backfill(), 1)
+
+        days = self.values(DAY)
+        self.assertNotIn((MONDAY, 'stale'), days)
+        self.assertEqual(days[(MONDAY, 'posts_generated')], 2)
+        self.assertEqual(days[(MONDAY, 'tone:technical')], 1)
+        self.assertEqual(days[(MONDAY, 'check_ins')], 1)
+        self.assertEqual(days[(MONDAY + datetime.timedelta(days=1), 'posts_published')], 1)
+        self.assertNotIn((MONDAY + datetime.timedelta(days=3), 'posts_published'), days)
+        self.assertEqual(self.values(WEEK)[(MONDAY, 'active_days')], 2)
+
+    def test_publishing_by_hand_sets_published_at(self):
+        post = Post.objects.create(user=self.user, input_text="Note", content="Post")
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.put(f'/api/v1/posts/{post.pk}/', {'status': 'published'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        post.refresh_from_db()
+        self.assertIsNotNone(post.published_at)
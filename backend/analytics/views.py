@@ -0,0 +1,29 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .rollups import dashboard as build_dashboard
+
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 52
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard(request):
+    """
+    The current user's weekly activity, tone usage and consistency (?weeks=1-52, default 12)
+    """
+    try:
+        weeks = int(request.query_params.get('weeks', DEFAULT_WEEKS))
+    except ValueError:
+        weeks = 0
+    if not 1 <= weeks <= MAX_WEEKS:
+        return Response({
+            'error': 'Invalid parameters',
+            'details': {'weeks': [f'Must be between 1 and {MAX_WEEKS}.']}
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'dashboard': build_dashboard(request.user, weeks),
+    }, status=status.HTTP_200_OK)
@@ -1,3 +1,129 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.core import mail
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import IdempotencyKey
+
+REGISTRATION = {
+    'email': 'ada@example.com',
+    'username': 'ada',
+    'first_name': 'Ada',
+    'last_name': 'Lovelace',
+    'password': 'analytical-engine-1843',
+    'password_confirm': 'analytical-engine-1843',
+}
+
+
+class IdempotentRegistrationTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+
+    def register(self, body, key='signup-1'):
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.api.post('/api/v1/auth/register/', body, content_type='application/json', **headers)
+
+    def test_replay_returns_the_same_user_with_fresh_tokens(self):
+        first = self.register(json.dumps(REGISTRATION))
+        self.assertEqual(first.status_code, 201)
+
+        # Same data, other key order and whitespace
+        second = self.register(json.dumps(dict(reversed(list(REGISTRATION.items()))), indent=2))
+
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.data['user'], first.data['user'])
+        self.assertEqual(set(second.data['tokens']), {'refresh', 'access'})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_tokens_are_not_stored(self):
+        response = self.register(json.dumps(REGISTRATION))
+
+        record = IdempotencyKey.objects.get()
+        self.assertNotIn('tokens', record.response_data)
+        stored = json.dumps(record.response_data)
+        self.assertNotIn(response.data['tokens']['access'], stored)
+        self.assertNotIn(response.data['tokens']['refresh'], stored)
+
+    def test_key_reused_with_different_data_is_rejected(self):
+        self.register(json.dumps(REGISTRATION))
+
+        response = self.register(json.dumps({**REGISTRATION, 'username': 'ada2', 'email': 'ada2@example.com'}))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_validation_errors_replay_as_stored(self):
+        body = json.dumps({**REGISTRATION, 'password_confirm': 'something-else-1843'})
+        self.assertEqual(self.register(body).status_code, 400)
+
+        response = self.register(body)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertNotIn('tokens', response.data)
+
+    def test_without_a_key_a_retry_registers_again(self):
+        self.assertEqual(self.register(json.dumps(REGISTRATION), key=None).status_code, 201)
+        self.assertEqual(self.register(json.dumps(REGISTRATION), key=None).status_code, 400)
+
+    def test_fingerprint_is_keyed_and_leaves_out_passwords(self):
+        self.register(json.dumps(REGISTRATION))
+        fingerprint = IdempotencyKey.objects.get().fingerprint
+        IdempotencyKey.objects.all().delete()
+        User.objects.all().delete()
+
+        other_password = {**REGISTRATION, 'password': 'difference-engine-1822', 'password_confirm': 'difference-engine-1822'}
+        self.register(json.dumps(other_password))
+        self.assertEqual(IdempotencyKey.objects.get().fingerprint, fingerprint)
+        IdempotencyKey.objects.all().delete()
+        User.objects.all().delete()
+
+        with override_settings(SECRET_KEY='another-secret-key-for-this-test-only'):
+            self.register(json.dumps(REGISTRATION))
+        self.assertNotEqual(IdempotencyKey.objects.get().fingerprint, fingerprint)
+
+    def test_replay_with_another_password_gets_no_tokens(self):
+        self.register(json.dumps(REGISTRATION))
+        other_password = {**REGISTRATION, 'password': 'difference-engine-1822', 'password_confirm': 'difference-engine-1822'}
+
+        response = self.register(json.dumps(other_password))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertNotIn('tokens', response.data)
+
+    def test_registration_sends_no_email(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.register(json.dumps(REGISTRATION))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mail.outbox, [])
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        self.api = APIClient()
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'analytical-engine-1843')
+
+    def test_login_signs_in_the_session_and_sends_the_signal(self):
+        received = []
+
+        def receiver(sender, user, **kwargs):
+            received.append(user.pk)
+
+        user_logged_in.connect(receiver)
+        self.addCleanup(user_logged_in.disconnect, receiver)
+
+        response = self.api.post(
+            '/api/v1/auth/login/', {'username_or_email': 'ada', 'password': 'analytical-engine-1843'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(received, [self.user.pk])
+        self.assertEqual(self.api.session['_auth_user_id'], str(self.user.pk))
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
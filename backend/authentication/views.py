@@ -7,6 +7,9 @@ from django.contrib.auth.models import User
 from django.contrib.auth import login
 import logging
 
+from core.events import ProfileUpdated, UserLoggedIn, UserRegistered, publish
+from core.idempotency import idempotent
+
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -17,25 +20,56 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+def _token_pair(user):
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+def _without_tokens(data):
+    """
+    What an idempotent registration stores: never the JWTs themselves
+    """
+    return {name: value for name, value in data.items() if name != 'tokens'}
+
+
+def _with_fresh_tokens(data, request):
+    """
+    Rebuild a replayed registration response with newly issued tokens.
+
+    Passwords aren't part of the idempotency fingerprint, so the repeat
+    must carry the password the account was created with.
+    """
+    if 'user' not in data:
+        return data
+    user = User.objects.filter(pk=data['user']['id'], is_active=True).first()
+    if user is None or not user.check_password(request.data.get('password') or ''):
+        return _without_tokens(data)
+    return {**data, 'tokens': _token_pair(user)}
+
+
 class RegisterView(APIView):
     """
     User registration endpoint
     """
     permission_classes = [permissions.AllowAny]
 
+    @idempotent(store=_without_tokens, replay=_with_fresh_tokens)
     def post(self, request):
         """
         Register a new user
+
+        Send an Idempotency-Key header to make retries safe. A replayed
+        registration gets freshly issued tokens; they're never stored.
         """
         try:
             serializer = UserRegistrationSerializer(data=request.data)
 
             if serializer.is_valid():
                 user = serializer.save()
-
-                # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
-                access_token = refresh.access_token
+                publish(UserRegistered(user_id=user.pk))
 
                 # Log successful registration
                 logger.info(f"New user registered: {user.username} ({user.email})")
@@ -49,10 +83,7 @@ class RegisterView(APIView):
                         'first_name': user.first_name,
                         'last_name': user.last_name,
                     },
-                    'tokens': {
-                        'refresh': str(refresh),
-                        'access': str(access_token),
-                    }
+                    'tokens': _token_pair(user),
                 }, status=status.HTTP_201_CREATED)
 
             return Response({
@@ -89,6 +120,7 @@ class LoginView(APIView):
 
                 # Update last login
                 login(request, user)
+                publish(UserLoggedIn(user_id=user.pk))
 
                 # Log successful login
                 logger.info(f"User logged in: {user.username}")
@@ -189,6 +221,7 @@ class UserProfileView(APIView):
 
             if serializer.is_valid():
                 user = serializer.save()
+                publish(ProfileUpdated(user_id=user.pk, changed_fields=tuple(sorted(serializer.validated_data))))
 
                 logger.info(f"Profile updated: {user.username}")
 
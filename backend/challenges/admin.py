@@ -0,0 +1,62 @@
+from django.contrib import admin
+
+from core.pagination import EstimatedCountPaginator
+from .models import Challenge, ChallengeStreak, CheckIn
+
+
+@admin.register(Challenge)
+class ChallengeAdmin(admin.ModelAdmin):
+    """
+    Admin for challenges
+    """
+    list_display = ('name', 'slug', 'hashtag', 'duration_days', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'hashtag')
+    prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ('created_at', 'updated_at', 'created_by', 'updated_by')
+
+
+@admin.register(CheckIn)
+class CheckInAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for check-ins; changes must go through the API so streaks stay in sync
+    """
+    list_display = ('id', 'user', 'challenge', 'date', 'is_deleted', 'created_at')
+    list_filter = ('challenge', 'is_deleted')
+    list_select_related = ('user', 'challenge')
+    ordering = ('-date', '-id')
+    search_fields = ('^user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ChallengeStreak)
+class ChallengeStreakAdmin(admin.ModelAdmin):
+    """
+    Read-only admin for materialized streaks (repair with manage.py rebuild_streaks)
+    """
+    list_display = ('user', 'challenge', 'day_number', 'current_streak', 'longest_streak', 'last_check_in')
+    list_filter = ('challenge',)
+    list_select_related = ('user', 'challenge')
+    ordering = ('-last_check_in',)
+    search_fields = ('^user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from challenges.streaks import REBUILD_CHUNK_SIZE, rebuild_streaks
+
+
+class Command(BaseCommand):
+    help = "Recompute challenge streak rows from check-in history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only this user id (repeatable)")
+        parser.add_argument('--challenge', type=int, action='append', dest='challenges',
+                            help="Only this challenge id (repeatable)")
+        parser.add_argument('--chunk-size', type=int, default=REBUILD_CHUNK_SIZE, help="Users per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Report out-of-date rows without fixing them")
+
+    def handle(self, *args, **options):
+        checked, repaired = rebuild_streaks(
+            user_ids=options['users'],
+            challenge_ids=options['challenges'],
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+        )
+        verb = "would be repaired" if options['dry_run'] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} streak row(s); {repaired} {verb}."))
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('posts', '0004_post_cache_tokens'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Challenge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('hashtag', models.CharField(help_text='Hashtag used in posts, e.g. #100DaysOfCode', max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('duration_days', models.PositiveIntegerField(blank=True, help_text='Leave empty for open-ended challenges', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Challenge',
+                'verbose_name_plural': 'Challenges',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChallengeStreak',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('day_number', models.PositiveIntegerField(default=0, help_text='Days checked in so far (day N of the challenge)')),
+                ('started_on', models.DateField(blank=True, help_text='Date of the first check-in', null=True)),
+                ('last_check_in', models.DateField(blank=True, null=True)),
+                ('joined_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='streaks', to='challenges.challenge')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='challenge_streaks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Challenge streak',
+                'verbose_name_plural': 'Challenge streaks',
+                'constraints': [models.UniqueConstraint(fields=('user', 'challenge'), name='challenge_streak_user_challenge_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated')),
+                ('is_deleted', models.BooleanField(default=False, help_text='Soft delete flag')),
+                ('deleted_at', models.DateTimeField(blank=True, help_text='Date and time when the record was deleted', null=True)),
+                ('date', models.DateField(help_text='Day the progress was made on')),
+                ('note', models.TextField(blank=True, max_length=2000)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_ins', to='challenges.challenge')),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(blank=True, help_text="Post written about this day's progress, if any", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='check_ins', to='posts.post')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_ins', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Check-in',
+                'verbose_name_plural': 'Check-ins',
+                'indexes': [models.Index(fields=['user', 'challenge', 'date'], name='check_in_user_date_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('user', 'challenge', 'date'), name='check_in_user_challenge_date_uniq')],
+            },
+        ),
+    ]
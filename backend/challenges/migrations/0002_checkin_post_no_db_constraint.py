@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0001_initial'),
+        ('posts', '0006_post_publishing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='checkin',
+            name='post',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text="Post written about this day's progress, if any", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='check_ins', to='posts.post'),
+        ),
+    ]
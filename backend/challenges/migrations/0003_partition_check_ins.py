@@ -0,0 +1,24 @@
+# Monthly partitions for check-in history on PostgreSQL, see core.partitioning
+
+from django.db import migrations
+
+from core.partitioning import partition_table, unpartition_table
+
+
+def forward(apps, schema_editor):
+    partition_table(schema_editor, 'challenges_checkin', 'date')
+
+
+def backward(apps, schema_editor):
+    unpartition_table(schema_editor, 'challenges_checkin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0002_checkin_post_no_db_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
@@ -0,0 +1,130 @@
+from django.db import models, transaction
+from django.contrib.auth.models import User
+from core.models import BaseModel, SoftDeleteModel
+
+
+class Challenge(BaseModel):
+    """
+    A public learning challenge such as #100DaysOfCode
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    hashtag = models.CharField(max_length=100, help_text="Hashtag used in posts, e.g. #100DaysOfCode")
+    description = models.TextField(blank=True)
+    duration_days = models.PositiveIntegerField(null=True, blank=True, help_text="Leave empty for open-ended challenges")
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Challenge"
+        verbose_name_plural = "Challenges"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class CheckIn(SoftDeleteModel):
+    """
+    One day of progress on a challenge.
+
+    Use challenges.streaks.record_check_in() to create check-ins; delete()
+    and restore() keep the user's ChallengeStreak row up to date themselves.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='check_ins')
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='check_ins')
+    date = models.DateField(help_text="Day the progress was made on")
+    note = models.TextField(max_length=2000, blank=True)
+    post = models.ForeignKey(
+        'posts.Post',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='check_ins',
+        # posts_post is partitioned on PostgreSQL, see core.partitioning
+        db_constraint=False,
+        help_text="Post written about this day's progress, if any"
+    )
+
+    # Note: audit and soft delete fields are inherited from SoftDeleteModel
+
+    class Meta:
+        verbose_name = "Check-in"
+        verbose_name_plural = "Check-ins"
+        constraints = [
+            # Soft-deleted check-ins don't block checking in on the same day again
+            models.UniqueConstraint(
+                fields=['user', 'challenge', 'date'],
+                condition=models.Q(is_deleted=False),
+                name='check_in_user_challenge_date_uniq',
+            ),
+        ]
+        indexes = [
+            # Check-in history per challenge, and streak rebuilds
+            models.Index(fields=['user', 'challenge', 'date'], name='check_in_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.challenge_id}: {self.date}"
+
+    def delete(self, user=None, *args, **kwargs):
+        from .streaks import check_in_removed
+
+        with transaction.atomic():
+            super().delete(user=user, *args, **kwargs)
+            check_in_removed(self)
+
+    def hard_delete(self, *args, **kwargs):
+        from .streaks import check_in_removed
+
+        with transaction.atomic():
+            super().hard_delete(*args, **kwargs)
+            if not self.is_deleted:
+                check_in_removed(self)
+
+    def restore(self, user=None):
+        from .streaks import check_in_added
+
+        with transaction.atomic():
+            super().restore(user=user)
+            check_in_added(self)
+
+
+class ChallengeStreak(models.Model):
+    """
+    Materialized progress of one user on one challenge.
+
+    Maintained by challenges.streaks in the same transaction as every
+    check-in change, so dashboards read one row instead of the history;
+    manage.py rebuild_streaks recomputes it from CheckIn. Like the core
+    counter tables it skips BaseModel's audit fields.
+
+    current_streak is the run of consecutive days ending at last_check_in;
+    use streak_as_of() for the streak as it stands today.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='challenge_streaks')
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='streaks')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    day_number = models.PositiveIntegerField(default=0, help_text="Days checked in so far (day N of the challenge)")
+    started_on = models.DateField(null=True, blank=True, help_text="Date of the first check-in")
+    last_check_in = models.DateField(null=True, blank=True)
+    joined_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Challenge streak"
+        verbose_name_plural = "Challenge streaks"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'challenge'], name='challenge_streak_user_challenge_uniq'),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} on {self.challenge_id}: day {self.day_number}"
+
+    def streak_as_of(self, today):
+        """
+        The current streak, or 0 if the user hasn't checked in today or yesterday
+        """
+        if self.last_check_in is None or (today - self.last_check_in).days > 1:
+            return 0
+        return self.current_streak
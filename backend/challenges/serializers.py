@@ -0,0 +1,69 @@
+from rest_framework import serializers
+from .models import Challenge, ChallengeStreak, CheckIn
+
+
+class ChallengeSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the list of challenges users can join
+    """
+    class Meta:
+        model = Challenge
+        fields = ['id', 'name', 'slug', 'hashtag', 'description', 'duration_days']
+        read_only_fields = fields
+
+
+class ChallengeStreakSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a user's progress on a challenge
+
+    Pass the user's local date as context['today']; without it the
+    streak's user and profile are read (select_related them).
+    """
+    challenge = ChallengeSerializer(read_only=True)
+    current_streak = serializers.SerializerMethodField()
+    completed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChallengeStreak
+        fields = [
+            'challenge',
+            'day_number',
+            'current_streak',
+            'longest_streak',
+            'started_on',
+            'last_check_in',
+            'completed',
+            'joined_at',
+        ]
+        read_only_fields = fields
+
+    def get_current_streak(self, streak):
+        today = self.context.get('today') or streak.user.profile.local_date()
+        return streak.streak_as_of(today)
+
+    def get_completed(self, streak):
+        duration = streak.challenge.duration_days
+        return bool(duration) and streak.day_number >= duration
+
+
+class CheckInSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a day's check-in on a challenge
+
+    Dates are days in the user's time zone; context['today'] is theirs.
+    """
+    class Meta:
+        model = CheckIn
+        fields = ['id', 'date', 'note', 'post', 'created_at']
+        read_only_fields = ['id', 'created_at']
+        extra_kwargs = {'date': {'required': False}}
+
+    def validate_date(self, value):
+        if value > self.context['today']:
+            raise serializers.ValidationError("Can't check in for a future day.")
+        return value
+
+    def validate_post(self, value):
+        if value is not None and value.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("Post not found.")
+        return value
@@ -0,0 +1,193 @@
+"""
+Incremental maintenance of ChallengeStreak rows.
+
+Every check-in change updates the (user, challenge) streak row in the same
+transaction, with the row locked so concurrent check-ins can't interleave.
+The common case, checking in for a day after the last one, is O(1): the
+streak either continues (the day after last_check_in) or restarts at 1.
+
+Backdated check-ins, deletions and restores can join or split runs of
+consecutive days anywhere in the history, and a deletion may shorten the
+longest run, so those recompute the row from that user's dates for the
+challenge; a single challenge's history is at most a few hundred rows.
+rebuild_streaks() does the same for many users at once to repair drift.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from analytics.rollups import record
+from core import metrics
+from .models import ChallengeStreak, CheckIn
+
+logger = logging.getLogger(__name__)
+
+# Users whose streaks are rebuilt per transaction
+REBUILD_CHUNK_SIZE = 500
+
+STREAK_FIELDS = ('current_streak', 'longest_streak', 'day_number', 'started_on', 'last_check_in')
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def compute_streak(dates):
+    """
+    Streak values for a user's check-in dates (sorted ascending, no duplicates)
+    """
+    if not dates:
+        return dict.fromkeys(STREAK_FIELDS, 0) | {'started_on': None, 'last_check_in': None}
+
+    current = longest = 1
+    for previous, date in zip(dates, dates[1:]):
+        current = current + 1 if date - previous == ONE_DAY else 1
+        longest = max(longest, current)
+    return {
+        'current_streak': current,
+        'longest_streak': longest,
+        'day_number': len(dates),
+        'started_on': dates[0],
+        'last_check_in': dates[-1],
+    }
+
+
+def _locked_streak(user_id, challenge_id):
+    streak, _created = ChallengeStreak.objects.select_for_update().get_or_create(
+        user_id=user_id,
+        challenge_id=challenge_id,
+    )
+    return streak
+
+
+def _active_dates(user_id, challenge_id):
+    return list(
+        CheckIn.active_objects.filter(user_id=user_id, challenge_id=challenge_id)
+        .order_by('date')
+        .values_list('date', flat=True)
+    )
+
+
+def _recompute(streak):
+    for name, value in compute_streak(_active_dates(streak.user_id, streak.challenge_id)).items():
+        setattr(streak, name, value)
+    metrics.increment('challenge_streak_recomputes_total')
+
+
+def check_in_added(check_in):
+    """
+    Account for a new or restored check-in; call inside its transaction
+    """
+    streak = _locked_streak(check_in.user_id, check_in.challenge_id)
+    date = check_in.date
+    if streak.last_check_in is None or date > streak.last_check_in:
+        if streak.last_check_in is not None and date - streak.last_check_in == ONE_DAY:
+            streak.current_streak += 1
+        else:
+            streak.current_streak = 1
+        streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+        streak.day_number += 1
+        streak.started_on = streak.started_on or date
+        streak.last_check_in = date
+    else:
+        # Backdated: may join two runs, so count again
+        _recompute(streak)
+    streak.save(update_fields=[*STREAK_FIELDS, 'updated_at'])
+    return streak
+
+
+def check_in_removed(check_in):
+    """
+    Account for a soft- or hard-deleted check-in; call inside its transaction
+    """
+    streak = _locked_streak(check_in.user_id, check_in.challenge_id)
+    _recompute(streak)
+    streak.save(update_fields=[*STREAK_FIELDS, 'updated_at'])
+    return streak
+
+
+def join_challenge(user, challenge):
+    """
+    Return the user's streak row for the challenge, creating it if needed
+    """
+    streak, _created = ChallengeStreak.objects.get_or_create(user=user, challenge=challenge)
+    return streak
+
+
+def record_check_in(user, challenge, date, note='', post=None):
+    """
+    Create a check-in and update the streak; return (check_in, streak)
+    """
+    with transaction.atomic():
+        check_in = CheckIn(user=user, challenge=challenge, date=date, note=note, post=post)
+        check_in.save(user=user)
+        streak = check_in_added(check_in)
+        record(user.pk, 'check_ins', day=date)
+    metrics.increment('challenge_check_ins_total')
+    return check_in, streak
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def rebuild_streaks(user_ids=None, challenge_ids=None, dry_run=False, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Recompute streak rows from check-in history.
+
+    Works through users in chunks: each chunk's streak rows are locked, its
+    dates read in one query, and rows that differ are written back in bulk.
+    Returns (rows checked, rows repaired).
+    """
+    check_ins = CheckIn.active_objects.all()
+    streaks = ChallengeStreak.objects.all()
+    if user_ids:
+        check_ins = check_ins.filter(user_id__in=user_ids)
+        streaks = streaks.filter(user_id__in=user_ids)
+    if challenge_ids:
+        check_ins = check_ins.filter(challenge_id__in=challenge_ids)
+        streaks = streaks.filter(challenge_id__in=challenge_ids)
+
+    users = sorted(
+        set(check_ins.values_list('user_id', flat=True).distinct())
+        | set(streaks.values_list('user_id', flat=True).distinct())
+    )
+
+    checked = repaired = 0
+    for chunk in _chunks(users, chunk_size):
+        with transaction.atomic():
+            existing = {
+                (row.user_id, row.challenge_id): row
+                for row in streaks.select_for_update().filter(user_id__in=chunk)
+            }
+            dates = defaultdict(list)
+            rows = check_ins.filter(user_id__in=chunk).order_by('user_id', 'challenge_id', 'date')
+            for user_id, challenge_id, date in rows.values_list('user_id', 'challenge_id', 'date'):
+                dates[(user_id, challenge_id)].append(date)
+
+            changed = []
+            for key in existing.keys() | dates.keys():
+                values = compute_streak(dates.get(key, []))
+                row = existing.get(key) or ChallengeStreak(user_id=key[0], challenge_id=key[1])
+                if row.pk is None or any(getattr(row, name) != value for name, value in values.items()):
+                    for name, value in values.items():
+                        setattr(row, name, value)
+                    changed.append(row)
+            checked += len(existing.keys() | dates.keys())
+
+            if changed and not dry_run:
+                ChallengeStreak.objects.bulk_create(
+                    changed,
+                    update_conflicts=True,
+                    unique_fields=['user', 'challenge'],
+                    update_fields=[*STREAK_FIELDS, 'updated_at'],
+                )
+            repaired += len(changed)
+
+    if not dry_run:
+        metrics.increment('challenge_streaks_repaired_total', repaired)
+    logger.info(f"Streak rebuild checked {checked} row(s), {repaired} out of date")
+    return checked, repaired
@@ -0,0 +1,119 @@
+import datetime
+import random
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Challenge, ChallengeStreak, CheckIn
+from .streaks import STREAK_FIELDS, join_challenge, rebuild_streaks, record_check_in
+
+# 10:30 UTC on 2 March: already 3 March in Kiritimati (UTC+14), still 1 March in Pago Pago (UTC-11)
+NOW = datetime.datetime(2026, 3, 2, 10, 30, tzinfo=datetime.timezone.utc)
+
+
+def day(n):
+    return datetime.date(2026, 3, n)
+
+
+class StreakMaintenanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        self.challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+
+    def streak_values(self):
+        streak = ChallengeStreak.objects.get(user=self.user, challenge=self.challenge)
+        return {name: getattr(streak, name) for name in STREAK_FIELDS}
+
+    def assert_matches_rebuild(self):
+        incremental = self.streak_values()
+        self.assertEqual(rebuild_streaks(dry_run=True), (1, 0), incremental)
+        rebuild_streaks()
+        self.assertEqual(self.streak_values(), incremental)
+
+    def test_consecutive_days_continue_the_streak(self):
+        for n in (1, 2, 3, 5, 6):
+            record_check_in(self.user, self.challenge, day(n))
+
+        self.assertEqual(
+            self.streak_values(),
+            {'current_streak': 2, 'longest_streak': 3, 'day_number': 5,
+             'started_on': day(1), 'last_check_in': day(6)},
+        )
+        self.assert_matches_rebuild()
+
+    def test_backdated_check_in_joins_two_runs(self):
+        for n in (1, 2, 4, 5):
+            record_check_in(self.user, self.challenge, day(n))
+        record_check_in(self.user, self.challenge, day(3))
+
+        self.assertEqual(self.streak_values()['current_streak'], 5)
+        self.assert_matches_rebuild()
+
+    def test_random_history_matches_a_rebuild(self):
+        rng = random.Random(41)
+        join_challenge(self.user, self.challenge)
+        for _ in range(60):
+            check_ins = list(CheckIn.objects.filter(user=self.user))
+            action = rng.choice(['add', 'add', 'delete', 'restore'])
+            if action == 'add':
+                try:
+                    record_check_in(self.user, self.challenge, day(1) + datetime.timedelta(days=rng.randrange(30)))
+                except IntegrityError:
+                    pass
+            elif action == 'delete' and any(not c.is_deleted for c in check_ins):
+                rng.choice([c for c in check_ins if not c.is_deleted]).delete(user=self.user)
+            elif action == 'restore' and any(c.is_deleted for c in check_ins):
+                check_in = rng.choice([c for c in check_ins if c.is_deleted])
+                try:
+                    check_in.restore(user=self.user)
+                except IntegrityError:
+                    pass
+            self.assert_matches_rebuild()
+
+
+@mock.patch('django.utils.timezone.now', return_value=NOW)
+class LocalDateTests(TestCase):
+    def setUp(self):
+        self.challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+
+    def client_for(self, username, tz):
+        user = User.objects.create_user(username, f'{username}@example.com', 'pw-12345678')
+        profile = user.profile
+        profile.timezone = tz
+        profile.save()
+        api = APIClient()
+        api.force_authenticate(user)
+        return user, api
+
+    def check_in(self, api, **data):
+        return api.post(f'/api/v1/challenges/{self.challenge.slug}/check-ins/', data, format='json')
+
+    def test_check_in_defaults_to_the_users_local_day(self, _now):
+        east, east_api = self.client_for('east', 'Pacific/Kiritimati')
+        west, west_api = self.client_for('west', 'Pacific/Pago_Pago')
+
+        self.assertEqual(self.check_in(east_api).status_code, 201)
+        self.assertEqual(self.check_in(west_api).status_code, 201)
+
+        self.assertEqual(CheckIn.objects.get(user=east).date, day(3))
+        self.assertEqual(CheckIn.objects.get(user=west).date, day(1))
+
+    def test_future_is_judged_by_the_users_day(self, _now):
+        _east, east_api = self.client_for('east', 'Pacific/Kiritimati')
+        _west, west_api = self.client_for('west', 'Pacific/Pago_Pago')
+
+        self.assertEqual(self.check_in(east_api, date='2026-03-03').status_code, 201)
+        self.assertEqual(self.check_in(west_api, date='2026-03-02').status_code, 400)
+
+    def test_current_streak_uses_the_users_day(self, _now):
+        # Yesterday in Pago Pago, but two days before the server's date
+        west, west_api = self.client_for('west', 'Pacific/Pago_Pago')
+        record_check_in(west, self.challenge, datetime.date(2026, 2, 28))
+
+        response = west_api.get('/api/v1/challenges/my/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['current_streak'], 1)
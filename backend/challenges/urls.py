@@ -0,0 +1,15 @@
+from django.urls import path
+from . import views
+
+app_name = 'challenges'
+
+urlpatterns = [
+    path('', views.ChallengeListView.as_view(), name='challenge_list'),
+    path('my/', views.MyChallengesView.as_view(), name='my_challenges'),
+    path('<slug:slug>/join/', views.JoinChallengeView.as_view(), name='join'),
+    path('<slug:slug>/check-ins/', views.CheckInListView.as_view(), name='check_in_list'),
+
+    # Individual check-ins
+    path('check-ins/<int:pk>/', views.CheckInDetailView.as_view(), name='check_in_detail'),
+    path('check-ins/<int:pk>/restore/', views.RestoreCheckInView.as_view(), name='check_in_restore'),
+]
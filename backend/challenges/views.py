@@ -0,0 +1,162 @@
+from django.db import IntegrityError
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import logging
+
+from .models import Challenge, ChallengeStreak, CheckIn
+from .serializers import ChallengeSerializer, ChallengeStreakSerializer, CheckInSerializer
+from .streaks import join_challenge, record_check_in
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengeListView(generics.ListAPIView):
+    """
+    List the challenges open for joining
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ChallengeSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return Challenge.objects.filter(is_active=True)
+
+
+class JoinChallengeView(APIView):
+    """
+    Join a challenge
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, slug):
+        """
+        Start tracking the current user's progress on a challenge
+        """
+        challenge = get_object_or_404(Challenge, slug=slug, is_active=True)
+        streak = join_challenge(request.user, challenge)
+        logger.info(f"User {request.user.username} joined challenge {challenge.slug}")
+        return Response({
+            'message': 'Challenge joined',
+            'streak': ChallengeStreakSerializer(streak, context={'today': request.user.profile.local_date()}).data
+        }, status=status.HTTP_200_OK)
+
+
+class MyChallengesView(generics.ListAPIView):
+    """
+    The current user's challenges with day number and streaks
+
+    Reads the materialized ChallengeStreak rows, never the check-in history.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ChallengeStreakSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        return (
+            ChallengeStreak.objects.filter(user=self.request.user)
+            .select_related('challenge')
+            .order_by('-last_check_in', 'challenge__name')
+        )
+
+    def get_serializer_context(self):
+        # Streaks are current as of the user's day, not the server's
+        return super().get_serializer_context() | {'today': self.request.user.profile.local_date()}
+
+
+class CheckInListView(APIView):
+    """
+    List or create check-ins for a challenge
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, slug):
+        """
+        The current user's check-ins for a challenge, newest first
+        """
+        challenge = get_object_or_404(Challenge, slug=slug)
+        check_ins = CheckIn.active_objects.filter(user=request.user, challenge=challenge).order_by('-date')
+        return Response({
+            'check_ins': CheckInSerializer(check_ins, many=True).data
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request, slug):
+        """
+        Check in for today (or the given date), in the user's time zone
+        """
+        challenge = get_object_or_404(Challenge, slug=slug, is_active=True)
+        today = request.user.profile.local_date()
+        serializer = CheckInSerializer(data=request.data, context={'request': request, 'today': today})
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Check-in failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            check_in, streak = record_check_in(
+                request.user,
+                challenge,
+                date=serializer.validated_data.get('date') or today,
+                note=serializer.validated_data.get('note', ''),
+                post=serializer.validated_data.get('post'),
+            )
+        except IntegrityError:
+            return Response({
+                'error': 'Check-in failed',
+                'details': {'date': ['Already checked in on this day.']}
+            }, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Check-in: {request.user.username} day {streak.day_number} of {challenge.slug}")
+        return Response({
+            'message': 'Checked in',
+            'check_in': CheckInSerializer(check_in).data,
+            'streak': ChallengeStreakSerializer(streak, context={'today': today}).data
+        }, status=status.HTTP_201_CREATED)
+
+
+class CheckInDetailView(APIView):
+    """
+    Delete a check-in
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, pk):
+        """
+        Soft delete a check-in; the streak is recomputed in the same transaction
+        """
+        check_in = get_object_or_404(CheckIn.active_objects, pk=pk, user=request.user)
+        check_in.delete(user=request.user)
+        logger.info(f"Check-in deleted: {check_in.pk} by {request.user.username}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RestoreCheckInView(APIView):
+    """
+    Restore a deleted check-in
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Undo a check-in deletion
+        """
+        check_in = get_object_or_404(CheckIn.objects, pk=pk, user=request.user, is_deleted=True)
+        try:
+            check_in.restore(user=request.user)
+        except IntegrityError:
+            return Response({
+                'error': 'Restore failed',
+                'details': {'date': ['Already checked in on this day.']}
+            }, status=status.HTTP_409_CONFLICT)
+
+        streak = ChallengeStreak.objects.select_related('challenge').get(
+            user=request.user,
+            challenge_id=check_in.challenge_id,
+        )
+        return Response({
+            'message': 'Check-in restored',
+            'check_in': CheckInSerializer(check_in).data,
+            'streak': ChallengeStreakSerializer(streak, context={'today': request.user.profile.local_date()}).data
+        }, status=status.HTTP_200_OK)
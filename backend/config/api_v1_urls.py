@@ -5,5 +5,20 @@ urlpatterns = [
     path('auth/', include('authentication.urls')),
 
     # Profile routes
-    # path('profiles/', include('profiles.urls')),
+    path('profiles/', include('profiles.urls')),
+
+    # Post history and generation
+    path('posts/', include('posts.urls')),
+
+    # Challenges, check-ins and streaks
+    path('challenges/', include('challenges.urls')),
+
+    # Dashboard analytics
+    path('analytics/', include('analytics.urls')),
+
+    # Background job status
+    path('jobs/', include('jobs.urls')),
+
+    # Operational routes
+    path('', include('core.urls')),
 ]
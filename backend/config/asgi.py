@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Under a preloading server (gunicorn.conf.py) this runs once, in the master, before workers fork
+if settings.WSGI_PRELOAD:
+    from core.warmup import warm_up
+    warm_up()
@@ -1,4 +1,3 @@
-from typing_extensions import cast
 """
 Django settings for config project.
 
@@ -11,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -45,11 +45,18 @@ INSTALLED_APPS = [
     'corsheaders',
     'profiles',
     'authentication',
-    'core'
+    'core',
+    'posts',
+    'jobs',
+    'challenges',
+    'analytics',
+    'publishing',
+    'reminders',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.AdaptiveConcurrencyMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -106,11 +113,27 @@ elif DB_ENGINE.lower() == 'postgresql_url':
         'default': dj_database_url.parse(DATABASE_URL)
     }
 else:
-    # Local Development - SQLite (default)
+    # Local Development and single-node installs - SQLite (default).
+    # WAL lets reads run alongside the single writer. Transactions take the write lock
+    # when they begin (BEGIN IMMEDIATE), so a busy database makes them wait up to
+    # busy_timeout instead of failing with "database is locked" when a read turns into
+    # a write. See core.sqlite; run manage.py sqlite_maintenance hourly.
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),  # milliseconds
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),  # bytes
+        'cache_size': config('SQLITE_CACHE_SIZE', default=-32000, cast=int),  # negative: KiB per connection
+        'temp_store': 'MEMORY',
+    }
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()),
+                'transaction_mode': 'IMMEDIATE',
+            },
         }
     }
 
@@ -123,9 +146,14 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
 }
 
@@ -154,6 +182,167 @@ SIMPLE_JWT = {
     'JTI_CLAIM': 'jti',
 }
 
+# AI post generation (Anthropic Messages API)
+ANTHROPIC_API_KEY = config('CLAUDE_API_KEY', default='')
+# Point at a local stub (manage.py run_anthropic_stub) for development
+ANTHROPIC_BASE_URL = config('ANTHROPIC_BASE_URL', default='')
+ANTHROPIC_MODEL = config('ANTHROPIC_MODEL', default='claude-sonnet-4-20250514')
+ANTHROPIC_TIMEOUT = config('ANTHROPIC_TIMEOUT', default=60, cast=float)
+ANTHROPIC_MAX_RETRIES = config('ANTHROPIC_MAX_RETRIES', default=2, cast=int)
+POST_GENERATION_MAX_TOKENS = config('POST_GENERATION_MAX_TOKENS', default=1024, cast=int)
+
+# Outbound LLM call limits (see core.ratelimit). Use the 'database' backend when
+# several processes share one API key; waits longer than MAX_WAIT seconds are refused.
+LLM_RATE_LIMIT_BACKEND = config('LLM_RATE_LIMIT_BACKEND', default='memory')
+LLM_RATE_LIMIT_GLOBAL_REQUESTS_PER_MINUTE = config('LLM_RATE_LIMIT_GLOBAL_REQUESTS_PER_MINUTE', default=50, cast=int)
+LLM_RATE_LIMIT_GLOBAL_TOKENS_PER_MINUTE = config('LLM_RATE_LIMIT_GLOBAL_TOKENS_PER_MINUTE', default=80000, cast=int)
+LLM_RATE_LIMIT_USER_REQUESTS_PER_MINUTE = config('LLM_RATE_LIMIT_USER_REQUESTS_PER_MINUTE', default=6, cast=int)
+LLM_RATE_LIMIT_USER_TOKENS_PER_MINUTE = config('LLM_RATE_LIMIT_USER_TOKENS_PER_MINUTE', default=20000, cast=int)
+LLM_RATE_LIMIT_MAX_WAIT = config('LLM_RATE_LIMIT_MAX_WAIT', default=10.0, cast=float)
+
+# Usage metering and daily token quotas per user (see core.metering); 0 disables a quota
+LLM_DAILY_TOKEN_SOFT_QUOTA = config('LLM_DAILY_TOKEN_SOFT_QUOTA', default=150000, cast=int)
+LLM_DAILY_TOKEN_HARD_QUOTA = config('LLM_DAILY_TOKEN_HARD_QUOTA', default=300000, cast=int)
+USAGE_FLUSH_INTERVAL = config('USAGE_FLUSH_INTERVAL', default=10.0, cast=float)
+USAGE_FLUSH_MAX_PENDING = config('USAGE_FLUSH_MAX_PENDING', default=1000, cast=int)
+
+# Batch generation (see posts.batch): entries per request and concurrent model calls per batch
+POST_BATCH_MAX_ENTRIES = config('POST_BATCH_MAX_ENTRIES', default=14, cast=int)
+POST_BATCH_CONCURRENCY = config('POST_BATCH_CONCURRENCY', default=4, cast=int)
+
+# Nightly suggested posts (see posts.pregeneration): requests per Message Batch, days of notes considered
+POST_PREGENERATION_BATCH_SIZE = config('POST_PREGENERATION_BATCH_SIZE', default=10000, cast=int)
+POST_PREGENERATION_LOOKBACK_DAYS = config('POST_PREGENERATION_LOOKBACK_DAYS', default=7, cast=int)
+
+# Generation cache (see posts.cache): in-process LRU over the 'generations' cache
+GENERATION_CACHE_TTL = config('GENERATION_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+GENERATION_CACHE_LOCAL_TTL = config('GENERATION_CACHE_LOCAL_TTL', default=3600, cast=int)
+GENERATION_CACHE_LOCAL_MAX_BYTES = config('GENERATION_CACHE_LOCAL_MAX_BYTES', default=8 * 1024 * 1024, cast=int)
+
+# Near-duplicate note detection (see posts.similarity)
+POST_SIMILARITY_THRESHOLD = config('POST_SIMILARITY_THRESHOLD', default=0.6, cast=float)
+POST_SIMILARITY_INDEX_MAX_USERS = config('POST_SIMILARITY_INDEX_MAX_USERS', default=1000, cast=int)
+
+# Idempotency-Key handling (see core.idempotency): how long responses are kept for replay,
+# how long a request holds its key, and how long a concurrent duplicate waits for it
+IDEMPOTENCY_KEY_TTL = config('IDEMPOTENCY_KEY_TTL', default=24 * 3600, cast=int)
+IDEMPOTENCY_LOCK_TIMEOUT = config('IDEMPOTENCY_LOCK_TIMEOUT', default=60, cast=int)
+IDEMPOTENCY_WAIT_TIMEOUT = config('IDEMPOTENCY_WAIT_TIMEOUT', default=30.0, cast=float)
+
+# LinkedIn publishing (see publishing.outbox; run manage.py dispatch_outbox).
+# Point LINKEDIN_API_BASE_URL at manage.py run_linkedin_stub for development.
+LINKEDIN_API_BASE_URL = config('LINKEDIN_API_BASE_URL', default='https://api.linkedin.com')
+LINKEDIN_API_VERSION = config('LINKEDIN_API_VERSION', default='202405')
+LINKEDIN_TIMEOUT = config('LINKEDIN_TIMEOUT', default=15.0, cast=float)
+LINKEDIN_RATE_LIMIT_BACKEND = config('LINKEDIN_RATE_LIMIT_BACKEND', default='memory')
+LINKEDIN_TOKEN_REQUESTS_PER_HOUR = config('LINKEDIN_TOKEN_REQUESTS_PER_HOUR', default=25, cast=int)
+LINKEDIN_TOKEN_BURST = config('LINKEDIN_TOKEN_BURST', default=5, cast=int)
+OUTBOX_CONCURRENCY = config('OUTBOX_CONCURRENCY', default=8, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=2.0, cast=float)
+OUTBOX_LEASE = config('OUTBOX_LEASE', default=120, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BASE_DELAY = config('OUTBOX_RETRY_BASE_DELAY', default=10.0, cast=float)
+OUTBOX_RETRY_MAX_DELAY = config('OUTBOX_RETRY_MAX_DELAY', default=3600.0, cast=float)
+
+# Analytics rollups (see analytics.rollups): days kept at daily and weekly granularity
+ANALYTICS_DAILY_RETENTION_DAYS = config('ANALYTICS_DAILY_RETENTION_DAYS', default=120, cast=int)
+ANALYTICS_WEEKLY_RETENTION_DAYS = config('ANALYTICS_WEEKLY_RETENTION_DAYS', default=2 * 365, cast=int)
+
+# Email. The console backend prints messages; set EMAIL_BACKEND to
+# django.core.mail.backends.smtp.EmailBackend and the EMAIL_HOST_* values to send them.
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='reminders@localhost')
+
+# Daily reminders (see reminders.dispatch; run manage.py send_reminders hourly):
+# profiles per batch/checkpoint, seconds a run holds its bucket, link in the email
+REMINDER_BATCH_SIZE = config('REMINDER_BATCH_SIZE', default=500, cast=int)
+REMINDER_LEASE = config('REMINDER_LEASE', default=600, cast=int)
+REMINDER_CHECK_IN_URL = config('REMINDER_CHECK_IN_URL', default='http://localhost:3000/check-in')
+
+# Adaptive concurrency limits per route group (see core.concurrency). Requests
+# beyond a group's limit are answered 503; latency_target is in seconds. A worker
+# process never has more requests in flight than threads, so the limits are sized
+# from its thread count (gunicorn.conf.py reads the same variable).
+WORKER_THREADS = config('GUNICORN_THREADS', default=4, cast=int)
+CONCURRENCY_GROUPS = {
+    'auth': {
+        # Password hashing makes these the most CPU-heavy routes
+        'routes': ['authentication:register', 'authentication:login', 'authentication:change_password'],
+        'initial_limit': WORKER_THREADS, 'min_limit': 1, 'max_limit': WORKER_THREADS, 'latency_target': 1.0,
+    },
+    'generation': {
+        # Long upstream calls; leave threads for everything else
+        'routes': ['posts:generate', 'posts:generate_stream', 'posts:generate_batch'],
+        'initial_limit': max(1, WORKER_THREADS // 2), 'min_limit': 1,
+        'max_limit': max(1, WORKER_THREADS - 1), 'latency_target': 2.0,
+    },
+    'streams': {
+        # Job status streams hold a thread for as long as the client listens
+        'routes': ['jobs:job_stream'],
+        'initial_limit': max(1, WORKER_THREADS // 2), 'min_limit': 1,
+        'max_limit': max(1, WORKER_THREADS - 1), 'latency_target': 0.5,
+    },
+    'export': {
+        'routes': ['profiles:profile_export'],
+        'initial_limit': 1, 'min_limit': 1, 'max_limit': max(1, WORKER_THREADS // 2), 'latency_target': 5.0,
+    },
+    'default': {
+        'initial_limit': WORKER_THREADS, 'min_limit': 1, 'max_limit': WORKER_THREADS, 'latency_target': 0.5,
+    },
+}
+CONCURRENCY_EXEMPT_ROUTES = ['authentication:health_check', 'core:metrics', 'authentication:token_verify']
+
+# History partitioning on PostgreSQL (see core.partitioning; run manage.py manage_partitions daily):
+# months of partitions created ahead, and months of post/check-in history kept (0 keeps everything)
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+HISTORY_RETENTION_MONTHS = config('HISTORY_RETENTION_MONTHS', default=0, cast=int)
+
+# Frontend bootstrap endpoint (see core.bootstrap): recent posts it includes
+BOOTSTRAP_RECENT_POSTS = config('BOOTSTRAP_RECENT_POSTS', default=10, cast=int)
+
+# Preloading servers (see core.warmup and gunicorn.conf.py): warm the app up in the
+# master before forking, including these otherwise lazily imported modules
+WSGI_PRELOAD = config('WSGI_PRELOAD', default=False, cast=bool)
+WARMUP_IMPORTS = ['anthropic']
+
+# Domain events (see core.events): background lanes handlers run on, or inline when EVENT_BUS_SYNC
+EVENT_BUS_LANES = config('EVENT_BUS_LANES', default=4, cast=int)
+EVENT_BUS_SYNC = config('EVENT_BUS_SYNC', default=False, cast=bool)
+
+# Background jobs (see jobs.queue; run with manage.py run_workers)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_VISIBILITY_TIMEOUT = config('JOB_VISIBILITY_TIMEOUT', default=300, cast=int)
+JOB_RETRY_BASE_DELAY = config('JOB_RETRY_BASE_DELAY', default=2.0, cast=float)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=300.0, cast=float)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared across workers; swap for DatabaseCache (after createcachetable) on multi-host setups
+    'generations': {
+        'BACKEND': config(
+            'GENERATION_CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': config('GENERATION_CACHE_LOCATION', default=str(BASE_DIR / '.cache' / 'generations')),
+        'TIMEOUT': GENERATION_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': config('GENERATION_CACHE_MAX_ENTRIES', default=10000, cast=int),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React development server
@@ -177,6 +366,7 @@ CORS_ALLOWED_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
 
 # Password validation
@@ -221,14 +411,19 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Logging configuration
+# manage.py test logs to the console only, so test runs don't write to the log file
+TESTING = sys.argv[1:2] == ['test']
+LOG_FILE = config('DJANGO_LOG_FILE', default=str(BASE_DIR / 'django.log'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'handlers': {
-        'file': {
+        'file': {'class': 'logging.NullHandler'} if TESTING else {
             'level': 'INFO',
             'class': 'logging.FileHandler',
-            'filename': 'django.log',
+            'filename': LOG_FILE,
+            'delay': True,
         },
         'console': {
             'level': 'INFO',
@@ -241,5 +436,35 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'posts': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'jobs': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'challenges': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'analytics': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'publishing': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'reminders': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
     },
 }
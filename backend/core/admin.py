@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import UsageRollup
+
+
+@admin.register(UsageRollup)
+class UsageRollupAdmin(admin.ModelAdmin):
+    """
+    Read-only view of daily LLM usage per user
+    """
+    list_display = ('user', 'day', 'requests', 'input_tokens', 'output_tokens',
+                    'cache_read_input_tokens', 'cache_creation_input_tokens')
+    list_filter = ('day',)
+    list_select_related = ('user',)
+    ordering = ('-day', 'user')
+    search_fields = ('^user__username',)
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,140 @@
+"""
+Everything the frontend needs on load, in one response.
+
+GET /api/v1/bootstrap/ returns the user, their profile, the challenges
+open to join, the user's streaks and their most recent posts. Fetched
+separately, that is five requests made one after another, each paying
+for authentication and middleware. Here each section is a single query,
+with related rows joined in (select_related). The whole response is
+therefore at most one query per section beyond authentication, however
+much history the user has. The view logs a warning if that budget is
+exceeded.
+
+    ?include=user,streaks             only these sections (and their queries)
+    ?fields[posts]=id,content,status  only these fields of a section
+
+The ETag is a digest of every section's rendered payload, so it changes
+whenever anything in the response would. A request whose If-None-Match
+matches gets an empty 304. The queries still run on a 304. Some writes,
+such as the outbox's status updates, don't touch updated_at, so a
+cheaper timestamp check could serve stale state.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+
+from authentication.serializers import UserProfileSerializer
+from challenges.models import Challenge, ChallengeStreak
+from challenges.serializers import ChallengeSerializer, ChallengeStreakSerializer
+from posts.models import Post
+from posts.serializers import PostSerializer
+from profiles.models import Profile
+from profiles.serializers import ProfileSerializer
+from .renderers import ORJSONRenderer
+
+FIELDS_PARAM = re.compile(r'^fields\[(\w+)\]$')
+
+
+def _user(user):
+    return user
+
+
+def _profile(user):
+    profile = Profile.objects.select_related('created_by', 'updated_by').filter(user=user).first()
+    if profile is not None:
+        # full_name reads the user; it's already loaded
+        profile.user = user
+    return profile
+
+
+def _challenges(user):
+    return Challenge.objects.filter(is_active=True)
+
+
+def _streaks(user):
+    return (
+        ChallengeStreak.objects.filter(user=user)
+        # The profile's time zone decides whether a streak is still current
+        .select_related('challenge', 'user__profile')
+        .order_by('-last_check_in', 'challenge__name')
+    )
+
+
+def _posts(user):
+    return (
+        Post.active_objects.filter(user=user)
+        .defer('input_signature')
+        .order_by('-created_at', '-id')[:settings.BOOTSTRAP_RECENT_POSTS]
+    )
+
+
+# name -> (serializer, loader, many, fields never served). The user's nested
+# profile is left out; it's the profile section, and would cost extra queries.
+SECTIONS = {
+    'user': (UserProfileSerializer, _user, False, {'profile'}),
+    'profile': (ProfileSerializer, _profile, False, set()),
+    'challenges': (ChallengeSerializer, _challenges, True, set()),
+    'streaks': (ChallengeStreakSerializer, _streaks, True, set()),
+    'posts': (PostSerializer, _posts, True, set()),
+}
+
+
+def section_fields(name):
+    serializer_class, _, _, excluded = SECTIONS[name]
+    return [field for field in serializer_class.Meta.fields if field not in excluded]
+
+
+def parse_selection(query_params):
+    """
+    Read ?include= and ?fields[section]=; return ({section: fields or None}, errors)
+    """
+    errors = {}
+    include = query_params.get('include')
+    names = [name.strip() for name in include.split(',') if name.strip()] if include else list(SECTIONS)
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        errors['include'] = [f"Unknown section(s): {', '.join(unknown)}. Choose from {', '.join(SECTIONS)}."]
+    selection = {name: None for name in names if name in SECTIONS}
+
+    for key, value in query_params.items():
+        match = FIELDS_PARAM.match(key)
+        if not match:
+            continue
+        if match[1] not in SECTIONS:
+            errors[key] = [f"Unknown section {match[1]!r}. Choose from {', '.join(SECTIONS)}."]
+            continue
+        available = section_fields(match[1])
+        requested = [field.strip() for field in value.split(',') if field.strip()]
+        invalid = [field for field in requested if field not in available]
+        if invalid or not requested:
+            errors[key] = [f"Unknown field(s): {', '.join(invalid) or '(none given)'}. Available: {', '.join(available)}."]
+        elif match[1] in selection:
+            selection[match[1]] = requested
+    return selection, errors
+
+
+def _serializer(name, instance, fields):
+    serializer_class, _, many, _ = SECTIONS[name]
+    serializer = serializer_class(instance, many=many)
+    wanted = set(fields or section_fields(name))
+    target = serializer.child if many else serializer
+    for field in list(target.fields):
+        if field not in wanted:
+            target.fields.pop(field)
+    return serializer
+
+
+def build(user, selection):
+    """
+    Serialize the selected sections for `user`; return (data, etag)
+    """
+    renderer = ORJSONRenderer()
+    digest = hashlib.sha256()
+    data = {}
+    for name, fields in selection.items():
+        instance = SECTIONS[name][1](user)
+        data[name] = None if instance is None else _serializer(name, instance, fields).data
+        digest.update(name.encode())
+        digest.update(renderer.render(data[name]) or b'null')
+    return data, f'"{digest.hexdigest()[:32]}"'
@@ -0,0 +1,140 @@
+"""
+Adaptive concurrency limits for load shedding.
+
+Each route group (see settings.CONCURRENCY_GROUPS) gets an AIMD limit on
+the requests it may have in flight in this process. Every request that
+finishes within the group's latency target while the group is busy raises
+the limit by 1/limit (about +1 per limit's worth of requests). A request
+that is slower than the target, or fails with a 5xx, cuts the limit by
+BACKOFF_RATIO. Requests beyond the limit are rejected straight away (see
+AdaptiveConcurrencyMiddleware) instead of queueing until they all time out.
+
+Limits are per process, and a process never has more requests in flight
+than it has threads, so the groups are sized from WORKER_THREADS. A worker
+that is falling behind shows it as requests queueing in front of it (in
+the proxy and the server's listen backlog), not as more requests in
+flight. The reverse proxy therefore stamps each request with
+X-Request-Start, e.g. nginx `proxy_set_header X-Request-Start "t=${msec}";`.
+The time spent queued counts toward the request's latency. A request that
+has already queued longer than its group's latency target is shed on
+arrival, since serving it would only make the queue longer.
+"""
+import math
+import threading
+import time
+
+from . import metrics
+
+BACKOFF_RATIO = 0.9
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+
+
+class AIMDLimit:
+    """
+    Additive-increase/multiplicative-decrease concurrency limit for one route group
+    """
+
+    def __init__(self, group, initial_limit, min_limit, max_limit, latency_target):
+        self.group = group
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.inflight = 0
+        self.latency = None
+        self._lock = threading.Lock()
+        self._publish()
+
+    def try_acquire(self, queued=0.0):
+        """
+        Take a slot; return False if the group is at its limit or the request queued too long
+        """
+        with self._lock:
+            if queued > self.latency_target:
+                metrics.increment('requests_shed_total', group=self.group, reason='queued')
+                # Queueing is the overload signal here; back off as a slow request would
+                self.limit = max(self.min_limit, self.limit * BACKOFF_RATIO)
+                self._publish()
+                return False
+            if self.inflight >= int(self.limit):
+                metrics.increment('requests_shed_total', group=self.group, reason='limit')
+                return False
+            self.inflight += 1
+            metrics.set_gauge('concurrency_inflight', self.inflight, group=self.group)
+            return True
+
+    def release(self, latency, failed=False):
+        """
+        Give the slot back and adapt the limit to how the request went
+        """
+        with self._lock:
+            busy = self.inflight * 2 >= self.limit
+            self.inflight -= 1
+            self.latency = latency if self.latency is None else (
+                LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency
+            )
+            if failed or latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * BACKOFF_RATIO)
+            elif busy:
+                # Only grow when the current limit is actually being used
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._publish()
+
+    def retry_after(self):
+        """
+        Seconds a shed client should wait: about one typical request of this group
+        """
+        return max(1, math.ceil(self.latency or 1))
+
+    def _publish(self):
+        metrics.set_gauge('concurrency_limit', int(self.limit), group=self.group)
+        metrics.set_gauge('concurrency_inflight', self.inflight, group=self.group)
+
+
+def queue_time(header, now=None):
+    """
+    Seconds since the proxy received the request, from an X-Request-Start value.
+
+    Accepts "t=<seconds>" with a fractional part (nginx ${msec}) and bare
+    milliseconds or microseconds since the epoch. Missing, unparseable or
+    implausible values (clock skew) count as 0.
+    """
+    if not header:
+        return 0.0
+    try:
+        started = float(header.strip().removeprefix('t='))
+    except ValueError:
+        return 0.0
+    # Scale milliseconds and microseconds down to seconds
+    while started > 1e11:
+        started /= 1000
+    queued = (time.time() if now is None else now) - started
+    return queued if 0 < queued < 3600 else 0.0
+
+
+class ConcurrencyLimits:
+    """
+    Route name -> group limit lookup built from settings
+    """
+
+    def __init__(self, groups, exempt_routes, default_group='default'):
+        self.exempt_routes = frozenset(exempt_routes)
+        self.limits = {}
+        self.routes = {}
+        for name, config in groups.items():
+            config = dict(config)
+            for route in config.pop('routes', ()):
+                self.routes[route] = name
+            self.limits[name] = AIMDLimit(name, **config)
+        self.default = self.limits[default_group]
+
+    def for_route(self, route_name):
+        """
+        The limit for a resolved route, or None if the route is never shed
+        """
+        if route_name in self.exempt_routes:
+            return None
+        group = self.routes.get(route_name)
+        return self.limits[group] if group else self.default
@@ -0,0 +1,70 @@
+"""
+Database helpers shared across apps
+"""
+from django.db import connections, router
+
+
+def upsert_increment(model, rows, conflict_fields, increment_fields, returning=None, batch_size=500):
+    """
+    Insert rows, or add their counter values to the rows already present.
+
+    A single INSERT ... ON CONFLICT DO UPDATE per batch (Postgres and
+    SQLite 3.24+), so concurrent writers never lose increments and no row
+    has to be read first. rows are dicts keyed by the given field names
+    (use attnames such as 'user_id' for foreign keys). If `returning`
+    lists fields, their post-update values are returned as tuples.
+    """
+    if not rows:
+        return []
+
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    names = [*conflict_fields, *increment_fields]
+    fields = [model._meta.get_field(name) for name in names]
+    columns = [quote(field.column) for field in fields]
+    conflict = ', '.join(quote(model._meta.get_field(name).column) for name in conflict_fields)
+    updates = ', '.join(
+        f'{column} = {table}.{column} + excluded.{column}'
+        for column in columns[len(conflict_fields):]
+    )
+    placeholders = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    returning_sql = ''
+    if returning:
+        returning_sql = ' RETURNING ' + ', '.join(quote(model._meta.get_field(name).column) for name in returning)
+
+    results = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = []
+            for row in batch:
+                params.extend(
+                    field.get_db_prep_value(row[name], connection)
+                    for name, field in zip(names, fields)
+                )
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(columns)}) VALUES {", ".join([placeholders] * len(batch))} '
+                f'ON CONFLICT ({conflict}) DO UPDATE SET {updates}{returning_sql}',
+                params,
+            )
+            if returning:
+                results.extend(cursor.fetchall())
+    return results
+
+
+class QueryCounter:
+    """
+    Count the queries run on a connection, without DEBUG's query log:
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            ...
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
@@ -0,0 +1,174 @@
+"""
+In-process domain events.
+
+Views publish what happened (UserRegistered, UserLoggedIn, ProfileUpdated)
+instead of doing every follow-up themselves; apps subscribe handlers at
+import time, typically from a handlers module imported in AppConfig.ready:
+
+    @subscribe(UserLoggedIn)
+    def audit_login(event):
+        ...
+
+publish() hands the event over when the surrounding transaction commits,
+so handlers never see rows that were rolled back. Handlers then run on
+EVENT_BUS_LANES background threads. Every event belongs to an aggregate
+(the user, for the events below) and all events of one aggregate go to the
+same single-threaded lane, so one user's events are handled in the order
+they were published while different users' events run in parallel.
+
+With EVENT_BUS_SYNC (meant for tests and scripts) handlers run inline in
+on_commit instead.
+
+Delivery is best effort: pending events are drained at interpreter exit,
+but a crash loses them and a failing handler is logged, not retried. Work
+that must not be lost belongs in jobs.queue.
+"""
+import atexit
+import datetime
+import logging
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    """
+    Base class for domain events; `aggregate_key` decides the ordering lane
+    """
+
+    @property
+    def aggregate_key(self):
+        return f"user:{self.user_id}"
+
+
+@dataclass(frozen=True)
+class UserRegistered(Event):
+    user_id: int
+    occurred_at: datetime.datetime = field(default_factory=timezone.now)
+
+
+@dataclass(frozen=True)
+class UserLoggedIn(Event):
+    user_id: int
+    occurred_at: datetime.datetime = field(default_factory=timezone.now)
+
+
+@dataclass(frozen=True)
+class ProfileUpdated(Event):
+    user_id: int
+    changed_fields: tuple = ()
+    occurred_at: datetime.datetime = field(default_factory=timezone.now)
+
+
+_handlers = defaultdict(list)
+
+
+def subscribe(event_type):
+    """
+    Register the decorated function as a handler for `event_type`
+    """
+    def decorator(func):
+        if func not in _handlers[event_type]:
+            _handlers[event_type].append(func)
+        return func
+    return decorator
+
+
+def handlers_for(event_type):
+    return list(_handlers.get(event_type, ()))
+
+
+class EventBus:
+    """
+    Runs event handlers on per-aggregate lanes of single-threaded executors
+    """
+
+    def __init__(self, lanes):
+        self.lane_count = lanes
+        self._lanes = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_lanes(self):
+        if self._lanes is None:
+            with self._lock:
+                if self._lanes is None:
+                    self._lanes = [
+                        ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'events-{i}')
+                        for i in range(self.lane_count)
+                    ]
+                    atexit.register(self.shutdown)
+        return self._lanes
+
+    def dispatch(self, event):
+        """
+        Run the event's handlers now (EVENT_BUS_SYNC) or queue them on the aggregate's lane
+        """
+        handlers = handlers_for(type(event))
+        if not handlers:
+            return
+        if settings.EVENT_BUS_SYNC:
+            self._handle(event, handlers)
+            return
+        lanes = self._get_lanes()
+        lane = lanes[zlib.crc32(event.aggregate_key.encode()) % len(lanes)]
+        with self._lock:
+            self._pending += 1
+            metrics.set_gauge('domain_events_pending', self._pending)
+        lane.submit(self._run, event, handlers)
+
+    def _run(self, event, handlers):
+        close_old_connections()
+        try:
+            self._handle(event, handlers)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._pending -= 1
+                metrics.set_gauge('domain_events_pending', self._pending)
+
+    def _handle(self, event, handlers):
+        name = type(event).__name__
+        for handler in handlers:
+            try:
+                handler(event)
+                metrics.increment('domain_event_handlers_total', event=name, result='succeeded')
+            except Exception:
+                metrics.increment('domain_event_handlers_total', event=name, result='failed')
+                logger.exception(f"{handler.__module__}.{handler.__name__} failed on {event}")
+
+    def flush(self, timeout=None):
+        """
+        Wait until every event queued so far has been handled
+        """
+        if self._lanes is None:
+            return
+        wait([lane.submit(lambda: None) for lane in self._lanes], timeout=timeout)
+
+    def shutdown(self):
+        if self._lanes is not None:
+            for lane in self._lanes:
+                lane.shutdown(wait=True)
+
+
+bus = EventBus(lanes=settings.EVENT_BUS_LANES)
+
+
+def publish(event, using=None):
+    """
+    Dispatch `event` once the current transaction commits (immediately outside one)
+    """
+    metrics.increment('domain_events_total', event=type(event).__name__)
+    transaction.on_commit(partial(bus.dispatch, event), using=using)
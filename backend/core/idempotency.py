@@ -0,0 +1,212 @@
+"""
+Idempotency-Key support for DRF POST handlers.
+
+Clients that retry on timeouts send the same Idempotency-Key header with
+every attempt. The first request with a key runs the view and its response
+is stored; repeats get the stored response back (with an
+Idempotent-Replayed header) instead of registering the user twice or
+paying for a second generation. A repeat that arrives while the first is
+still running waits for it rather than running concurrently.
+
+Keys are scoped to the user (or to anonymous callers), method and path,
+stored as an HMAC keyed with SECRET_KEY, and kept for IDEMPOTENCY_KEY_TTL
+seconds. Reusing a key with different request data is rejected with 422;
+the parsed data is compared, so the same JSON with other whitespace or key
+order still matches. Password fields are left out of that comparison, so
+nothing derived from a password is stored. Server errors are not stored,
+so the request can be retried with the same key.
+
+Responses carrying credentials shouldn't sit in the table: pass `store`
+to strip them before saving and `replay` to rebuild them on a repeat.
+replay(data, request) gets the repeat request, e.g. to check its password.
+
+Usage:
+
+    class GeneratePostView(APIView):
+        @idempotent
+        def post(self, request):
+            ...
+
+    class RegisterView(APIView):
+        @idempotent(store=without_tokens, replay=with_fresh_tokens)
+        def post(self, request):
+            ...
+"""
+import datetime
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# Response headers worth replaying
+STORED_HEADERS = ('Location',)
+
+POLL_INTERVAL = 0.1
+
+
+def _digest(*parts):
+    # Keyed, so stored digests can't be matched against guessed request bodies
+    digest = hmac.new(settings.SECRET_KEY.encode('utf-8'), digestmod=hashlib.sha256)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def _fingerprint(request):
+    """
+    Digest of the parsed request data, without password fields
+    """
+    data = request.data
+    if isinstance(data, dict):
+        items = data.lists() if hasattr(data, 'lists') else data.items()
+        data = {name: value for name, value in items if 'password' not in name.lower()}
+    return _digest(json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, default=str))
+
+
+def _replay(record, request, replay=None):
+    data = replay(record.response_data, request) if replay else record.response_data
+    response = Response(data, status=record.response_status, headers=record.response_headers)
+    response[REPLAYED_HEADER] = 'true'
+    metrics.increment('idempotency_requests_total', result='replayed')
+    return response
+
+
+def _acquire(scope, fingerprint):
+    """
+    Claim the key for this request.
+
+    Returns (None, None) when the caller should run the view, or
+    (record, None) to replay a completed response, or (None, response)
+    with an error response.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        now = timezone.now()
+        lease = now + datetime.timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(
+                    scope=scope,
+                    fingerprint=fingerprint,
+                    locked_until=lease,
+                    expires_at=now + datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+            return None, None
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(scope=scope).first()
+        if record is None:
+            # Deleted after a failure in the meantime; try to claim it again
+            continue
+        if record.expires_at <= now:
+            IdempotencyKey.objects.filter(pk=record.pk, expires_at=record.expires_at).delete()
+            continue
+        if record.fingerprint != fingerprint:
+            metrics.increment('idempotency_requests_total', result='mismatch')
+            return None, Response({
+                'error': f'{HEADER} was already used for a different request'
+            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if record.status == IdempotencyKey.STATUS_COMPLETED:
+            return record, None
+
+        # Still processing elsewhere: take over an abandoned lease, otherwise wait
+        if record.locked_until and record.locked_until <= now:
+            taken = IdempotencyKey.objects.filter(
+                pk=record.pk,
+                status=IdempotencyKey.STATUS_PROCESSING,
+                locked_until=record.locked_until,
+            ).update(locked_until=lease)
+            if taken:
+                return None, None
+            continue
+        if time.monotonic() >= deadline:
+            metrics.increment('idempotency_requests_total', result='wait_timeout')
+            response = Response({
+                'error': 'A request with this Idempotency-Key is still being processed'
+            }, status=status.HTTP_409_CONFLICT)
+            response['Retry-After'] = '1'
+            return None, response
+        metrics.increment('idempotency_requests_total', result='waited')
+        time.sleep(POLL_INTERVAL)
+
+
+def idempotent(view_method=None, *, store=None, replay=None):
+    """
+    Make a DRF view method honour the Idempotency-Key request header.
+
+    store(data) returns what to save of a response's data, and
+    replay(data, request) turns the saved data back into a response body.
+    """
+    if view_method is None:
+        return functools.partial(idempotent, store=store, replay=replay)
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({
+                'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user.pk if request.user and request.user.is_authenticated else 'anonymous'
+        scope = _digest(user, request.method, request.path, key)
+        fingerprint = _fingerprint(request)
+
+        record, error = _acquire(scope, fingerprint)
+        if error is not None:
+            return error
+        if record is not None:
+            return _replay(record, request, replay)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            IdempotencyKey.objects.filter(scope=scope).delete()
+            raise
+
+        if response.status_code >= 500 or not isinstance(response, Response):
+            # Not replayable: let a retry run the view again
+            IdempotencyKey.objects.filter(scope=scope).delete()
+            return response
+
+        IdempotencyKey.objects.filter(scope=scope).update(
+            status=IdempotencyKey.STATUS_COMPLETED,
+            response_status=response.status_code,
+            response_data=store(response.data) if store else response.data,
+            response_headers={name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+            locked_until=None,
+        )
+        metrics.increment('idempotency_requests_total', result='stored')
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys(now=None):
+    """
+    Delete keys past their TTL; return how many were removed
+    """
+    deleted, _details = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
@@ -0,0 +1,41 @@
+"""
+Deferred imports for heavy optional SDKs.
+
+    anthropic = lazy_import('anthropic')
+
+binds a stand-in that imports the real module on first attribute access,
+so processes that never call the SDK (most management commands, workers
+of other queues, the dev server's autoreloader) don't pay for importing
+it. Preloading servers import it up front instead, see core.warmup.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Module proxy that imports `name` the first time an attribute is read
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
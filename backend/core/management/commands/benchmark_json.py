@@ -0,0 +1,118 @@
+import datetime
+import io
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser, orjson
+from core.renderers import ORJSONRenderer
+
+SAMPLE_POST = (
+    "🚀 Day {day} of #100DaysOfCode!\n\n"
+    "Today I dove deep into React's useEffect hook and built a weather app. "
+    "Dependency arrays and cleanup functions finally clicked.\n\n"
+    "Key takeaways:\n✅ Understanding component lifecycle\n✅ Managing side effects properly\n"
+    "✅ API integration with useEffect\n\n"
+    "The journey continues! What's your favorite React hook?\n\n"
+    "#ReactJS #WebDevelopment #BuildInPublic #DevJourney"
+)
+
+
+def profile_payload():
+    """
+    Shape of GET /api/v1/auth/profile/ (UserProfileSerializer output)
+    """
+    now = timezone.now()
+    return {
+        'user': {
+            'id': 42,
+            'username': 'ada',
+            'email': 'ada@example.com',
+            'first_name': 'Ada',
+            'last_name': 'Lovelace',
+            'date_joined': '2025-05-31T05:14:00.123456Z',
+            'profile': {
+                'bio': 'Learning in public, one commit at a time.',
+                'location': 'London',
+                'website': 'https://example.com',
+                'linkedin_profile': 'https://www.linkedin.com/in/ada',
+                'linkedin_connected': True,
+                'preferred_tone': 'storytelling',
+                'email_notifications': True,
+                'daily_reminders': True,
+                # get_profile() returns raw datetimes, rendered by the encoder
+                'created_at': now - datetime.timedelta(days=120),
+                'updated_at': now,
+                'created_by': 'ada',
+                'updated_by': 'ada',
+            },
+        }
+    }
+
+
+def post_list_payload(size):
+    """
+    Shape of a keyset-paginated post history page
+    """
+    now = timezone.now()
+    return {
+        'next': 'http://localhost:8000/api/v1/posts/?cursor=eyJwIjpbIjIwMjUtMDYtMDEiLDEyM119',
+        'previous': None,
+        'results': [
+            {
+                'id': 1000 - i,
+                'input_text': 'Learned about React useEffect hook and built a weather app',
+                'content': SAMPLE_POST.format(day=100 - i),
+                'tone': 'motivational',
+                'status': 'draft',
+                'created_at': now - datetime.timedelta(days=i, microseconds=i * 137),
+                'updated_at': now - datetime.timedelta(days=i),
+            }
+            for i in range(size)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSON renderer/parser with the orjson-backed ones on representative payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000, help="Calls per timing run")
+        parser.add_argument('--repeat', type=int, default=5, help="Timing runs; the best one is reported")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed; ORJSONRenderer would just use the stdlib encoder.")
+
+        payloads = [
+            ('profile', profile_payload()),
+            ('post list (20)', post_list_payload(20)),
+            ('post list (100)', post_list_payload(100)),
+        ]
+        number, repeat = options['number'], options['repeat']
+
+        self.stdout.write(f"{'payload':<18} {'op':<7} {'bytes':>7} {'drf µs':>9} {'orjson µs':>10} {'speedup':>8}")
+        for name, data in payloads:
+            expected = JSONRenderer().render(data)
+            rendered = ORJSONRenderer().render(data)
+            if rendered != expected:
+                raise CommandError(f"Renderer output differs for {name!r}")
+            if ORJSONParser().parse(io.BytesIO(rendered)) != JSONParser().parse(io.BytesIO(expected)):
+                raise CommandError(f"Parser output differs for {name!r}")
+
+            cases = [
+                ('render', lambda r=JSONRenderer(): r.render(data), lambda r=ORJSONRenderer(): r.render(data)),
+                ('parse', lambda p=JSONParser(): p.parse(io.BytesIO(expected)),
+                 lambda p=ORJSONParser(): p.parse(io.BytesIO(expected))),
+            ]
+            for op, baseline, candidate in cases:
+                base = min(timeit.repeat(baseline, number=number, repeat=repeat)) / number * 1e6
+                fast = min(timeit.repeat(candidate, number=number, repeat=repeat)) / number * 1e6
+                self.stdout.write(
+                    f"{name:<18} {op:<7} {len(expected):>7} {base:>9.1f} {fast:>10.1f} {base / fast:>7.1f}x"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Output is byte-identical for all payloads."))
@@ -0,0 +1,211 @@
+import datetime
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+
+from challenges.models import Challenge
+from challenges.streaks import join_challenge
+from core import sqlite
+from posts.models import Post
+
+PASSWORD = 'benchmark-password'
+
+# Request mix per worker: sign-ins (last_login write), reads, and check-ins (a
+# transaction that reads the streak and then writes it)
+MIX = {'login': 2, 'post_list': 4, 'my_challenges': 2, 'check_in': 2}
+
+# The configuration before tuning: rollback journal, deferred transactions, Python's 5 s timeout
+DEFAULT_MODE = {'journal_mode': 'DELETE', 'options': {}}
+
+
+class LockCounter(logging.Handler):
+    """
+    Count "database is locked" errors, including those views and event handlers log and swallow
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record):
+        text = record.getMessage()
+        if record.exc_info and record.exc_info[1] is not None:
+            text += str(record.exc_info[1])
+        if 'database is locked' in text:
+            self.count += 1
+
+
+def _capture_logging():
+    counter = LockCounter()
+    loggers = [logging.getLogger()] + [
+        logger for logger in logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)
+    ]
+    for logger in loggers:
+        logger.handlers = []
+        logger.propagate = True
+    logging.getLogger().addHandler(counter)
+    return counter
+
+
+def _request(client, op, username, token, rng, slug):
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+    if op == 'login':
+        return client.post(
+            '/api/v1/auth/login/', {'username_or_email': username, 'password': PASSWORD}, content_type='application/json'
+        )
+    if op == 'post_list':
+        return client.get('/api/v1/posts/', **auth)
+    if op == 'my_challenges':
+        return client.get('/api/v1/challenges/my/', **auth)
+    # Days already checked in answer 409, which is still a full read-then-write transaction
+    date = datetime.date.today() - datetime.timedelta(days=rng.randrange(365))
+    return client.post(
+        f'/api/v1/challenges/{slug}/check-ins/',
+        {'date': date.isoformat(), 'note': 'Benchmark check-in'},
+        content_type='application/json',
+        **auth,
+    )
+
+
+def _worker(number, usernames, slug, start_at, duration, queue):
+    counter = _capture_logging()
+    rng = random.Random(number)
+    client = Client(raise_request_exception=False)
+    username = usernames[number % len(usernames)]
+    ops, weights = list(MIX), list(MIX.values())
+    latencies, failed, token = [], 0, None
+
+    time.sleep(max(0.0, start_at - time.time()))
+    while time.time() < start_at + duration:
+        op = 'login' if token is None else rng.choices(ops, weights)[0]
+        started = time.perf_counter()
+        response = _request(client, op, username, token, rng, slug)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500 or (op == 'login' and response.status_code != 200):
+            failed += 1
+        elif op == 'login':
+            token = response.json()['tokens']['access']
+    connections.close_all()
+    queue.put({'latencies': latencies, 'failed': failed, 'locked': counter.count})
+
+
+class Command(BaseCommand):
+    help = "Load a scratch copy of the schema from concurrent worker processes and count SQLite lock errors"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent worker processes")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per mode")
+        parser.add_argument('--users', type=int, default=40)
+        parser.add_argument(
+            '--mode',
+            choices=['both', 'default', 'tuned'],
+            default='both',
+            help="'default' is plain SQLite (rollback journal, deferred transactions); 'tuned' uses settings",
+        )
+
+    def handle(self, *args, **options):
+        if not sqlite.is_sqlite():
+            raise CommandError("The default database isn't SQLite.")
+
+        modes = {
+            'default': DEFAULT_MODE,
+            'tuned': {'journal_mode': 'WAL', 'options': dict(connection.settings_dict['OPTIONS'])},
+        }
+        if options['mode'] != 'both':
+            modes = {options['mode']: modes[options['mode']]}
+
+        directory = tempfile.mkdtemp(prefix='benchmark-sqlite-')
+        original_name = connection.settings_dict['NAME']
+        original_options = connection.settings_dict['OPTIONS']
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher']  # keep password hashing off the clock
+        try:
+            with override_settings(PASSWORD_HASHERS=hashers, EVENT_BUS_SYNC=True, ALLOWED_HOSTS=['testserver']):
+                connection.close()
+                connection.settings_dict['NAME'] = os.path.join(directory, 'db.sqlite3')
+                self.stdout.write(f"Migrating a scratch database in {directory} ...")
+                call_command('migrate', verbosity=0, interactive=False)
+                usernames, slug = self.seed(options['users'])
+
+                self.stdout.write(
+                    f"{options['workers']} workers, {options['duration']:.0f} s per mode, mix {MIX}\n"
+                    f"{'mode':<8} {'requests':>9} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+                    f"{'max ms':>7} {'failed':>7} {'locked':>7}"
+                )
+                results = {}
+                for name, mode in modes.items():
+                    results[name] = self.run_mode(mode, usernames, slug, options['workers'], options['duration'])
+        finally:
+            connections.close_all()
+            connection.settings_dict['NAME'] = original_name
+            connection.settings_dict['OPTIONS'] = original_options
+            shutil.rmtree(directory, ignore_errors=True)
+
+        if 'tuned' in results:
+            if results['tuned']['locked'] or results['tuned']['failed']:
+                self.stdout.write(self.style.WARNING("The tuned configuration still hit errors."))
+            else:
+                self.stdout.write(self.style.SUCCESS("No lock errors or failed requests with the tuned configuration."))
+
+    def seed(self, count):
+        challenge = Challenge(name='Benchmark Challenge', slug='benchmark-challenge', hashtag='#Benchmark')
+        challenge.save()
+        usernames = []
+        for i in range(count):
+            user = User.objects.create_user(username=f'bench{i}', email=f'bench{i}@example.com', password=PASSWORD)
+            join_challenge(user, challenge)
+            Post.objects.bulk_create(
+                Post(user=user, input_text=f'Benchmark note {n}', content=f'Benchmark post {n}', status='draft')
+                for n in range(20)
+            )
+            usernames.append(user.username)
+        return usernames, challenge.slug
+
+    def run_mode(self, mode, usernames, slug, workers, duration):
+        connection.settings_dict['OPTIONS'] = mode['options']
+        connections.close_all()
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode = {mode['journal_mode']}")
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        start_at = time.time() + 0.5
+        processes = [
+            context.Process(target=_worker, args=(number, usernames, slug, start_at, duration, queue))
+            for number in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        reports = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        latencies = sorted(latency * 1000 for report in reports for latency in report['latencies'])
+        result = {
+            'requests': len(latencies),
+            'failed': sum(report['failed'] for report in reports),
+            'locked': sum(report['locked'] for report in reports),
+        }
+        name = 'tuned' if mode['options'] else 'default'
+        if not latencies:
+            self.stdout.write(f"{name:<8} no requests completed")
+            return result
+        centiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f"{name:<8} {len(latencies):>9} {len(latencies) / duration:>7.0f} {centiles[49]:>7.1f} "
+            f"{centiles[94]:>7.1f} {centiles[98]:>7.1f} {latencies[-1]:>7.0f} "
+            f"{result['failed']:>7} {result['locked']:>7}"
+        )
+        return result
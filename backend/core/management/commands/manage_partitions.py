@@ -0,0 +1,73 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.partitioning import (
+    PARTITIONED_MODELS,
+    clear_dangling_references,
+    default_partition_rows,
+    ensure_partitions,
+    expire_partition,
+    expired_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly history partitions and expire old ones (PostgreSQL; run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help="Months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=settings.HISTORY_RETENTION_MONTHS,
+            help="Expire partitions older than this many months (0 keeps everything)",
+        )
+        parser.add_argument('--drop', action='store_true', help="Drop expired partitions instead of detaching them")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be expired")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(f"History tables are only partitioned on PostgreSQL, not {connection.vendor}.")
+            return
+
+        for label, column in PARTITIONED_MODELS.items():
+            model = apps.get_model(label)
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                if not is_partitioned(cursor, table):
+                    self.stderr.write(f"{table} is not partitioned; run migrate first.")
+                    continue
+
+            if not options['dry_run']:
+                for name in ensure_partitions(table, column, options['months_ahead']):
+                    self.stdout.write(f"Created {name}")
+
+            stray = default_partition_rows(table)
+            if stray:
+                self.stderr.write(self.style.WARNING(
+                    f"{table}_default holds {stray} row(s) outside the monthly partitions"
+                ))
+
+            if not options['retention_months']:
+                continue
+            expired = expired_partitions(table, options['retention_months'])
+            action = 'Dropped' if options['drop'] else 'Detached'
+            for name in expired:
+                if options['dry_run']:
+                    self.stdout.write(f"Would expire {name}")
+                    continue
+                expire_partition(table, name, drop=options['drop'])
+                self.stdout.write(f"{action} {name}")
+            if expired and not options['dry_run']:
+                for related, count in clear_dangling_references(model).items():
+                    self.stdout.write(f"Cleared {count} {related} row(s) that referenced expired {table} rows")
+
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Run in a fresh interpreter: load the WSGI app the way a worker does, then the URLconf
+# (which imports every view), and report time, memory and module count
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from config.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+rss = next(int(line.split()[1]) for line in open('/proc/self/status') if line.startswith('VmRSS'))
+print(json.dumps({'elapsed': elapsed, 'rss_kb': rss, 'modules': len(sys.modules)}))
+"""
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class Command(BaseCommand):
+    help = "Measure worker startup (time, RSS, modules) and report import-time hotspots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Rows per table")
+        parser.add_argument('--preload', action='store_true', help="Include the preload warm-up (core.warmup)")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+        env['WSGI_PRELOAD'] = 'True' if options['preload'] else 'False'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+        summary = json.loads(result.stdout.strip().splitlines()[-1])
+        rows = self.parse(result.stderr)
+
+        self.stdout.write(
+            f"Startup: {summary['elapsed'] * 1000:.0f} ms, RSS {summary['rss_kb'] / 1024:.1f} MB, "
+            f"{summary['modules']} modules loaded ({'with' if options['preload'] else 'without'} preload warm-up)"
+        )
+
+        # Self time per top-level package
+        packages = defaultdict(lambda: [0, 0])
+        for self_us, _, _, name, _ in rows:
+            packages[name.split('.')[0]][0] += self_us
+            packages[name.split('.')[0]][1] += 1
+        self.stdout.write("\nImport time by top-level package (self time):")
+        for package, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:options['top']]:
+            self.stdout.write(f"  {package:<30} {self_us / 1000:8.1f} ms  {count:5d} modules")
+
+        # The import that first pulled in each package, and the first-party module behind it
+        local = {app.name.split('.')[0] for app in self.local_apps()} | {'config'}
+        first = {}
+        for row in rows:
+            package = row[3].split('.')[0]
+            if package not in local and (package not in first or row[1] > first[package][1]):
+                first[package] = row
+        self.stdout.write("\nHeaviest third-party imports (cumulative) and what imported them:")
+        for _, cumulative_us, _, name, chain in sorted(first.values(), key=lambda row: -row[1])[:options['top']]:
+            origin = next((parent for parent in chain if parent.split('.')[0] in local), None)
+            via = chain[0] if chain else ''
+            trail = f"{via} ... {origin}" if origin and origin != via else (origin or via or '(top level)')
+            self.stdout.write(f"  {name:<30} {cumulative_us / 1000:8.1f} ms  <- {trail}")
+
+    def local_apps(self):
+        from django.apps import apps
+        base = str(settings.BASE_DIR)
+        return [app for app in apps.get_app_configs() if app.path.startswith(base)]
+
+    def parse(self, output):
+        """
+        Parse -X importtime output into (self_us, cumulative_us, depth, module, importer chain) rows
+        """
+        parsed = []
+        for line in output.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                parsed.append((int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+        # Children are printed before their parent, so walk backwards keeping the open chain
+        rows = []
+        stack = []
+        for self_us, cumulative_us, depth, name in reversed(parsed):
+            del stack[depth:]
+            rows.append((self_us, cumulative_us, depth, name, list(reversed(stack))))
+            stack.append(name)
+        rows.reverse()
+        return rows
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import sqlite
+
+
+class Command(BaseCommand):
+    help = "Checkpoint the SQLite WAL and refresh planner statistics (run hourly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--checkpoint-mode',
+            default='TRUNCATE',
+            choices=sqlite.CHECKPOINT_MODES,
+            type=str.upper,
+            help="PRAGMA wal_checkpoint mode",
+        )
+        parser.add_argument('--skip-optimize', action='store_true', help="Only checkpoint the WAL")
+
+    def handle(self, *args, **options):
+        if not sqlite.is_sqlite():
+            self.stdout.write("Not an SQLite database; nothing to do.")
+            return
+
+        settings = sqlite.pragmas()
+        if settings['journal_mode'] != 'wal':
+            raise CommandError(f"journal_mode is {settings['journal_mode']!r}; the SQLite OPTIONS in settings aren't applied.")
+
+        before = sqlite.wal_size()
+        busy, wal_frames, checkpointed = sqlite.checkpoint(options['checkpoint_mode'])
+        after = sqlite.wal_size()
+        message = (
+            f"WAL checkpoint ({options['checkpoint_mode']}): {checkpointed} of {wal_frames} frame(s) copied, "
+            f"WAL {before / 1024:.0f} KiB -> {after / 1024:.0f} KiB."
+        )
+        self.stdout.write(self.style.WARNING(message) if busy else self.style.SUCCESS(message))
+
+        if not options['skip_optimize']:
+            sqlite.optimize()
+            self.stdout.write(self.style.SUCCESS("Planner statistics refreshed (PRAGMA optimize)."))
@@ -0,0 +1,256 @@
+"""
+Per-user LLM usage metering and daily token quotas.
+
+Generations report their token counts with record(); nothing is written
+on the request path. Counts are aggregated in memory per (user, UTC day)
+and flushed in batches to the UsageRollup table by a background thread,
+every USAGE_FLUSH_INTERVAL seconds or sooner once USAGE_FLUSH_MAX_PENDING
+users have pending counts. Each flush is one INSERT ... ON CONFLICT DO
+UPDATE per 500 users, so several processes can flush concurrently.
+
+Quotas are checked against an in-memory total: the user's stored total,
+read once per process and day and refreshed from every flush (RETURNING),
+plus whatever this process has not flushed yet. Usage by other processes
+shows up after their next flush, so a hard quota can be overshot by at
+most a flush interval's worth of concurrent usage.
+
+Quota tokens are input + cache writes + output; cache reads are billed at
+a tenth of the input price and are not counted.
+"""
+import atexit
+import datetime
+import logging
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+
+from . import metrics
+from .db import upsert_increment
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('requests', 'input_tokens', 'output_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens')
+
+
+class QuotaExceeded(Throttled):
+    """
+    Raised when a user has used up their daily token quota
+    """
+
+    def __init__(self, used, quota, retry_after):
+        self.used = used
+        self.quota = quota
+        self.retry_after = retry_after
+        super().__init__(wait=retry_after, detail="Daily token quota exceeded.")
+
+
+def quota_tokens(input_tokens, cache_creation_input_tokens, output_tokens):
+    return input_tokens + cache_creation_input_tokens + output_tokens
+
+
+def _today():
+    return timezone.now().date()
+
+
+def seconds_until_reset():
+    """
+    Seconds until quotas reset at the next UTC midnight
+    """
+    now = timezone.now()
+    tomorrow = datetime.datetime.combine(
+        now.date() + datetime.timedelta(days=1),
+        datetime.time.min,
+        tzinfo=now.tzinfo,
+    )
+    return (tomorrow - now).total_seconds()
+
+
+class UsageMeter:
+    """
+    In-memory usage aggregation with batched flushes to UsageRollup
+    """
+
+    def __init__(self, flush_interval, max_pending, soft_quota, hard_quota):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.soft_quota = soft_quota
+        self.hard_quota = hard_quota
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._flushing = {}
+        self._stored = {}
+        self._warned = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def record(self, user_id, counts):
+        """
+        Add one generation's token counts (a dict keyed by FIELDS) to the user's usage
+        """
+        key = (user_id, _today())
+        with self._lock:
+            values = self._pending.setdefault(key, [0] * len(FIELDS))
+            values[0] += 1
+            for index, name in enumerate(FIELDS[1:], start=1):
+                values[index] += counts.get(name, 0)
+            pending = len(self._pending)
+
+        self._start_flusher()
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+        if self.soft_quota and key not in self._warned and self.used(user_id) >= self.soft_quota:
+            self._warned.add(key)
+            metrics.increment('usage_soft_quota_exceeded_total')
+            logger.warning(f"User {user_id} passed the daily soft token quota of {self.soft_quota}")
+
+    def used(self, user_id):
+        """
+        Quota tokens used by the user today, without a database read after the first call
+        """
+        key = (user_id, _today())
+        with self._lock:
+            stored = self._stored.get(key)
+        if stored is None:
+            stored = self._load(key)
+            with self._lock:
+                # A flush may have stored a fresher total in the meantime
+                stored = self._stored.setdefault(key, stored)
+
+        with self._lock:
+            unflushed = [counts[key] for counts in (self._pending, self._flushing) if key in counts]
+        # Positions in FIELDS: 1 input, 4 cache writes, 2 output
+        return stored + sum(quota_tokens(values[1], values[4], values[2]) for values in unflushed)
+
+    def check_quota(self, user_id):
+        """
+        Raise QuotaExceeded if the user is over the hard quota; return usage otherwise
+        """
+        used = self.used(user_id)
+        if self.hard_quota and used >= self.hard_quota:
+            metrics.increment('usage_hard_quota_rejections_total')
+            raise QuotaExceeded(used, self.hard_quota, seconds_until_reset())
+        return used
+
+    def status(self, user_id):
+        used = self.used(user_id)
+        if self.hard_quota and used >= self.hard_quota:
+            state = 'hard_limited'
+        elif self.soft_quota and used >= self.soft_quota:
+            state = 'soft_limited'
+        else:
+            state = 'ok'
+        return {
+            'day': _today(),
+            'tokens_used': used,
+            'soft_quota': self.soft_quota or None,
+            'hard_quota': self.hard_quota or None,
+            'status': state,
+            'resets_in': int(seconds_until_reset()),
+        }
+
+    def _load(self, key):
+        from .models import UsageRollup
+
+        row = UsageRollup.objects.filter(user_id=key[0], day=key[1]).values_list(
+            'input_tokens', 'cache_creation_input_tokens', 'output_tokens'
+        ).first()
+        return quota_tokens(*row) if row else 0
+
+    def flush(self):
+        """
+        Write pending counts to UsageRollup; return the number of rows written
+        """
+        from .models import UsageRollup
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._flushing, self._pending = self._pending, {}
+                batch = self._flushing
+
+            rows = [
+                {'user_id': user_id, 'day': day, **dict(zip(FIELDS, values))}
+                for (user_id, day), values in batch.items()
+            ]
+            try:
+                totals = self._write(UsageRollup, rows)
+            except Exception:
+                logger.exception(f"Usage flush of {len(rows)} row(s) failed; will retry")
+                with self._lock:
+                    for key, values in batch.items():
+                        pending = self._pending.setdefault(key, [0] * len(FIELDS))
+                        for index, value in enumerate(values):
+                            pending[index] += value
+                    self._flushing = {}
+                metrics.increment('usage_flushes_total', result='failed')
+                return 0
+
+            today = _today()
+            with self._lock:
+                self._stored.update(totals)
+                self._flushing = {}
+                # Yesterday's totals are no longer needed for quota checks
+                for key in [key for key in self._stored if key[1] < today]:
+                    del self._stored[key]
+                self._warned = {key for key in self._warned if key[1] >= today}
+
+        metrics.increment('usage_flushes_total', result='succeeded')
+        metrics.increment('usage_rows_flushed_total', len(rows))
+        return len(rows)
+
+    def _write(self, model, rows):
+        """
+        Upsert rows and return {(user_id, day): stored quota tokens}
+        """
+        returning = ('user_id', 'day', 'input_tokens', 'cache_creation_input_tokens', 'output_tokens')
+        try:
+            with transaction.atomic():
+                returned = upsert_increment(model, rows, ('user_id', 'day'), FIELDS, returning=returning)
+        except IntegrityError:
+            # Usage of users deleted since it was recorded can't be stored
+            from django.contrib.auth.models import User
+            existing = set(User.objects.filter(pk__in={row['user_id'] for row in rows}).values_list('pk', flat=True))
+            rows = [row for row in rows if row['user_id'] in existing]
+            with transaction.atomic():
+                returned = upsert_increment(model, rows, ('user_id', 'day'), FIELDS, returning=returning)
+
+        totals = {}
+        for user_id, day, input_tokens, cache_creation, output_tokens in returned:
+            if isinstance(day, str):
+                # Raw cursors on SQLite return dates as text
+                day = datetime.date.fromisoformat(day)
+            totals[(user_id, day)] = quota_tokens(input_tokens, cache_creation, output_tokens)
+        return totals
+
+    def _start_flusher(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run_flusher, name='usage-flusher', daemon=True)
+            self._thread.start()
+        atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connections.close_all()
+
+
+meter = UsageMeter(
+    flush_interval=settings.USAGE_FLUSH_INTERVAL,
+    max_pending=settings.USAGE_FLUSH_MAX_PENDING,
+    soft_quota=settings.LLM_DAILY_TOKEN_SOFT_QUOTA,
+    hard_quota=settings.LLM_DAILY_TOKEN_HARD_QUOTA,
+)
@@ -0,0 +1,57 @@
+"""
+Minimal in-process metrics registry.
+
+Counters and gauges live in this process only; each worker reports its own
+values through the metrics endpoint. Names follow Prometheus conventions so
+they can be scraped or forwarded later without renaming.
+"""
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    rendered = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f'{name}{{{rendered}}}'
+
+
+def increment(name, value=1, **labels):
+    """
+    Add `value` to a counter
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """
+    Set a gauge to its current value
+    """
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+
+def snapshot():
+    """
+    Return a copy of all counters and gauges
+    """
+    with _lock:
+        return {
+            'counters': dict(sorted(_counters.items())),
+            'gauges': dict(sorted(_gauges.items())),
+        }
+
+
+def reset():
+    """
+    Clear all metrics
+    """
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
@@ -1,6 +1,14 @@
 import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
 from django.utils.deprecation import MiddlewareMixin
 
+from .concurrency import ConcurrencyLimits, queue_time
+
 # Thread-local storage to store the current user
 _thread_locals = threading.local()
 
@@ -41,3 +49,100 @@ def set_current_user(user):
     Set the current user in thread-local storage
     """
     _thread_locals.user = user
+
+
+class AdaptiveConcurrencyMiddleware:
+    """
+    Shed requests beyond each route group's adaptive concurrency limit.
+
+    Shed requests get a 503 with Retry-After before any other work is done.
+    Routes in CONCURRENCY_EXEMPT_ROUTES (health checks, metrics) are never
+    shed, so probes keep answering while the expensive groups are saturated.
+    Latency counts from X-Request-Start when the proxy sets it, so time
+    spent queued before reaching Django is included. Streaming responses
+    hold their slot until the stream ends or the response is closed.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limits = ConcurrencyLimits(settings.CONCURRENCY_GROUPS, settings.CONCURRENCY_EXEMPT_ROUTES)
+
+    def __call__(self, request):
+        try:
+            route_name = resolve(request.path_info).view_name
+        except Resolver404:
+            route_name = None
+        limit = self.limits.for_route(route_name)
+        if limit is None:
+            return self.get_response(request)
+
+        queued = queue_time(request.headers.get('X-Request-Start'))
+        if not limit.try_acquire(queued):
+            response = JsonResponse({
+                'error': 'Server is busy',
+                'details': 'Too many concurrent requests; please retry shortly'
+            }, status=503)
+            response['Retry-After'] = str(limit.retry_after())
+            return response
+
+        started = time.monotonic()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            limit.release(queued + time.monotonic() - started, failed=True)
+            raise
+
+        # Latency is time to response headers; for streams that excludes the stream itself
+        latency = queued + time.monotonic() - started
+        failed = response.status_code >= 500
+        if response.streaming:
+            stream = _AsyncReleasingStream if response.is_async else _SyncReleasingStream
+            response.streaming_content = stream(response.streaming_content, partial(limit.release, latency, failed))
+        else:
+            limit.release(latency, failed)
+        return response
+
+
+class _ReleasingStream:
+    """
+    Streaming content that calls `release` once, when the stream ends or is closed.
+
+    The server closes the response when it's done with it, whether the stream
+    finished, the client went away or it never started; assigning this as
+    streaming_content registers its close() with the response. A generator
+    wouldn't do: closing one that never started skips its finally block.
+    """
+
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+
+    def close(self):
+        release, self.release = self.release, None
+        if release is not None:
+            release()
+
+
+class _SyncReleasingStream(_ReleasingStream):
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except StopIteration:
+            self.close()
+            raise
+
+
+class _AsyncReleasingStream(_ReleasingStream):
+    # No __iter__: StreamingHttpResponse treats anything iterable as sync
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await anext(self.content)
+        except StopAsyncIteration:
+            self.close()
+            raise
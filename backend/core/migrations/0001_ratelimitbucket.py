@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200, unique=True)),
+                ('level', models.FloatField(help_text='Tokens available as of `updated`; negative while callers are queued')),
+                ('updated', models.FloatField(help_text='Unix time the level was computed at')),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Rate limit bucket',
+                'verbose_name_plural': 'Rate limit buckets',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_ratelimitbucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='UTC day the usage was recorded on')),
+                ('requests', models.PositiveBigIntegerField(default=0)),
+                ('input_tokens', models.PositiveBigIntegerField(default=0)),
+                ('output_tokens', models.PositiveBigIntegerField(default=0)),
+                ('cache_read_input_tokens', models.PositiveBigIntegerField(default=0)),
+                ('cache_creation_input_tokens', models.PositiveBigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Usage rollup',
+                'verbose_name_plural': 'Usage rollups',
+                'indexes': [models.Index(fields=['day'], name='usage_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='usage_rollup_user_day_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='fingerprint',
+            field=models.CharField(help_text='HMAC-SHA-256 of the parsed request data, without password fields', max_length=64),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # Create a new app called 'core' for shared models
 # python manage.py startapp core
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -108,3 +109,91 @@ class SoftDeleteModel(BaseModel):
         if user:
             self.updated_by = user
         self.save(update_fields=['is_deleted', 'deleted_at', 'deleted_by', 'updated_by'])
+
+
+class RateLimitBucket(models.Model):
+    """
+    Shared token bucket state for core.ratelimit.DatabaseBackend.
+
+    Updated on every rate-limited call, so it deliberately skips the audit
+    fields of BaseModel.
+    """
+    key = models.CharField(max_length=200, unique=True)
+    level = models.FloatField(help_text="Tokens available as of `updated`; negative while callers are queued")
+    updated = models.FloatField(help_text="Unix time the level was computed at")
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Rate limit bucket"
+        verbose_name_plural = "Rate limit buckets"
+
+    def __str__(self):
+        return f"{self.key}: {self.level:.1f}"
+
+
+class UsageRollup(models.Model):
+    """
+    LLM token usage per user per day, written in batches by core.metering.
+
+    Like RateLimitBucket this is a counter table updated on the hot path's
+    behalf, so it skips BaseModel's audit fields.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='usage_rollups')
+    day = models.DateField(help_text="UTC day the usage was recorded on")
+    requests = models.PositiveBigIntegerField(default=0)
+    input_tokens = models.PositiveBigIntegerField(default=0)
+    output_tokens = models.PositiveBigIntegerField(default=0)
+    cache_read_input_tokens = models.PositiveBigIntegerField(default=0)
+    cache_creation_input_tokens = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Usage rollup"
+        verbose_name_plural = "Usage rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='usage_rollup_user_day_uniq'),
+        ]
+        indexes = [
+            # Billing runs and reports over a date range
+            models.Index(fields=['day'], name='usage_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"Usage of user {self.user_id} on {self.day}"
+
+    @property
+    def quota_tokens(self):
+        return self.input_tokens + self.cache_creation_input_tokens + self.output_tokens
+
+
+class IdempotencyKey(models.Model):
+    """
+    A request made with an Idempotency-Key header and its stored response,
+    see core.idempotency
+    """
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    # SHA-256 of (user, method, path, key), so keys only collide within one client's requests
+    scope = models.CharField(max_length=64, unique=True)
+    fingerprint = models.CharField(max_length=64, help_text="HMAC-SHA-256 of the parsed request data, without password fields")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PROCESSING)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_data = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    response_headers = models.JSONField(default=dict, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lease of the request still processing")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Idempotency key"
+        verbose_name_plural = "Idempotency keys"
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope[:12]} ({self.status})"
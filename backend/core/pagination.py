@@ -0,0 +1,290 @@
+import base64
+import binascii
+import datetime
+import json
+import logging
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_count(queryset):
+    """
+    Return the query planner's row estimate for a queryset.
+
+    Uses table statistics instead of running COUNT(*), so the result is
+    approximate. Returns None when no estimate is available.
+    """
+    connection = connections[queryset.db]
+    try:
+        if connection.vendor == 'postgresql':
+            return _estimate_count_postgresql(queryset, connection)
+        if connection.vendor == 'sqlite':
+            return _estimate_count_sqlite(queryset, connection)
+    except DatabaseError as e:
+        logger.warning(f"Row estimate failed for {queryset.model._meta.db_table}: {str(e)}")
+    return None
+
+
+def _estimate_count_postgresql(queryset, connection):
+    """
+    Use pg_class.reltuples for whole tables, EXPLAIN for filtered querysets
+    """
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            if row and row[0] >= 0:
+                return row[0]
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _estimate_count_sqlite(queryset, connection):
+    """
+    Use sqlite_stat1 (populated by ANALYZE / PRAGMA optimize) for whole tables
+    """
+    if queryset.query.where:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    if not row or not row[0]:
+        return None
+    return int(row[0].split()[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django Paginator that trusts planner estimates on large tables.
+
+    Meant for the admin changelist, where an exact COUNT(*) over a big table
+    costs more than rendering the page. Small or unestimated results still
+    get an exact count.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = None
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed, unique ordering.
+
+    Pages are selected with a WHERE clause on the last seen ordering values
+    rather than OFFSET, so deep pages cost the same as the first one, and no
+    COUNT(*) is issued. Cursors are opaque base64 tokens.
+
+    The default ordering is (created_at, id) from BaseModel, newest first.
+    Views may override it with a `keyset_ordering` attribute; the ordering
+    must end in a unique field and its columns should be covered by a
+    composite index on the model. Ordering fields must not be nullable.
+
+    Clients can pass `include_total=true` to get an `estimated_total` taken
+    from planner statistics.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    include_total_query_param = 'include_total'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        self.estimated_total = None
+        if self.include_total(request):
+            self.estimated_total = estimate_count(queryset)
+
+        ordering = self._invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, capped at max_page_size
+        """
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def include_total(self, request):
+        """
+        Whether the client asked for an estimated total
+        """
+        value = request.query_params.get(self.include_total_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.estimated_total is not None:
+            payload['estimated_total'] = self.estimated_total
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'previous': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'estimated_total': {
+                    'type': 'integer',
+                    'example': 123,
+                },
+                'results': schema,
+            },
+        }
+
+    def encode_cursor(self, position, reverse):
+        """
+        Build a URL carrying an opaque cursor for the given position
+        """
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, default=self._encode_value, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """
+        Return (position, reverse) from the request cursor, or (None, False)
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            values = payload['p']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError('cursor does not match ordering')
+            position = [
+                self._get_field(model, name.lstrip('-')).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error,
+                FieldDoesNotExist, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get('r'))
+
+    def _position(self, instance):
+        return [getattr(instance, name.lstrip('-')) for name in self.ordering]
+
+    @staticmethod
+    def _encode_value(value):
+        # Keep full microsecond precision, DjangoJSONEncoder truncates to ms
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        return str(value)
+
+    @staticmethod
+    def _get_field(model, name):
+        if name == 'pk':
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+
+    @staticmethod
+    def _keyset_filter(ordering, position):
+        """
+        Build (a < x) OR (a = x AND b < y) ... for the given ordering
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
@@ -0,0 +1,318 @@
+"""
+Monthly range partitioning for history tables on PostgreSQL.
+
+Post and check-in history only grows, and nearly every read is about
+recent months. Partitioned by month, each partition keeps its own small
+indexes; queries that filter on the partition column only scan the
+matching months (partition pruning); and expiring old history is a
+DETACH/DROP of whole months instead of a row-by-row DELETE.
+
+    posts_post          partitioned by created_at
+    challenges_checkin  partitioned by date (it's in the unique constraint
+                        and what check-in reads filter on)
+
+Partitions are named <table>_pYYYY_MM. A <table>_default partition catches
+rows outside them so an insert never fails; ensure_partitions() moves such
+rows into a proper partition once it exists. Run manage.py
+manage_partitions daily to keep PARTITION_MONTHS_AHEAD months created and
+to expire months older than HISTORY_RETENTION_MONTHS.
+
+Postgres requires the partition column in the primary key, so the tables'
+key is (id, column). Django still treats id as the primary key; ids come
+from one sequence and stay unique. Foreign keys can't reference id alone
+on a partitioned table, so fields pointing at these models use
+db_constraint=False and rely on Django's on_delete handling.
+
+On other databases everything here is a no-op.
+"""
+import datetime
+import logging
+import re
+
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# model label -> partition column
+PARTITIONED_MODELS = {
+    'posts.Post': 'created_at',
+    'challenges.CheckIn': 'date',
+}
+
+
+def month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _qn(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(%s)",
+        [table],
+    )
+    row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def _column_type(cursor, table, column):
+    cursor.execute(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = %s::regclass AND attname = %s",
+        [table, column],
+    )
+    return cursor.fetchone()[0]
+
+
+def _bound(column_type, month):
+    # Literals built from dates we computed; DDL can't take bind parameters
+    if column_type == 'date':
+        return f"'{month.isoformat()}'"
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _insertable_columns(cursor, table):
+    cursor.execute(
+        """
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+        """,
+        [table],
+    )
+    return ', '.join(_qn(name) for name, in cursor.fetchall())
+
+
+def _index_definitions(cursor, table):
+    cursor.execute(
+        "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND NOT indisprimary",
+        [table],
+    )
+    # Indexes of a partitioned parent are reported as ON ONLY <table>
+    return [definition.replace(' ON ONLY ', ' ON ', 1) for definition, in cursor.fetchall()]
+
+
+def _foreign_keys(cursor, table):
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _rebuild(cursor, table, column=None, months_ahead=3):
+    """
+    Copy `table` into a new table partitioned by month on `column` (or a plain one
+    when column is None), keeping its name, indexes, constraints and id sequence
+    """
+    old = f"{table}__rebuild"
+    indexes = _index_definitions(cursor, table)
+    foreign_keys = _foreign_keys(cursor, table)
+    cursor.execute(f"SELECT max(id) FROM {_qn(table)}")
+    max_id, = cursor.fetchone()
+
+    cursor.execute(f"ALTER TABLE {_qn(table)} RENAME TO {_qn(old)}")
+    partition_by = f" PARTITION BY RANGE ({_qn(column)})" if column else ""
+    cursor.execute(
+        f"CREATE TABLE {_qn(table)} (LIKE {_qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+        f"INCLUDING GENERATED INCLUDING STORAGE){partition_by}"
+    )
+    # The old id default belongs to the old table's sequence, which goes with it
+    cursor.execute(f"ALTER TABLE {_qn(table)} ALTER COLUMN id DROP DEFAULT")
+
+    if column:
+        cursor.execute(f"SELECT min({_qn(column)}), max({_qn(column)}) FROM {_qn(old)}")
+        earliest, latest = cursor.fetchone()
+        current = month_start(timezone.now())
+        first = month_start(earliest) if earliest else current
+        last = max(add_months(current, months_ahead), month_start(latest) if latest else current)
+        column_type = _column_type(cursor, table, column)
+        month = first
+        while month <= last:
+            _create_partition(cursor, table, column_type, month)
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {_qn(table + '_default')} PARTITION OF {_qn(table)} DEFAULT")
+
+    columns = _insertable_columns(cursor, old)
+    cursor.execute(f"INSERT INTO {_qn(table)} ({columns}) SELECT {columns} FROM {_qn(old)}")
+    cursor.execute(f"DROP TABLE {_qn(old)}")
+
+    sequence = f"{table}_id_seq"
+    cursor.execute(f"CREATE SEQUENCE {_qn(sequence)} OWNED BY {_qn(table)}.id")
+    cursor.execute("SELECT setval(%s, %s, %s)", [sequence, max_id or 1, max_id is not None])
+    cursor.execute(f"ALTER TABLE {_qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}'::regclass)")
+
+    key = f"id, {_qn(column)}" if column else "id"
+    cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(table + '_pkey')} PRIMARY KEY ({key})")
+    for definition in indexes:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}")
+    cursor.execute(f"ANALYZE {_qn(table)}")
+
+
+def partition_table(schema_editor, table, column, months_ahead=3):
+    """
+    Migration helper: convert `table` to monthly partitions on `column` (PostgreSQL only)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            _rebuild(cursor, table, column, months_ahead)
+
+
+def unpartition_table(schema_editor, table):
+    """
+    Migration helper: turn a partitioned `table` back into a plain one
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            _rebuild(cursor, table)
+
+
+def _create_partition(cursor, table, column_type, month):
+    cursor.execute(
+        f"CREATE TABLE {_qn(partition_name(table, month))} PARTITION OF {_qn(table)} "
+        f"FOR VALUES FROM ({_bound(column_type, month)}) TO ({_bound(column_type, add_months(month, 1))})"
+    )
+
+
+def list_partitions(cursor, table):
+    """
+    Monthly partitions of `table` as {month: name}
+    """
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+        [table],
+    )
+    pattern = re.compile(rf'^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$')
+    partitions = {}
+    for name, in cursor.fetchall():
+        match = pattern.match(name)
+        if match:
+            partitions[datetime.date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def ensure_partitions(table, column, months_ahead, connection=None, today=None):
+    """
+    Create missing partitions from the current month to `months_ahead` months on;
+    return the names created
+    """
+    connection = connection or default_connection
+    current = month_start(today or timezone.now())
+    created = []
+    with connection.cursor() as cursor:
+        existing = list_partitions(cursor, table)
+        column_type = _column_type(cursor, table, column)
+        default = table + '_default'
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(
+                    f"SELECT 1 FROM {_qn(default)} WHERE {_qn(column)} >= {_bound(column_type, month)} "
+                    f"AND {_qn(column)} < {_bound(column_type, add_months(month, 1))} LIMIT 1"
+                )
+                if cursor.fetchone():
+                    _move_out_of_default(cursor, table, column, column_type, month)
+                else:
+                    _create_partition(cursor, table, column_type, month)
+            created.append(partition_name(table, month))
+    return created
+
+
+def _move_out_of_default(cursor, table, column, column_type, month):
+    """
+    Create the month's partition when the default partition already holds some of its rows
+    """
+    name = partition_name(table, month)
+    low, high = _bound(column_type, month), _bound(column_type, add_months(month, 1))
+    cursor.execute(
+        f"CREATE TABLE {_qn(name)} (LIKE {_qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+        f"INCLUDING GENERATED INCLUDING STORAGE)"
+    )
+    columns = _insertable_columns(cursor, name)
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {_qn(table + '_default')} "
+        f"WHERE {_qn(column)} >= {low} AND {_qn(column)} < {high} RETURNING *) "
+        f"INSERT INTO {_qn(name)} ({columns}) SELECT {columns} FROM moved"
+    )
+    logger.warning(f"Moved {cursor.rowcount} row(s) of {table} from the default partition to {name}")
+    cursor.execute(f"ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(name)} FOR VALUES FROM ({low}) TO ({high})")
+
+
+def expired_partitions(table, retention_months, connection=None, today=None):
+    """
+    Partitions whose whole month is older than `retention_months`, oldest first
+    """
+    connection = connection or default_connection
+    cutoff = add_months(month_start(today or timezone.now()), -retention_months)
+    with connection.cursor() as cursor:
+        partitions = list_partitions(cursor, table)
+    return [name for month, name in sorted(partitions.items()) if month < cutoff]
+
+
+def expire_partition(table, name, drop=False, connection=None):
+    """
+    Detach a partition from `table`, keeping it as a standalone table unless `drop`
+    """
+    connection = connection or default_connection
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_qn(table)} DETACH PARTITION {_qn(name)}")
+        if drop:
+            cursor.execute(f"DROP TABLE {_qn(name)}")
+        else:
+            # A detached partition keeps the parent's id default, which would pin its sequence
+            cursor.execute(f"ALTER TABLE {_qn(name)} ALTER COLUMN id DROP DEFAULT")
+
+
+def default_partition_rows(table, connection=None):
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {_qn(table + '_default')}")
+        return cursor.fetchone()[0]
+
+
+def clear_dangling_references(model):
+    """
+    Apply on_delete to rows that point at `model` rows removed with a partition.
+
+    Dropping a partition bypasses Django's on_delete handling, and the foreign
+    keys involved have no database constraint to catch it.
+    """
+    from django.db import models
+
+    cleared = {}
+    for relation in model._meta.related_objects:
+        field = relation.field
+        if not field.concrete or field.db_constraint:
+            continue
+        dangling = (
+            relation.related_model._base_manager.filter(**{f'{field.attname}__isnull': False})
+            .exclude(**{f'{field.attname}__in': model._base_manager.values('pk')})
+        )
+        if relation.on_delete is models.SET_NULL:
+            count = dangling.update(**{field.attname: None})
+        elif relation.on_delete is models.CASCADE:
+            count = dangling.delete()[0]
+        else:
+            continue
+        if count:
+            cleared[relation.related_model._meta.label] = count
+    return cleared
@@ -0,0 +1,253 @@
+"""
+Token-bucket rate limiting for outbound LLM calls.
+
+Every call draws from a global requests bucket, a global tokens bucket and
+the same two buckets for the calling user, so neither a single user nor a
+bug can exhaust the provider's rate limits for everyone else.
+
+Buckets hand out reservations rather than refusals: a caller that arrives
+when a bucket is short debits it anyway (the level goes negative) and sleeps
+until its share has refilled. Later callers see the deeper deficit and wait
+behind it, so waiting callers are served in arrival order instead of racing
+each other on retries. Per-user buckets cap how much of that queue any one
+user can occupy. A caller is only refused, with a Retry-After of exactly
+how long the buckets need, when its wait would exceed max_wait.
+
+Two backends keep the bucket state: MemoryBackend for a single process,
+and DatabaseBackend (the RateLimitBucket table) for deployments with
+several workers sharing the same provider limits.
+"""
+import functools
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+from rest_framework.exceptions import Throttled
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# rate is in units per second; capacity bounds bursts
+Limit = namedtuple('Limit', ['key', 'scope', 'capacity', 'rate'])
+
+# Optimistic-locking retries in the database backend before giving up
+MAX_CONFLICT_RETRIES = 10
+
+
+class RateLimited(Throttled):
+    """
+    Raised when a call would have to wait longer than allowed.
+
+    Subclasses DRF's Throttled, so an API view that lets it propagate
+    answers 429 with a Retry-After header.
+    """
+
+    def __init__(self, retry_after, scope):
+        self.retry_after = retry_after
+        self.scope = scope
+        super().__init__(wait=retry_after, detail=f"Rate limit exceeded ({scope}).")
+
+
+def plan_reservation(limits, costs, states, now, max_wait):
+    """
+    Work out the bucket levels after a reservation and how long it must wait.
+
+    states maps key -> (level, updated); missing buckets start full.
+    Returns (new_states, wait) or raises RateLimited.
+    """
+    new_states = {}
+    wait = 0.0
+    scope = None
+    for limit, cost in zip(limits, costs):
+        level, updated = states.get(limit.key, (limit.capacity, now))
+        level = min(limit.capacity, level + max(now - updated, 0.0) * limit.rate)
+        # A single call can never need more than a full bucket
+        cost = min(cost, limit.capacity)
+        if level < cost:
+            needed = (cost - level) / limit.rate
+            if needed > wait:
+                wait, scope = needed, limit.scope
+        new_states[limit.key] = (level - cost, now)
+
+    if wait > max_wait:
+        raise RateLimited(wait, scope)
+    return new_states, wait
+
+
+def plan_refund(limits, amounts, states, now):
+    """
+    Bucket levels after returning unused tokens
+    """
+    new_states = {}
+    for limit, amount in zip(limits, amounts):
+        if limit.key not in states:
+            continue
+        level, updated = states[limit.key]
+        level = min(limit.capacity, level + max(now - updated, 0.0) * limit.rate + amount)
+        new_states[limit.key] = (level, now)
+    return new_states, None
+
+
+class MemoryBackend:
+    """
+    Bucket state in this process only
+    """
+
+    def __init__(self):
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def transact(self, keys, plan):
+        with self.lock:
+            new_states, result = plan(self.states, time.monotonic())
+            self.states.update(new_states)
+        return result
+
+
+class DatabaseBackend:
+    """
+    Bucket state in the RateLimitBucket table, shared by every worker.
+
+    Rows are locked with SELECT ... FOR UPDATE where supported and updated
+    with a version check, which also keeps SQLite (no row locks) correct.
+    SQLite may also refuse the write outright ("database is locked") when
+    two transactions upgrade their read locks at once; that is retried too.
+    """
+
+    def transact(self, keys, plan):
+        from .models import RateLimitBucket
+
+        for attempt in range(MAX_CONFLICT_RETRIES):
+            try:
+                with transaction.atomic():
+                    rows = {
+                        row.key: row
+                        for row in RateLimitBucket.objects.select_for_update().filter(key__in=keys).order_by('key')
+                    }
+                    states = {key: (row.level, row.updated) for key, row in rows.items()}
+                    new_states, result = plan(states, time.time())
+                    if self._write(RateLimitBucket, rows, new_states):
+                        return result
+                    transaction.set_rollback(True)
+            except OperationalError:
+                if attempt == MAX_CONFLICT_RETRIES - 1:
+                    raise
+            time.sleep(random.uniform(0, 0.005 * 2 ** attempt))
+        raise RateLimited(1.0, 'contention')
+
+    def _write(self, model, rows, new_states):
+        for key, (level, updated) in new_states.items():
+            row = rows.get(key)
+            if row is None:
+                try:
+                    with transaction.atomic():
+                        model.objects.create(key=key, level=level, updated=updated)
+                except IntegrityError:
+                    # Created concurrently; start over with its state
+                    return False
+                continue
+            written = model.objects.filter(pk=row.pk, version=row.version).update(
+                level=level,
+                updated=updated,
+                version=F('version') + 1,
+            )
+            if not written:
+                return False
+        return True
+
+
+# debits: what each bucket was actually charged (costs are capped at capacity)
+Reservation = namedtuple('Reservation', ['limits', 'debits'])
+
+
+class RateLimiter:
+    """
+    Global and per-user request and token buckets
+    """
+
+    def __init__(self, backend, global_rpm, global_tpm, user_rpm, user_tpm, max_wait):
+        self.backend = backend
+        self.global_limits = [
+            Limit('llm:global:requests', 'global', global_rpm, global_rpm / 60),
+            Limit('llm:global:tokens', 'global', global_tpm, global_tpm / 60),
+        ]
+        self.user_rpm = user_rpm
+        self.user_tpm = user_tpm
+        self.max_wait = max_wait
+
+    def limits_for(self, user_id):
+        return [
+            Limit(f'llm:user:{user_id}:requests', 'user', self.user_rpm, self.user_rpm / 60),
+            Limit(f'llm:user:{user_id}:tokens', 'user', self.user_tpm, self.user_tpm / 60),
+        ] + self.global_limits
+
+    def reserve(self, user_id, tokens):
+        """
+        Reserve one request and `tokens` tokens; return (reservation, seconds to wait)
+        """
+        limits = self.limits_for(user_id)
+        costs = [1, tokens, 1, tokens]
+        try:
+            wait = self.backend.transact(
+                [limit.key for limit in limits],
+                lambda states, now: plan_reservation(limits, costs, states, now, self.max_wait),
+            )
+        except RateLimited as e:
+            metrics.increment('llm_rate_limit_rejections_total', scope=e.scope)
+            logger.warning(f"LLM call for user {user_id} refused: {str(e)}")
+            raise
+        if wait:
+            metrics.increment('llm_rate_limit_wait_seconds_total', wait)
+        return Reservation(limits, [min(cost, limit.capacity) for limit, cost in zip(limits, costs)]), wait
+
+    def acquire(self, user_id, tokens):
+        """
+        Reserve capacity and sleep until it is available
+        """
+        reservation, wait = self.reserve(user_id, tokens)
+        if wait:
+            time.sleep(wait)
+        return reservation
+
+    def settle(self, reservation, actual_tokens):
+        """
+        Return tokens that were reserved but not used.
+
+        Refunds are measured against what each bucket was actually debited,
+        so a call larger than a bucket's capacity gets back no more than it took.
+        """
+        used = [1, actual_tokens, 1, actual_tokens]
+        amounts = [max(0, debit - cost) for debit, cost in zip(reservation.debits, used)]
+        if not any(amounts):
+            return
+        self.backend.transact(
+            [limit.key for limit in reservation.limits],
+            lambda states, now: plan_refund(reservation.limits, amounts, states, now),
+        )
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'database': DatabaseBackend,
+}
+
+
+@functools.lru_cache(maxsize=1)
+def llm_limiter():
+    """
+    The limiter configured by the LLM_RATE_LIMIT_* settings
+    """
+    return RateLimiter(
+        BACKENDS[settings.LLM_RATE_LIMIT_BACKEND](),
+        global_rpm=settings.LLM_RATE_LIMIT_GLOBAL_REQUESTS_PER_MINUTE,
+        global_tpm=settings.LLM_RATE_LIMIT_GLOBAL_TOKENS_PER_MINUTE,
+        user_rpm=settings.LLM_RATE_LIMIT_USER_REQUESTS_PER_MINUTE,
+        user_tpm=settings.LLM_RATE_LIMIT_USER_TOKENS_PER_MINUTE,
+        max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+    )
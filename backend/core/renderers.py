@@ -0,0 +1,74 @@
+import math
+import re
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Output that may hold a float orjson writes differently from the json module:
+# non-finite ones (null rather than NaN or an error) and those Python writes
+# in exponent notation (1e+16 and 5e-05 rather than 1e16 and 0.00005)
+_SUSPECT_FLOAT = re.compile(rb'null|\d[eE]|\.0000')
+
+
+def _has_unsafe_float(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value) or (value and not 1e-4 <= abs(value) < 1e16):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    Output matches JSONRenderer byte for byte for compact UTF-8 output:
+    UTC datetimes end in 'Z', U+2028/U+2029 are escaped, and anything orjson
+    does not handle natively (Decimal, lazy strings, QuerySets...) goes
+    through DRF's encoder.
+
+    Falls back to the stdlib json module when orjson isn't installed, when
+    indented output is requested, when orjson refuses the data (e.g.
+    non-string dict keys or integers wider than 64 bits), or when the data
+    holds floats orjson would write differently: NaN and Infinity (which
+    JSONRenderer rejects under STRICT_JSON) and floats in exponent notation.
+    """
+    options = 0 if orjson is None else orjson.OPT_UTC_Z
+
+    # Bound method reused across calls instead of building an encoder each time
+    _default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Only walk the data when the output could hold such a float
+        if _SUSPECT_FLOAT.search(ret) and _has_unsafe_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-safety escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,12 @@
+import random
+
+
+def backoff_delay(attempt, base=1.0, cap=300.0):
+    """
+    Exponential backoff with jitter for the given 1-based attempt number.
+
+    Returns a delay in seconds between half and all of min(cap, base * 2**(attempt - 1)),
+    so retries spread out instead of arriving in lockstep.
+    """
+    delay = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -0,0 +1,82 @@
+"""
+Upkeep for the SQLite database of single-node installs.
+
+Settings open every connection in WAL mode (see SQLITE_PRAGMAS). Commits
+append to the -wal file, and SQLite copies them back into the database
+file (a checkpoint) on its own, but only when no reader is still using
+older pages. A busy server can therefore grow the WAL without bound.
+checkpoint() forces a full checkpoint and, in TRUNCATE mode, empties the
+file. optimize() runs PRAGMA optimize. It refreshes the planner statistics
+in sqlite_stat1 for tables whose indexes need them; those statistics are
+also what core.pagination's count estimate reads.
+
+Run both with manage.py sqlite_maintenance, hourly. On other databases
+everything here is a no-op.
+"""
+import logging
+import os
+
+from django.db import connection as default_connection
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def is_sqlite(connection=None):
+    return (connection or default_connection).vendor == 'sqlite'
+
+
+def wal_size(connection=None):
+    """
+    Size of the -wal file in bytes (0 when there is none)
+    """
+    connection = connection or default_connection
+    path = f"{connection.settings_dict['NAME']}-wal"
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def pragmas(names=('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size'), connection=None):
+    """
+    Current values of the given pragmas on this connection (None for pragmas
+    that don't apply, e.g. mmap_size on an in-memory database)
+    """
+    connection = connection or default_connection
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+def checkpoint(mode='TRUNCATE', connection=None):
+    """
+    Copy the WAL back into the database file; return (busy, wal_frames, checkpointed_frames).
+
+    busy is 1 when a reader or writer kept the checkpoint from finishing.
+    """
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Unknown checkpoint mode {mode!r}; use one of {', '.join(CHECKPOINT_MODES)}")
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+        busy, wal_frames, checkpointed = cursor.fetchone()
+    if busy:
+        logger.warning(f"WAL checkpoint ({mode}) blocked: {checkpointed} of {wal_frames} frame(s) copied")
+    return busy, wal_frames, checkpointed
+
+
+def optimize(analysis_limit=1000, connection=None):
+    """
+    Let SQLite refresh the planner statistics it considers stale.
+
+    analysis_limit caps the rows ANALYZE samples per index, which keeps the
+    run short on large tables.
+    """
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        cursor.execute("PRAGMA optimize")
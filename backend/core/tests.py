@@ -1,3 +1,558 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import threading
+import unittest
+import time
+from dataclasses import dataclass
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from challenges.models import Challenge
+from challenges.streaks import record_check_in
+from posts.models import Post
+from publishing.models import OutboxMessage
+
+from .concurrency import queue_time
+from .events import Event, EventBus, publish, subscribe
+from .metering import QuotaExceeded, UsageMeter
+from .partitioning import (
+    add_months,
+    clear_dangling_references,
+    ensure_partitions,
+    expired_partitions,
+    month_start,
+)
+from .middleware import AdaptiveConcurrencyMiddleware
+from .models import UsageRollup
+from .parsers import ORJSONParser
+from . import sqlite
+from .ratelimit import MemoryBackend, RateLimiter
+from .renderers import ORJSONRenderer
+
+GROUPS = {
+    'default': {'initial_limit': 2, 'min_limit': 1, 'max_limit': 2, 'latency_target': 0.5},
+}
+
+
+@override_settings(CONCURRENCY_GROUPS=GROUPS, CONCURRENCY_EXEMPT_ROUTES=[])
+class AdaptiveConcurrencyTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def middleware(self, response):
+        return AdaptiveConcurrencyMiddleware(lambda request: response)
+
+    def test_unstarted_stream_releases_its_slot_on_close(self):
+        middleware = self.middleware(StreamingHttpResponse(iter([b'data'])))
+        response = middleware(self.factory.get('/api/v1/posts/'))
+        self.assertEqual(middleware.limits.default.inflight, 1)
+
+        # Client went away before the first chunk: the server only closes the response
+        response.close()
+        self.assertEqual(middleware.limits.default.inflight, 0)
+
+    def test_finished_stream_releases_once(self):
+        middleware = self.middleware(StreamingHttpResponse(iter([b'a', b'b'])))
+        response = middleware(self.factory.get('/api/v1/posts/'))
+        self.assertEqual(b''.join(response), b'ab')
+        response.close()
+        self.assertEqual(middleware.limits.default.inflight, 0)
+
+    def test_async_stream_releases_when_done_or_closed(self):
+        async def chunks():
+            yield b'a'
+
+        async def consume(response):
+            return [chunk async for chunk in response]
+
+        middleware = self.middleware(StreamingHttpResponse(chunks()))
+        response = middleware(self.factory.get('/api/v1/posts/'))
+        self.assertEqual(asyncio.run(consume(response)), [b'a'])
+        self.assertEqual(middleware.limits.default.inflight, 0)
+
+        middleware = self.middleware(StreamingHttpResponse(chunks()))
+        middleware(self.factory.get('/api/v1/posts/')).close()
+        self.assertEqual(middleware.limits.default.inflight, 0)
+
+    def test_requests_beyond_the_limit_are_shed(self):
+        middleware = self.middleware(StreamingHttpResponse(iter([b'data'])))
+        responses = [middleware(self.factory.get('/api/v1/posts/')) for _ in range(3)]
+        self.assertEqual([r.status_code for r in responses], [200, 200, 503])
+        self.assertIn('Retry-After', responses[2])
+
+    def test_queue_time_counts_and_long_queues_are_shed(self):
+        middleware = self.middleware(HttpResponse('ok'))
+        started = f't={time.time() - 0.3:.3f}'
+        response = middleware(self.factory.get('/api/v1/posts/', HTTP_X_REQUEST_START=started))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(middleware.limits.default.latency, 0.29)
+
+        started = f't={time.time() - 2:.3f}'
+        response = middleware(self.factory.get('/api/v1/posts/', HTTP_X_REQUEST_START=started))
+        self.assertEqual(response.status_code, 503)
+        self.assertLess(middleware.limits.default.limit, 2)
+
+
+class QueueTimeTests(SimpleTestCase):
+    def test_formats(self):
+        now = 1_700_000_000.0
+        self.assertAlmostEqual(queue_time('t=1699999999.750', now), 0.25)
+        self.assertAlmostEqual(queue_time('1699999999750', now), 0.25)
+        self.assertAlmostEqual(queue_time('1699999999750000', now), 0.25)
+
+    def test_missing_or_implausible_values_count_as_zero(self):
+        now = 1_700_000_000.0
+        self.assertEqual(queue_time(None, now), 0.0)
+        self.assertEqual(queue_time('garbage', now), 0.0)
+        self.assertEqual(queue_time('t=1700000100.0', now), 0.0)
+        self.assertEqual(queue_time('t=1.0', now), 0.0)
+
+
+class ORJSONTests(SimpleTestCase):
+    def test_floats_render_like_json_renderer(self):
+        data = {'values': [0.1, 123.0, 1e-4, 5e-05, 1.5e-07, 1e16, -1.2345678901234568e+17], 'id': 'e5f0'}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_floats_are_rejected_like_json_renderer(self):
+        for value in (float('nan'), float('inf'), float('-inf')):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                ORJSONRenderer().render({'nested': [{'value': value}]})
+
+    def test_non_finite_floats_without_strict_json(self):
+        class Lenient(ORJSONRenderer):
+            strict = False
+
+        class LenientJSON(JSONRenderer):
+            strict = False
+
+        data = {'value': float('nan'), 'other': None}
+        self.assertEqual(Lenient().render(data), LenientJSON().render(data))
+
+    def test_invalid_body_raises_the_orjson_error(self):
+        with mock.patch('json.loads') as loads, self.assertRaises(ParseError) as raised:
+            ORJSONParser().parse(io.BytesIO(b'{"input_text": '))
+
+        self.assertIn('JSON parse error', str(raised.exception.detail))
+        loads.assert_not_called()
+
+    def test_non_finite_input_is_rejected(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"value": NaN}'))
+
+
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(
+            MemoryBackend(), global_rpm=60, global_tpm=60000, user_rpm=60, user_tpm=600, max_wait=5
+        )
+
+    def levels(self):
+        return {key: level for key, (level, _) in self.limiter.backend.states.items()}
+
+    def test_refund_is_capped_at_what_each_bucket_was_debited(self):
+        # Larger than the user's bucket, which can only be charged its capacity
+        reservation, wait = self.limiter.reserve(1, 5000)
+        self.assertEqual(wait, 0)
+        self.assertEqual(reservation.debits, [1, 600, 1, 5000])
+
+        self.limiter.settle(reservation, 100)
+
+        levels = self.levels()
+        self.assertAlmostEqual(levels['llm:user:1:tokens'], 500, delta=1)
+        self.assertAlmostEqual(levels['llm:global:tokens'], 59900, delta=1)
+
+    def test_failed_call_gets_its_tokens_back(self):
+        reservation, _ = self.limiter.reserve(1, 400)
+        self.limiter.settle(reservation, 0)
+
+        levels = self.levels()
+        self.assertAlmostEqual(levels['llm:user:1:tokens'], 600, delta=1)
+        self.assertAlmostEqual(levels['llm:global:tokens'], 60000, delta=1)
+        # The request itself still counts
+        self.assertAlmostEqual(levels['llm:user:1:requests'], 59, delta=0.1)
+
+
+@mock.patch.object(UsageMeter, '_start_flusher')
+class UsageMeterTests(TestCase):
+    COUNTS = {'input_tokens': 100, 'output_tokens': 50, 'cache_read_input_tokens': 1000,
+              'cache_creation_input_tokens': 10}
+
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+
+    def meter(self, **quotas):
+        return UsageMeter(flush_interval=3600, max_pending=1000, **{'soft_quota': 0, 'hard_quota': 0, **quotas})
+
+    def test_flushes_upsert_one_row_per_user_and_day(self, _start_flusher):
+        meter = self.meter()
+        meter.record(self.user.pk, self.COUNTS)
+        # Cache reads aren't counted towards the quota
+        self.assertEqual(meter.used(self.user.pk), 160)
+        with self.assertNumQueries(0):
+            meter.used(self.user.pk)
+
+        self.assertEqual(meter.flush(), 1)
+        meter.record(self.user.pk, self.COUNTS)
+        self.assertEqual(meter.flush(), 1)
+        self.assertEqual(meter.flush(), 0)
+
+        row = UsageRollup.objects.get()
+        self.assertEqual((row.requests, row.input_tokens, row.cache_read_input_tokens), (2, 200, 2000))
+        self.assertEqual(meter.used(self.user.pk), 320)
+
+    def test_failed_flush_keeps_the_counts(self, _start_flusher):
+        meter = self.meter()
+        meter.record(self.user.pk, self.COUNTS)
+
+        with mock.patch.object(meter, '_write', side_effect=RuntimeError("database is locked")):
+            self.assertEqual(meter.flush(), 0)
+        self.assertEqual(meter.flush(), 1)
+
+        self.assertEqual(UsageRollup.objects.get().requests, 1)
+
+    def test_hard_quota_rejects_once_used_up(self, _start_flusher):
+        # Usage another process already flushed today
+        UsageRollup.objects.create(user=self.user, day=timezone.now().date(), input_tokens=900)
+        meter = self.meter(soft_quota=500, hard_quota=1000)
+
+        self.assertEqual(meter.check_quota(self.user.pk), 900)
+        self.assertEqual(meter.status(self.user.pk)['status'], 'soft_limited')
+        meter.record(self.user.pk, self.COUNTS)
+
+        with self.assertRaises(QuotaExceeded) as raised:
+            meter.check_quota(self.user.pk)
+        self.assertEqual((raised.exception.used, raised.exception.quota), (1060, 1000))
+        self.assertGreater(raised.exception.retry_after, 0)
+        self.assertEqual(meter.status(self.user.pk)['status'], 'hard_limited')
+
+
+@dataclass(frozen=True)
+class Tick(Event):
+    user_id: int
+    n: int
+
+
+class EventBusTests(TestCase):
+    def setUp(self):
+        self.handled = []
+        self.lock = threading.Lock()
+        patcher = mock.patch.dict('core.events._handlers', clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, event):
+        with self.lock:
+            self.handled.append((event.user_id, event.n, threading.current_thread().name))
+
+    @override_settings(EVENT_BUS_SYNC=True)
+    def test_dispatched_on_commit_only(self):
+        subscribe(Tick)(self.record)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish(Tick(user_id=1, n=1))
+            self.assertEqual(self.handled, [])
+            try:
+                with transaction.atomic():
+                    publish(Tick(user_id=1, n=2))
+                    raise RuntimeError("rolled back")
+            except RuntimeError:
+                pass
+
+        self.assertEqual([n for _user, n, _thread in self.handled], [1])
+
+    @override_settings(EVENT_BUS_SYNC=True)
+    def test_failing_handler_does_not_stop_the_others(self):
+        def broken(event):
+            raise ValueError("boom")
+
+        subscribe(Tick)(broken)
+        subscribe(Tick)(self.record)
+
+        with self.assertLogs('core.events', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            publish(Tick(user_id=1, n=1))
+
+        self.assertEqual(len(self.handled), 1)
+
+    @override_settings(EVENT_BUS_SYNC=False)
+    def test_each_users_events_run_in_order_on_one_lane(self):
+        def slow_record(event):
+            # Later events would overtake earlier ones if a user's events ran in parallel
+            time.sleep(0.002 * (event.n % 3))
+            self.record(event)
+
+        subscribe(Tick)(slow_record)
+        bus = EventBus(lanes=4)
+        self.addCleanup(bus.shutdown)
+
+        for n in range(20):
+            for user_id in (1, 2, 3):
+                bus.dispatch(Tick(user_id=user_id, n=n))
+        bus.flush(timeout=10)
+
+        self.assertEqual(len(self.handled), 60)
+        for user_id in (1, 2, 3):
+            events = [(n, thread) for user, n, thread in self.handled if user == user_id]
+            self.assertEqual([n for n, _thread in events], list(range(20)))
+            self.assertEqual(len({thread for _n, thread in events}), 1)
+
+
+class BootstrapTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+        record_check_in(self.user, challenge, self.user.profile.local_date())
+        self.post = Post.objects.create(user=self.user, input_text='Note', content='Shipped the bootstrap')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def get(self, path='/api/v1/bootstrap/', **headers):
+        return self.api.get(path, **headers)
+
+    def test_one_query_per_section(self):
+        # The user section comes from the request; the other four are a query each
+        with self.assertNumQueries(4):
+            response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'user', 'profile', 'challenges', 'streaks', 'posts'})
+        self.assertEqual(response.data['streaks'][0]['current_streak'], 1)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+    def test_matching_etag_gets_304(self):
+        etag = self.get()['ETag']
+
+        for tag in (etag, f'W/{etag}', f'"other", {etag}'):
+            with self.subTest(tag=tag):
+                response = self.get(HTTP_IF_NONE_MATCH=tag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertFalse(response.content)
+
+    def test_etag_changes_with_writes_that_skip_updated_at(self):
+        etag = self.get()['ETag']
+
+        # Like the outbox's status updates
+        Post.objects.filter(pk=self.post.pk).update(status='scheduled')
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['posts'][0]['status'], 'scheduled')
+
+    def test_include_and_fields_select_the_payload(self):
+        response = self.get('/api/v1/bootstrap/?include=user,posts&fields[posts]=id,status')
+
+        self.assertEqual(set(response.data), {'user', 'posts'})
+        self.assertEqual(set(response.data['posts'][0]), {'id', 'status'})
+        self.assertNotEqual(response['ETag'], self.get()['ETag'])
+
+    def test_unknown_section_or_field_is_rejected(self):
+        self.assertEqual(self.get('/api/v1/bootstrap/?include=user,badges').status_code, 400)
+        self.assertEqual(self.get('/api/v1/bootstrap/?fields[posts]=secret').status_code, 400)
+
+
+class FakePostgresCursor:
+    """
+    Answers the catalog queries core.partitioning makes and records the rest
+    """
+
+    def __init__(self, partitions, default_months=()):
+        self.partitions = partitions
+        self.default_months = default_months
+        self.executed = []
+        self.rowcount = 0
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if 'FROM pg_inherits' in sql:
+            self.rows = [(name,) for name in self.partitions]
+        elif 'format_type' in sql:
+            self.rows = [('timestamp with time zone',)]
+        elif 'FROM pg_attribute' in sql:
+            self.rows = [('id',), ('created_at',)]
+        elif sql.startswith('SELECT 1 FROM'):
+            low = sql.split('>= ')[1].split(' ')[0]
+            self.rows = [(1,)] if low.strip("'") in [month.isoformat() for month in self.default_months] else []
+        else:
+            self.rows = []
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakePostgresConnection:
+    alias = 'default'
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @contextlib.contextmanager
+    def cursor(self):
+        yield self._cursor
+
+
+class PartitioningTests(TestCase):
+    TODAY = datetime.date(2026, 11, 20)
+
+    def test_month_arithmetic_wraps_years(self):
+        self.assertEqual(month_start(self.TODAY), datetime.date(2026, 11, 1))
+        self.assertEqual(add_months(datetime.date(2026, 11, 1), 3), datetime.date(2027, 2, 1))
+        self.assertEqual(add_months(datetime.date(2026, 1, 1), -1), datetime.date(2025, 12, 1))
+
+    def test_ensure_partitions_creates_missing_months(self):
+        cursor = FakePostgresCursor(
+            ['posts_post_p2026_11', 'posts_post_p2026_12', 'posts_post_default'],
+            default_months=[datetime.date(2027, 2, 1)],
+        )
+
+        created = ensure_partitions(
+            'posts_post', 'created_at', 3, connection=FakePostgresConnection(cursor), today=self.TODAY
+        )
+
+        self.assertEqual(created, ['posts_post_p2027_01', 'posts_post_p2027_02'])
+        ddl = [sql for sql in cursor.executed if sql.startswith(('CREATE', 'ALTER', 'WITH'))]
+        self.assertIn(
+            "PARTITION OF \"posts_post\" FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2027-02-01 00:00:00+00')",
+            ddl[0],
+        )
+        # February already has rows in the default partition: they move with it
+        self.assertIn('DELETE FROM "posts_post_default"', ddl[2])
+        self.assertIn('ATTACH PARTITION "posts_post_p2027_02"', ddl[3])
+
+    def test_expired_partitions_are_whole_months_past_retention(self):
+        cursor = FakePostgresCursor([
+            'posts_post_p2026_05', 'posts_post_p2025_12', 'posts_post_p2026_04', 'posts_post_default',
+        ])
+
+        expired = expired_partitions('posts_post', 6, connection=FakePostgresConnection(cursor), today=self.TODAY)
+
+        self.assertEqual(expired, ['posts_post_p2025_12', 'posts_post_p2026_04'])
+
+    def test_dangling_references_follow_on_delete(self):
+        user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        post = Post.objects.create(user=user, input_text="Note", content="Post")
+        kept = Post.objects.create(user=user, input_text="Note", content="Post")
+        challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+        check_in, _streak = record_check_in(user, challenge, self.TODAY, post=post)
+        OutboxMessage.objects.create(user=user, post=post)
+        OutboxMessage.objects.create(user=user, post=kept)
+        # What dropping the post's partition does: the row goes without Django's on_delete
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM posts_post WHERE id = %s", [post.pk])
+
+        cleared = clear_dangling_references(Post)
+
+        self.assertEqual(cleared, {'challenges.CheckIn': 1, 'publishing.OutboxMessage': 1})
+        check_in.refresh_from_db()
+        self.assertIsNone(check_in.post_id)
+        self.assertEqual(list(OutboxMessage.objects.values_list('post_id', flat=True)), [kept.pk])
+
+    def test_command_is_a_no_op_off_postgres(self):
+        out = io.StringIO()
+
+        call_command('manage_partitions', stdout=out)
+
+        self.assertIn('only partitioned on PostgreSQL', out.getvalue())
+
+    def test_command_creates_and_expires_partitions(self):
+        command = 'core.management.commands.manage_partitions'
+        expire = mock.Mock()
+        with mock.patch(f'{command}.connection') as fake, \
+                mock.patch(f'{command}.is_partitioned', return_value=True), \
+                mock.patch(f'{command}.ensure_partitions', side_effect=lambda table, *args: [f'{table}_p2027_02']), \
+                mock.patch(f'{command}.default_partition_rows', return_value=0), \
+                mock.patch(f'{command}.expired_partitions', side_effect=lambda table, months: [f'{table}_p2024_01']), \
+                mock.patch(f'{command}.expire_partition', expire), \
+                mock.patch(f'{command}.clear_dangling_references', return_value={'challenges.CheckIn': 2}):
+            fake.vendor = 'postgresql'
+            dry_run = io.StringIO()
+            call_command('manage_partitions', '--retention-months=24', '--dry-run', stdout=dry_run)
+            expire.assert_not_called()
+
+            out = io.StringIO()
+            call_command('manage_partitions', '--retention-months=24', '--drop', stdout=out)
+
+        self.assertIn('Would expire posts_post_p2024_01', dry_run.getvalue())
+        self.assertNotIn('Created', dry_run.getvalue())
+        self.assertIn('Created challenges_checkin_p2027_02', out.getvalue())
+        expire.assert_any_call('posts_post', 'posts_post_p2024_01', drop=True)
+        self.assertIn('Cleared 2 challenges.CheckIn row(s)', out.getvalue())
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "SQLite only")
+class SQLiteMaintenanceTests(TestCase):
+    def file_database(self):
+        """
+        A connection to a throwaway database file, opened with the project's OPTIONS
+        """
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3')}, alias='maintenance'
+        )
+        self.addCleanup(database.close)
+        with database.cursor() as cursor:
+            cursor.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+            for n in range(200):
+                cursor.execute("INSERT INTO notes (body) VALUES (%s)", ['x' * 500])
+        return database
+
+    def test_every_connection_gets_the_pragmas(self):
+        database = self.file_database()
+
+        values = sqlite.pragmas(connection=database)
+
+        self.assertEqual(values['journal_mode'], 'wal')
+        self.assertEqual(values['busy_timeout'], settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(values['cache_size'], settings.SQLITE_PRAGMAS['cache_size'])
+        # synchronous = NORMAL
+        self.assertEqual(values['synchronous'], 1)
+
+    def test_truncate_checkpoint_empties_the_wal(self):
+        database = self.file_database()
+        self.assertGreater(sqlite.wal_size(connection=database), 0)
+
+        busy, wal_frames, checkpointed = sqlite.checkpoint('truncate', connection=database)
+
+        self.assertEqual(busy, 0)
+        self.assertEqual(sqlite.wal_size(connection=database), 0)
+
+    def test_unknown_checkpoint_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            sqlite.checkpoint('everything')
+
+    def test_command_checkpoints_and_optimizes(self):
+        database = self.file_database()
+        out = io.StringIO()
+
+        with mock.patch('core.sqlite.default_connection', database):
+            call_command('sqlite_maintenance', stdout=out)
+
+        self.assertIn('WAL checkpoint (TRUNCATE)', out.getvalue())
+        self.assertIn('-> 0 KiB', out.getvalue())
+        self.assertIn('PRAGMA optimize', out.getvalue())
+
+    def test_command_refuses_a_database_without_wal(self):
+        # The test database lives in memory, which can't use WAL
+        with self.assertRaisesMessage(CommandError, "journal_mode is 'memory'"):
+            call_command('sqlite_maintenance', stdout=io.StringIO())
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # Operational endpoints
+    path('metrics/', views.metrics, name='metrics'),
+
+    # Account endpoints
+    path('usage/', views.usage, name='usage'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
+]
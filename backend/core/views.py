@@ -1,3 +1,67 @@
-from django.shortcuts import render
+import logging
+import os
 
-# Create your views here.
+from django.db import connection
+from django.utils.http import parse_etags
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from . import bootstrap as bootstrap_sections
+from . import metrics as metrics_registry
+from .db import QueryCounter
+from .metering import meter
+
+logger = logging.getLogger(__name__)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    """
+    In-process counters and gauges for this worker
+    """
+    return Response({
+        'pid': os.getpid(),
+        **metrics_registry.snapshot(),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def usage(request):
+    """
+    The current user's LLM token usage and quotas for today
+    """
+    return Response({
+        'usage': meter.status(request.user.pk),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def bootstrap(request):
+    """
+    The user, profile, challenges, streaks and recent posts in one response (see core.bootstrap)
+    """
+    selection, errors = bootstrap_sections.parse_selection(request.query_params)
+    if errors:
+        return Response({
+            'error': 'Invalid bootstrap request',
+            'details': errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        data, etag = bootstrap_sections.build(request.user, selection)
+    if counter.count > len(selection):
+        logger.warning(f"Bootstrap ran {counter.count} queries for {len(selection)} section(s)")
+
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Authorization'}
+    if_none_match = request.headers.get('If-None-Match', '')
+    if if_none_match.strip() == '*' or etag in {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}:
+        metrics_registry.increment('bootstrap_responses_total', result='not_modified')
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    metrics_registry.increment('bootstrap_responses_total', result='full')
+    return Response(data, status=status.HTTP_200_OK, headers=headers)
@@ -0,0 +1,54 @@
+"""
+Warm-up for preloading (pre-forking) servers.
+
+With gunicorn's preload_app (see gunicorn.conf.py) the master imports the
+application once and forks its workers, which then share those pages
+copy-on-write. CPython undoes much of that sharing: the cyclic garbage
+collector writes to the header of every tracked object it visits, so the
+first collection in each worker copies most of the heap. warm_up() imports
+what workers would otherwise import on their first requests, closes
+anything that mustn't cross a fork, and calls gc.freeze() so the objects
+that exist now are never visited by the collector again.
+
+config.wsgi and config.asgi call it when WSGI_PRELOAD is set;
+gunicorn.conf.py sets it. Without a preloading server it only costs each
+worker the imports it might not need, so it's off by default.
+"""
+import gc
+import importlib
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    started = time.perf_counter()
+
+    # The URLconf imports every view, serializer and model module
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+
+    # DRF and simplejwt import the classes named in their settings on first use
+    from rest_framework import settings as drf_settings
+    from rest_framework_simplejwt import settings as jwt_settings
+    for module in (drf_settings, jwt_settings):
+        for name in module.IMPORT_STRINGS:
+            getattr(module.api_settings, name)
+
+    # SDKs that are otherwise imported lazily (core.lazy) on a worker's first call
+    for module in settings.WARMUP_IMPORTS:
+        importlib.import_module(module)
+
+    # Database connections must not be shared across forks
+    connections.close_all()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        f"Warmed up in {(time.perf_counter() - started) * 1000:.0f} ms; "
+        f"{gc.get_freeze_count()} objects frozen"
+    )
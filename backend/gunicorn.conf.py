@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for pre-forked deployments:
+
+    gunicorn -c gunicorn.conf.py config.wsgi
+
+The application is loaded and warmed up once in the master (preload_app,
+WSGI_PRELOAD; see core.warmup) and workers share it copy-on-write instead
+of each importing Django, DRF and the Anthropic SDK themselves.
+"""
+import multiprocessing
+import os
+
+# Read by config.wsgi while the master preloads the app
+os.environ.setdefault('WSGI_PRELOAD', 'True')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Streaming generation and job streams hold a thread per client. settings.WORKER_THREADS
+# reads the same variable to size the adaptive concurrency limits (core.concurrency)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# Recycle workers now and then so per-worker heaps don't drift far from the shared one
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 500))
@@ -0,0 +1,27 @@
+from django.contrib import admin, messages
+
+from core.pagination import EstimatedCountPaginator
+from .models import Job
+from .queue import requeue_dead_jobs
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Admin for background jobs and the dead-letter queue
+    """
+    list_display = ('id', 'task', 'status', 'user', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'task')
+    list_select_related = ('user',)
+    ordering = ('-created_at', '-id')
+    search_fields = ('^task',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('user', 'created_by', 'updated_by')
+    readonly_fields = ('locked_by', 'locked_until', 'finished_at', 'created_at', 'updated_at')
+    actions = ('requeue',)
+
+    @admin.action(description='Requeue dead jobs')
+    def requeue(self, request, queryset):
+        requeued = requeue_dead_jobs(queryset)
+        self.message_user(request, f"{requeued} job(s) requeued.", messages.SUCCESS)
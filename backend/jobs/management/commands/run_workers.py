@@ -0,0 +1,61 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.registry import registered_tasks
+from jobs.worker import Worker, run_worker_process
+
+
+class Command(BaseCommand):
+    help = "Run a pool of background job workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Number of workers")
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help="Threads suit I/O-bound jobs such as LLM calls; processes suit CPU-bound ones")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--visibility-timeout', type=int, help="Seconds a claimed job stays leased")
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is drained")
+
+    def handle(self, *args, **options):
+        worker_options = {
+            'poll_interval': options['poll_interval'],
+            'visibility_timeout': options['visibility_timeout'],
+            'burst': options['burst'],
+        }
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(
+            f"Starting {concurrency} {options['pool']} worker(s) for tasks: {', '.join(registered_tasks())}"
+        )
+
+        if options['pool'] == 'process':
+            stop_event = multiprocessing.Event()
+            # Children must not inherit open database connections
+            connections.close_all()
+            workers = [
+                multiprocessing.Process(target=run_worker_process, args=(f"p{i}", worker_options, stop_event))
+                for i in range(concurrency)
+            ]
+        else:
+            stop_event = threading.Event()
+            workers = [
+                threading.Thread(target=Worker(name=f"t{i}", **worker_options).run, args=(stop_event,))
+                for i in range(concurrency)
+            ]
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping workers after their current job...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,61 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+from core.models import BaseModel
+
+
+class Job(BaseModel):
+    """
+    A unit of background work, claimed and executed by manage.py run_workers
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+    TERMINAL_STATUSES = (STATUS_SUCCEEDED, STATUS_DEAD)
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='jobs',
+        help_text="User the job runs on behalf of, if any"
+    )
+    task = models.CharField(max_length=100, help_text="Registered task name, see jobs.registry")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    result = models.JSONField(null=True, blank=True)
+
+    # Scheduling and retries
+    run_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may run")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    # Lease held by the worker running the job; expired leases are reclaimed
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        indexes = [
+            # Claim query: due queued jobs, and running jobs with expired leases
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+            models.Index(fields=['status', 'locked_until'], name='job_status_lease_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.task}, {self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.TERMINAL_STATUSES
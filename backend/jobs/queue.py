@@ -0,0 +1,197 @@
+"""
+Database-backed job queue.
+
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it (Postgres), so concurrent workers never block on or double-claim
+the same rows. On SQLite, which serializes writers, a conditional UPDATE is
+used as a compare-and-set instead.
+
+A claim is a lease: the job stays 'running' until locked_until, after which
+another worker may reclaim it (visibility timeout). Failed jobs are retried
+with exponential backoff until max_attempts, then dead-lettered.
+"""
+import datetime
+import logging
+import traceback
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core import metrics
+from core.retry import backoff_delay
+from .models import Job
+from .registry import PermanentJobError, RetryLater, get_task
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, payload=None, user=None, run_at=None, max_attempts=None):
+    """
+    Queue a job for the named task and return it
+    """
+    job = Job(
+        task=task,
+        payload=payload or {},
+        user=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    job.save(user=user)
+    metrics.increment('jobs_enqueued_total', task=task)
+    return job
+
+
+def _due_filter(now):
+    return (
+        Q(status=Job.STATUS_QUEUED, run_at__lte=now)
+        | Q(status=Job.STATUS_RUNNING, locked_until__lt=now)
+    )
+
+
+def claim_jobs(worker_id, limit=1, visibility_timeout=None):
+    """
+    Lease up to `limit` due jobs to `worker_id` and return them
+    """
+    visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    lease = {
+        'status': Job.STATUS_RUNNING,
+        'locked_by': worker_id,
+        'locked_until': now + datetime.timedelta(seconds=visibility_timeout),
+        'attempts': F('attempts') + 1,
+        'updated_at': now,
+    }
+    connection = connections[router.db_for_write(Job)]
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(_due_filter(now))
+                .order_by('run_at', 'id')
+                .values_list('id', flat=True)[:limit]
+            )
+            if ids:
+                Job.objects.filter(pk__in=ids).update(**lease)
+    else:
+        # Look at a few extra candidates in case other workers win some races
+        candidates = (
+            Job.objects.filter(_due_filter(now))
+            .order_by('run_at', 'id')
+            .values_list('id', 'status', 'locked_until')[:limit * 4]
+        )
+        ids = []
+        for pk, status, locked_until in candidates:
+            claimed = Job.objects.filter(pk=pk, status=status, locked_until=locked_until).update(**lease)
+            if claimed:
+                ids.append(pk)
+                if len(ids) >= limit:
+                    break
+
+    if not ids:
+        return []
+    return list(Job.objects.filter(pk__in=ids, locked_by=worker_id).order_by('run_at', 'id'))
+
+
+def complete_job(job, worker_id, result=None):
+    """
+    Mark a leased job as succeeded
+    """
+    now = timezone.now()
+    updated = Job.objects.filter(pk=job.pk, locked_by=worker_id, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_SUCCEEDED,
+        result=result,
+        locked_until=None,
+        finished_at=now,
+        updated_at=now,
+    )
+    if not updated:
+        logger.warning(f"Job {job.pk} finished after its lease was lost; result discarded")
+    metrics.increment('jobs_processed_total', task=job.task, outcome='succeeded')
+    return bool(updated)
+
+
+def fail_job(job, worker_id, error, permanent=False):
+    """
+    Schedule a retry with backoff, or dead-letter the job
+    """
+    now = timezone.now()
+    values = {
+        'last_error': error[-4000:],
+        'locked_until': None,
+        'updated_at': now,
+    }
+    if permanent or job.attempts >= job.max_attempts:
+        values.update(status=Job.STATUS_DEAD, finished_at=now)
+        outcome = 'dead'
+    else:
+        delay = backoff_delay(job.attempts, base=settings.JOB_RETRY_BASE_DELAY, cap=settings.JOB_RETRY_MAX_DELAY)
+        values.update(status=Job.STATUS_QUEUED, run_at=now + datetime.timedelta(seconds=delay))
+        outcome = 'retried'
+
+    Job.objects.filter(pk=job.pk, locked_by=worker_id, status=Job.STATUS_RUNNING).update(**values)
+    metrics.increment('jobs_processed_total', task=job.task, outcome=outcome)
+    return outcome
+
+
+def defer_job(job, worker_id, delay, reason):
+    """
+    Put a leased job back in the queue without using up an attempt
+    """
+    now = timezone.now()
+    Job.objects.filter(pk=job.pk, locked_by=worker_id, status=Job.STATUS_RUNNING).update(
+        status=Job.STATUS_QUEUED,
+        run_at=now + datetime.timedelta(seconds=delay),
+        attempts=F('attempts') - 1,
+        last_error=reason,
+        locked_until=None,
+        updated_at=now,
+    )
+    metrics.increment('jobs_processed_total', task=job.task, outcome='deferred')
+    return 'deferred'
+
+
+def run_job(job, worker_id):
+    """
+    Execute a leased job's handler and record the outcome
+    """
+    handler = get_task(job.task)
+    if handler is None:
+        logger.error(f"Job {job.pk}: no handler registered for task {job.task!r}")
+        return fail_job(job, worker_id, f"Unknown task {job.task!r}", permanent=True)
+
+    if job.attempts > job.max_attempts:
+        # Leases keep expiring (e.g. the worker was killed mid-job)
+        return fail_job(job, worker_id, job.last_error or "Lease expired too many times", permanent=True)
+
+    try:
+        result = handler(job)
+    except RetryLater as e:
+        logger.info(f"Job {job.pk} ({job.task}) deferred for {e.delay:.1f}s: {str(e)}")
+        return defer_job(job, worker_id, e.delay, str(e))
+    except PermanentJobError as e:
+        logger.error(f"Job {job.pk} ({job.task}) failed permanently: {str(e)}")
+        return fail_job(job, worker_id, str(e), permanent=True)
+    except Exception:
+        error = traceback.format_exc()
+        logger.error(f"Job {job.pk} ({job.task}) failed on attempt {job.attempts}: {error.splitlines()[-1]}")
+        return fail_job(job, worker_id, error)
+
+    complete_job(job, worker_id, result)
+    return 'succeeded'
+
+
+def requeue_dead_jobs(queryset):
+    """
+    Give dead-lettered jobs a fresh set of attempts
+    """
+    now = timezone.now()
+    return queryset.filter(status=Job.STATUS_DEAD).update(
+        status=Job.STATUS_QUEUED,
+        attempts=0,
+        run_at=now,
+        finished_at=None,
+        updated_at=now,
+    )
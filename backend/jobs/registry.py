@@ -0,0 +1,57 @@
+"""
+Task registry for the job queue.
+
+Apps register handlers at import time (typically from a tasks module
+imported in AppConfig.ready):
+
+    @task('posts.generate_post')
+    def generate_post(job):
+        ...
+        return {'post_id': post.pk}
+
+A handler receives the Job and returns a JSON-serializable result.
+"""
+
+_tasks = {}
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help; the job is dead-lettered
+    """
+
+
+class RetryLater(Exception):
+    """
+    Raised by a handler to run the job again after `delay` seconds.
+
+    Used for back-pressure such as rate limits, so it does not count as a
+    failed attempt.
+    """
+
+    def __init__(self, delay, reason=''):
+        self.delay = delay
+        super().__init__(reason or f"Retry in {delay:.1f}s")
+
+
+def task(name):
+    """
+    Register the decorated function as the handler for `name`
+    """
+    def decorator(func):
+        if name in _tasks and _tasks[name] is not func:
+            raise ValueError(f"Task {name!r} is already registered")
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    """
+    Return the handler registered for `name`, or None
+    """
+    return _tasks.get(name)
+
+
+def registered_tasks():
+    return sorted(_tasks)
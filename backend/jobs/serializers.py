@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for polling a job's progress
+    """
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'task',
+            'status',
+            'result',
+            'attempts',
+            'max_attempts',
+            'run_at',
+            'finished_at',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,111 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim_jobs, complete_job, enqueue, requeue_dead_jobs, run_job
+from .registry import PermanentJobError, RetryLater
+
+
+def succeed(job):
+    return {'echo': job.payload['value']}
+
+
+def fail(job):
+    raise RuntimeError("Provider unavailable")
+
+
+def fail_permanently(job):
+    raise PermanentJobError("Post was deleted")
+
+
+def retry_later(job):
+    raise RetryLater(30, "Rate limited")
+
+
+TASKS = {
+    'tests.succeed': succeed,
+    'tests.fail': fail,
+    'tests.fail_permanently': fail_permanently,
+    'tests.retry_later': retry_later,
+}
+
+
+@mock.patch.dict('jobs.registry._tasks', TASKS)
+class JobQueueTests(TestCase):
+    def run_due(self, worker_id='worker-1'):
+        return [run_job(job, worker_id) for job in claim_jobs(worker_id, limit=10)]
+
+    def make_due(self):
+        Job.objects.update(run_at=timezone.now() - datetime.timedelta(seconds=1))
+
+    def test_job_is_claimed_once_and_its_result_stored(self):
+        job = enqueue('tests.succeed', {'value': 42})
+
+        claimed = claim_jobs('worker-1', limit=10)
+        self.assertEqual([j.pk for j in claimed], [job.pk])
+        self.assertEqual(claim_jobs('worker-2', limit=10), [])
+
+        self.assertEqual(run_job(claimed[0], 'worker-1'), 'succeeded')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), (Job.STATUS_SUCCEEDED, {'echo': 42}, 1))
+
+    def test_future_jobs_are_not_claimed(self):
+        enqueue('tests.succeed', {'value': 1}, run_at=timezone.now() + datetime.timedelta(minutes=5))
+        self.assertEqual(claim_jobs('worker-1'), [])
+
+    def test_expired_lease_is_reclaimed(self):
+        enqueue('tests.succeed', {'value': 1})
+        stale, = claim_jobs('worker-1', visibility_timeout=60)
+        Job.objects.update(locked_until=timezone.now() - datetime.timedelta(seconds=1))
+
+        reclaimed, = claim_jobs('worker-2')
+
+        self.assertEqual((reclaimed.locked_by, reclaimed.attempts), ('worker-2', 2))
+        # The first worker finishing late doesn't overwrite the new lease
+        self.assertFalse(complete_job(stale, 'worker-1', {'echo': 'late'}))
+        self.assertEqual(Job.objects.get().status, Job.STATUS_RUNNING)
+
+    def test_failures_retry_with_backoff_then_dead_letter(self):
+        enqueue('tests.fail', max_attempts=2)
+
+        self.assertEqual(self.run_due(), ['retried'])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("Provider unavailable", job.last_error)
+        self.assertEqual(self.run_due(), [])
+
+        self.make_due()
+        self.assertEqual(self.run_due(), ['dead'])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_DEAD, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_permanent_error_dead_letters_at_once(self):
+        enqueue('tests.fail_permanently', max_attempts=5)
+        self.assertEqual(self.run_due(), ['dead'])
+        self.assertEqual(Job.objects.get().last_error, "Post was deleted")
+
+    def test_unknown_task_dead_letters(self):
+        enqueue('tests.missing')
+        self.assertEqual(self.run_due(), ['dead'])
+
+    def test_retry_later_does_not_use_an_attempt(self):
+        enqueue('tests.retry_later')
+
+        self.assertEqual(self.run_due(), ['deferred'])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.last_error), (Job.STATUS_QUEUED, 0, "Rate limited"))
+        self.assertGreater(job.run_at, timezone.now() + datetime.timedelta(seconds=25))
+
+    def test_requeue_dead_job_gets_fresh_attempts(self):
+        enqueue('tests.fail', max_attempts=1)
+        self.assertEqual(self.run_due(), ['dead'])
+
+        self.assertEqual(requeue_dead_jobs(Job.objects.all()), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 0))
+        self.assertEqual(self.run_due(), ['dead'])
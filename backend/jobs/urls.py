@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+    path('<int:pk>/stream/', views.JobStreamView.as_view(), name='job_stream'),
+]
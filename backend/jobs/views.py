@@ -0,0 +1,60 @@
+import time
+
+from django.shortcuts import get_object_or_404
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.sse import sse_event, sse_response
+from .models import Job
+from .serializers import JobSerializer
+
+# Seconds between status checks while streaming, and the longest a stream stays open
+STREAM_POLL_INTERVAL = 0.5
+STREAM_MAX_DURATION = 300
+
+
+class JobDetailView(APIView):
+    """
+    Get the status (and result, once finished) of one of the user's jobs
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk, user=request.user)
+        return Response({
+            'job': JobSerializer(job).data
+        }, status=status.HTTP_200_OK)
+
+
+class JobStreamView(APIView):
+    """
+    Stream a job's status changes as Server-Sent Events
+
+    Events:
+        status: {"job": ...} whenever the status or attempt count changes
+        done:   {"job": ...} once the job has succeeded or been dead-lettered
+        timeout: if the job is still unfinished after STREAM_MAX_DURATION
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk, user=request.user)
+        return sse_response(self.event_stream(job))
+
+    def event_stream(self, job):
+        deadline = time.monotonic() + STREAM_MAX_DURATION
+        last_seen = None
+        while True:
+            seen = (job.status, job.attempts)
+            if job.is_finished:
+                yield sse_event('done', {'job': JobSerializer(job).data})
+                return
+            if seen != last_seen:
+                yield sse_event('status', {'job': JobSerializer(job).data})
+                last_seen = seen
+            if time.monotonic() >= deadline:
+                yield sse_event('timeout', {'job': {'id': job.pk}})
+                return
+            time.sleep(STREAM_POLL_INTERVAL)
+            job.refresh_from_db()
@@ -0,0 +1,60 @@
+import logging
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .queue import claim_jobs, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Polls the queue and runs jobs one at a time until stopped
+    """
+
+    def __init__(self, name=None, poll_interval=None, visibility_timeout=None, burst=False):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{name or threading.get_ident()}"
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL
+        self.visibility_timeout = visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT
+        self.burst = burst
+        self.processed = 0
+
+    def run_once(self):
+        """
+        Claim and run at most one job; return True if one was run
+        """
+        close_old_connections()
+        jobs = claim_jobs(self.worker_id, limit=1, visibility_timeout=self.visibility_timeout)
+        for job in jobs:
+            logger.info(f"{self.worker_id} running job {job.pk} ({job.task}, attempt {job.attempts})")
+            outcome = run_job(job, self.worker_id)
+            logger.info(f"{self.worker_id} job {job.pk} {outcome}")
+            self.processed += 1
+        return bool(jobs)
+
+    def run(self, stop_event):
+        """
+        Work until stop_event is set (or the queue is empty in burst mode)
+        """
+        try:
+            while not stop_event.is_set():
+                if self.run_once():
+                    continue
+                if self.burst:
+                    break
+                stop_event.wait(self.poll_interval)
+        finally:
+            connections.close_all()
+
+
+def run_worker_process(name, options, stop_event):
+    """
+    Entry point for process-pool workers
+    """
+    import django
+    django.setup()
+    Worker(name=name, **options).run(stop_event)
@@ -0,0 +1,43 @@
+from django.contrib import admin
+
+from core.pagination import EstimatedCountPaginator
+from .models import GenerationBatch, Post
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    """
+    Admin for generated posts
+    """
+    list_display = ('id', 'user', 'tone', 'status', 'model', 'is_deleted', 'created_at')
+    list_filter = ('status', 'tone', 'is_deleted')
+    list_select_related = ('user',)
+    ordering = ('-created_at', '-id')
+    search_fields = ('^user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('user', 'created_by', 'updated_by', 'deleted_by')
+    readonly_fields = (
+        'model',
+        'input_tokens',
+        'output_tokens',
+        'cache_read_input_tokens',
+        'cache_creation_input_tokens',
+        'created_at',
+        'updated_at',
+        'deleted_at',
+    )
+
+
+@admin.register(GenerationBatch)
+class GenerationBatchAdmin(admin.ModelAdmin):
+    """
+    Admin for nightly suggestion batches
+    """
+    list_display = ('provider_batch_id', 'status', 'model', 'request_count', 'succeeded_count', 'errored_count',
+                    'created_at', 'collected_at')
+    list_filter = ('status',)
+    ordering = ('-created_at',)
+    exclude = ('entries',)
+    readonly_fields = ('provider_batch_id', 'model', 'request_count', 'succeeded_count', 'errored_count',
+                       'collected_at', 'created_at', 'updated_at')
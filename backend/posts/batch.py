@@ -0,0 +1,103 @@
+"""
+Concurrent generation of several posts in one request.
+
+Backfilling a few missed days would otherwise be N sequential model calls.
+Generations are fanned out with asyncio.gather on a single event loop
+running in a background thread, limited by a per-batch semaphore, and share
+one AsyncAnthropic client so HTTP connections are pooled across batches.
+
+Finished generations are handed back through a thread-safe queue as they
+complete; the caller (a request thread) does all database work, so the
+event loop never touches the ORM.
+"""
+import asyncio
+import logging
+import queue
+import threading
+
+from django.conf import settings
+
+from core.lazy import lazy_import
+from core.metering import QuotaExceeded
+from core.ratelimit import RateLimited
+from .generation import GenerationError
+
+# Imported on first use, see core.lazy
+anthropic = lazy_import('anthropic')
+
+logger = logging.getLogger(__name__)
+
+_loop = None
+_client = None
+_lock = threading.Lock()
+
+
+def get_loop():
+    """
+    Start the shared background event loop on first use and return it
+    """
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='posts-batch-loop', daemon=True).start()
+            _loop = loop
+    return _loop
+
+
+def get_async_client():
+    """
+    AsyncAnthropic client bound to the background loop; call from that loop
+    """
+    global _client
+    if _client is None:
+        _client = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL or None,
+            timeout=settings.ANTHROPIC_TIMEOUT,
+            max_retries=settings.ANTHROPIC_MAX_RETRIES,
+        )
+    return _client
+
+
+async def _generate_all(generations, concurrency, results):
+    semaphore = asyncio.Semaphore(concurrency)
+    client = get_async_client()
+
+    async def generate(index, generation):
+        async with semaphore:
+            try:
+                await generation.agenerate(client)
+            except Exception as e:
+                # One failed entry must not take the rest of the batch down
+                if not isinstance(e, (GenerationError, RateLimited, QuotaExceeded)):
+                    logger.exception(f"Batch entry {index} failed")
+                results.put((index, generation, e))
+                return
+        results.put((index, generation, None))
+
+    try:
+        await asyncio.gather(*(generate(index, g) for index, g in enumerate(generations)))
+    finally:
+        results.put(None)
+
+
+def generate_batch(generations, concurrency=None):
+    """
+    Run PostGeneration objects concurrently.
+
+    Yields (index, generation, error) in completion order; error is None
+    on success. Closing the iterator early cancels outstanding calls.
+    """
+    concurrency = concurrency or settings.POST_BATCH_CONCURRENCY
+    results = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(_generate_all(generations, concurrency, results), get_loop())
+    try:
+        while True:
+            item = results.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,147 @@
+"""
+Content-addressed cache for generated posts.
+
+Regenerating the same daily note (or retrying after a network blip) would
+otherwise be a full paid LLM call. Entries are keyed by a hash of the
+normalized note, the tone, the prompt version, the model and the rendered
+system prompt, and stored in two tiers:
+
+    1. an in-process LRU bounded by total size and TTL
+    2. the shared 'generations' Django cache (file- or DB-backed, see
+       settings.CACHES), which applies its own TTL and MAX_ENTRIES culling
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import metrics
+from .prompts import PROMPT_VERSION
+
+_whitespace = re.compile(r'\s+')
+
+
+def normalize_input(text):
+    """
+    Canonical form of a note: NFKC, case-folded, whitespace collapsed
+    """
+    text = unicodedata.normalize('NFKC', text)
+    return _whitespace.sub(' ', text.casefold()).strip()
+
+
+def generation_cache_key(input_text, tone, model, system_prompt):
+    """
+    Hash everything that determines the model's output.
+
+    The rendered system prompt is part of the key because it carries
+    per-user context (the bio); without it users with the same note and
+    tone would share posts.
+    """
+    digest = hashlib.sha256()
+    for part in (PROMPT_VERSION, model, tone, system_prompt, normalize_input(input_text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x1f')
+    return f'post:{digest.hexdigest()}'
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process LRU with a TTL and a total size budget in bytes
+    """
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        _value, size, _expires_at = self._entries.pop(key)
+        self._size -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GenerationCache:
+    """
+    Two-tier cache for finished generations
+    """
+
+    def __init__(self, alias='generations', local_max_bytes=8 * 1024 * 1024, local_ttl=3600):
+        self.alias = alias
+        self.local = LocalLRUCache(local_max_bytes, local_ttl)
+
+    @property
+    def store(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        """
+        Return a cached generation dict, or None
+        """
+        value = self.local.get(key)
+        if value is not None:
+            metrics.increment('generation_cache_requests_total', tier='local', result='hit')
+            return value
+
+        value = self.store.get(key)
+        if value is not None:
+            metrics.increment('generation_cache_requests_total', tier='store', result='hit')
+            self.local.set(key, value, self._size(value))
+            return value
+
+        metrics.increment('generation_cache_requests_total', tier='store', result='miss')
+        return None
+
+    def set(self, key, value):
+        """
+        Store a generation dict in both tiers
+        """
+        self.local.set(key, value, self._size(value))
+        self.store.set(key, value)
+        metrics.increment('generation_cache_writes_total')
+
+    @staticmethod
+    def _size(value):
+        return len(value.get('content', '').encode('utf-8')) + 256
+
+
+generation_cache = GenerationCache(
+    local_max_bytes=settings.GENERATION_CACHE_LOCAL_MAX_BYTES,
+    local_ttl=settings.GENERATION_CACHE_LOCAL_TTL,
+)
@@ -0,0 +1,283 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+from analytics.rollups import record_many
+from core import metrics
+from core.lazy import lazy_import
+from core.metering import meter
+from core.ratelimit import llm_limiter
+from .cache import generation_cache, generation_cache_key
+from .models import Post
+from .prompts import build_system_blocks, build_user_message, system_text
+from .similarity import compute_signature, index_post
+
+# Imported on first use, see core.lazy
+anthropic = lazy_import('anthropic')
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationError(Exception):
+    """
+    Raised when the LLM provider fails to produce a post
+    """
+
+
+@functools.lru_cache(maxsize=1)
+def get_client():
+    """
+    Shared Anthropic client, so HTTP connections are pooled across requests
+    """
+    return anthropic.Anthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        base_url=settings.ANTHROPIC_BASE_URL or None,
+        timeout=settings.ANTHROPIC_TIMEOUT,
+        max_retries=settings.ANTHROPIC_MAX_RETRIES,
+    )
+
+
+def usage_counts(usage):
+    """
+    Token counts from a Messages API usage block, recorded in the metrics.
+
+    input_tokens only counts the uncached part of the prompt; tokens served
+    from or written to the provider's prompt cache are reported separately.
+    """
+    counts = {
+        'input_tokens': usage.input_tokens,
+        'output_tokens': usage.output_tokens,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', None) or 0,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', None) or 0,
+    }
+    metrics.increment('llm_input_tokens_total', counts['input_tokens'], kind='uncached')
+    metrics.increment('llm_input_tokens_total', counts['cache_read_input_tokens'], kind='cache_read')
+    metrics.increment('llm_input_tokens_total', counts['cache_creation_input_tokens'], kind='cache_write')
+    metrics.increment('llm_output_tokens_total', counts['output_tokens'])
+    return counts
+
+
+class _DatabaseThread:
+    """
+    One executor thread for a generation's limiter, meter and cache calls,
+    which may query the database. The thread keeps its connection across
+    calls and closes it once, as its last job, when the block exits.
+    """
+
+    def __enter__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='generation-db')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.executor.submit(connections.close_all)
+        self.executor.shutdown(wait=False)
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+class PostGeneration:
+    """
+    A single streamed post generation.
+
+    Iterate over stream() to receive text deltas as the model produces them;
+    content and token usage are filled in once the stream is exhausted.
+
+    Finished generations are cached (see posts.cache); a cache hit is
+    yielded as a single delta and costs no tokens. Pass use_cache=False to
+    force a fresh call (the result still refreshes the cache).
+
+    Model calls go through the LLM rate limiter and may wait for capacity;
+    core.ratelimit.RateLimited is raised if the wait would be too long, and
+    core.metering.QuotaExceeded once the user's daily token quota is used up.
+    Token usage is metered per user (see core.metering).
+    """
+
+    def __init__(self, profile, input_text, tone=None, model=None, use_cache=True):
+        self.profile = profile
+        self.input_text = input_text
+        self.tone = tone or profile.preferred_tone
+        self.model = model or settings.ANTHROPIC_MODEL
+        self.use_cache = use_cache
+        self.cached = False
+        # Set once usage has been metered, so an interrupted stream isn't metered twice
+        self.recorded = False
+        self.reused_from = None
+        self.content = ''
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_creation_input_tokens = 0
+
+    def request_params(self):
+        """
+        Messages API parameters for this generation
+        """
+        return {
+            'model': self.model,
+            'max_tokens': settings.POST_GENERATION_MAX_TOKENS,
+            'system': build_system_blocks(self.profile, self.tone),
+            'messages': [{'role': 'user', 'content': build_user_message(self.input_text)}],
+        }
+
+    def estimated_tokens(self, params):
+        """
+        Upper bound on the tokens a call will use, reserved from the rate limiter
+        """
+        prompt = system_text(params['system']) + params['messages'][0]['content']
+        return len(prompt) // 4 + params['max_tokens']
+
+    def used_tokens(self):
+        return self.input_tokens + self.cache_creation_input_tokens + self.output_tokens
+
+    def cache_key(self, params):
+        return generation_cache_key(self.input_text, self.tone, self.model, system_text(params['system']))
+
+    def load_cached(self, key):
+        """
+        Take the result from the generation cache if allowed; return True on a hit
+        """
+        if not self.use_cache:
+            return False
+        cached = generation_cache.get(key)
+        if cached is None:
+            return False
+        self.cached = True
+        self.content = cached['content']
+        self.model = cached['model']
+        return True
+
+    def finish(self, key, message, content):
+        """
+        Record the model's final message and refresh the cache
+        """
+        self.content = content.strip()
+        self.model = message.model
+        counts = usage_counts(message.usage)
+        for name, value in counts.items():
+            setattr(self, name, value)
+        meter.record(self.profile.user_id, counts)
+        self.recorded = True
+        generation_cache.set(key, {'content': self.content, 'model': self.model})
+
+    def record_partial(self, stream, text):
+        """
+        Meter an interrupted stream: the prompt usage reported when it started,
+        and output estimated from the text received so far (the final count
+        only arrives with the last event)
+        """
+        try:
+            snapshot = stream.current_message_snapshot if stream is not None else None
+        except AssertionError:
+            # Failed before message_start; nothing was reported as used
+            snapshot = None
+        if snapshot is None:
+            return
+        usage = snapshot.usage.model_copy(update={
+            'output_tokens': max(snapshot.usage.output_tokens or 0, len(text) // 4),
+        })
+        counts = usage_counts(usage)
+        for name, value in counts.items():
+            setattr(self, name, value)
+        meter.record(self.profile.user_id, counts)
+        self.recorded = True
+        metrics.increment('llm_interrupted_generations_total')
+
+    def stream(self):
+        """
+        Yield text deltas from the cache or the Messages API streaming endpoint
+        """
+        params = self.request_params()
+        key = self.cache_key(params)
+
+        if self.load_cached(key):
+            yield self.content
+            return
+
+        meter.check_quota(self.profile.user_id)
+        limiter = llm_limiter()
+        reservation = limiter.acquire(self.profile.user_id, self.estimated_tokens(params))
+        chunks = []
+        stream = None
+        try:
+            with get_client().messages.stream(**params) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    yield text
+                message = stream.get_final_message()
+            self.finish(key, message, ''.join(chunks))
+        except anthropic.APIError as e:
+            logger.error(f"Post generation failed for user {self.profile.user_id}: {str(e)}")
+            raise GenerationError(str(e)) from e
+        finally:
+            # Also reached when the stream fails part way or the client disconnects (GeneratorExit)
+            if not self.recorded:
+                self.record_partial(stream, ''.join(chunks))
+            limiter.settle(reservation, self.used_tokens())
+
+    async def agenerate(self, client):
+        """
+        Generate the post with a single non-streaming call on an AsyncAnthropic client
+        """
+        params = self.request_params()
+        key = self.cache_key(params)
+
+        # The cache and the meter may be database-backed; keep them off the event loop
+        with _DatabaseThread() as db:
+            if await db.run(self.load_cached, key):
+                return
+
+            await db.run(meter.check_quota, self.profile.user_id)
+            limiter = llm_limiter()
+            reservation, wait = await db.run(limiter.reserve, self.profile.user_id, self.estimated_tokens(params))
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+                try:
+                    message = await client.messages.create(**params)
+                except anthropic.APIError as e:
+                    logger.error(f"Post generation failed for user {self.profile.user_id}: {str(e)}")
+                    raise GenerationError(str(e)) from e
+
+                content = ''.join(block.text for block in message.content if block.type == 'text')
+                await db.run(self.finish, key, message, content)
+            finally:
+                # Failed and cancelled calls hand their reserved tokens back too
+                await db.run(limiter.settle, reservation, self.used_tokens())
+
+    def reuse(self, post):
+        """
+        Take an earlier post's text as the result instead of calling the model
+        """
+        self.reused_from = post
+        self.content = post.content
+        self.model = post.model
+
+    def save(self, user):
+        """
+        Store the finished generation as a draft post
+        """
+        post = Post(
+            user=user,
+            input_text=self.input_text,
+            content=self.content,
+            tone=self.tone,
+            model=self.model,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cache_read_input_tokens=self.cache_read_input_tokens,
+            cache_creation_input_tokens=self.cache_creation_input_tokens,
+            input_signature=compute_signature(self.input_text),
+        )
+        # Pass the user explicitly: streamed responses outlive AuditMiddleware
+        post.save(user=user)
+        index_post(post)
+        record_many([
+            (user.pk, 'posts_generated', 1, None),
+            (user.pk, f'tone:{post.tone}', 1, None),
+        ])
+        return post
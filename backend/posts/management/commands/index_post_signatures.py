@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.similarity import compute_signature
+
+
+class Command(BaseCommand):
+    help = "Compute MinHash signatures for posts that don't have one yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.filter(input_signature__isnull=True).only('id', 'input_text')
+
+        batch = []
+        updated = 0
+        for post in queryset.iterator(chunk_size=batch_size):
+            post.input_signature = compute_signature(post.input_text)
+            if post.input_signature is None:
+                continue
+            batch.append(post)
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, ['input_signature'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, ['input_signature'])
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {updated} post(s)."))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.pregeneration import collect_batches, submit_batches, suggestion_candidates
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-generate suggested posts for users with daily reminders enabled. "
+        "Run nightly: collects batches that have ended, then submits new ones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collect-only', action='store_true', help="Only collect ended batches")
+        parser.add_argument('--submit-only', action='store_true', help="Only submit new batches")
+        parser.add_argument('--wait', action='store_true', help="Wait for submitted batches and collect them")
+        parser.add_argument('--poll-interval', type=float, default=30.0)
+        parser.add_argument('--batch-size', type=int, help="Requests per Message Batch")
+        parser.add_argument('--lookback-days', type=int, help="Days of notes to base suggestions on")
+        parser.add_argument('--dry-run', action='store_true', help="Count candidates without submitting")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = sum(1 for _candidate in suggestion_candidates(options['lookback_days']))
+            self.stdout.write(f"{count} user(s) would get a suggested post.")
+            return
+
+        if not options['submit_only']:
+            self.collect()
+
+        if not options['collect_only']:
+            batches = submit_batches(batch_size=options['batch_size'], lookback_days=options['lookback_days'])
+            requests = sum(batch.request_count for batch in batches)
+            self.stdout.write(f"Submitted {len(batches)} batch(es) with {requests} request(s).")
+
+            if options['wait']:
+                while self.collect():
+                    time.sleep(options['poll_interval'])
+
+    def collect(self):
+        """
+        Collect ended batches; return the number still processing
+        """
+        collected, pending = collect_batches()
+        self.stdout.write(f"Collected {collected} batch(es), {pending} still processing.")
+        return pending
@@ -0,0 +1,46 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from posts.models import Post
+
+# Prompt cache pricing relative to regular input tokens
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
+
+class Command(BaseCommand):
+    help = "Report cached versus uncached prompt tokens for generated posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help="Report on posts generated in the last N days")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - datetime.timedelta(days=options['days'])
+        totals = Post.objects.filter(created_at__gte=since).aggregate(
+            posts=Count('id'),
+            uncached=Sum('input_tokens', default=0),
+            cache_read=Sum('cache_read_input_tokens', default=0),
+            cache_write=Sum('cache_creation_input_tokens', default=0),
+            output=Sum('output_tokens', default=0),
+        )
+        prompt_tokens = totals['uncached'] + totals['cache_read'] + totals['cache_write']
+        # Cost of the prompts in regular-input-token equivalents, with and without caching
+        billed = (
+            totals['uncached']
+            + totals['cache_write'] * CACHE_WRITE_MULTIPLIER
+            + totals['cache_read'] * CACHE_READ_MULTIPLIER
+        )
+        hit_ratio = totals['cache_read'] / prompt_tokens if prompt_tokens else 0.0
+        savings = 1 - billed / prompt_tokens if prompt_tokens else 0.0
+
+        self.stdout.write(f"Posts in the last {options['days']} day(s): {totals['posts']}")
+        self.stdout.write(f"Prompt tokens:        {prompt_tokens}")
+        self.stdout.write(f"  uncached:           {totals['uncached']}")
+        self.stdout.write(f"  read from cache:    {totals['cache_read']}")
+        self.stdout.write(f"  written to cache:   {totals['cache_write']}")
+        self.stdout.write(f"Output tokens:        {totals['output']}")
+        self.stdout.write(f"Cached share:         {hit_ratio:.1%}")
+        self.stdout.write(f"Input cost saved:     {savings:.1%}")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from posts.stub_server import StubAnthropicServer
+
+
+class Command(BaseCommand):
+    help = "Run a local stand-in for the Anthropic Messages API (streaming and Message Batches supported)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--token-delay', type=float, default=0.05,
+                            help="Seconds to wait between streamed tokens")
+        parser.add_argument('--batch-delay', type=float, default=1.0,
+                            help="Seconds before a submitted message batch ends")
+        parser.add_argument('--fail-after', type=int, default=None,
+                            help="Fail streams with an overloaded_error after this many tokens")
+
+    def handle(self, *args, **options):
+        server = StubAnthropicServer(
+            (options['host'], options['port']),
+            token_delay=options['token_delay'],
+            batch_delay=options['batch_delay'],
+            fail_after=options['fail_after'],
+            verbose=True,
+        )
+        self.stdout.write(f"Anthropic stub listening on {server.base_url}")
+        self.stdout.write(f"Set ANTHROPIC_BASE_URL={server.base_url} to use it.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
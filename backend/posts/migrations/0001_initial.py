@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Post',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated')),
+                ('is_deleted', models.BooleanField(default=False, help_text='Soft delete flag')),
+                ('deleted_at', models.DateTimeField(blank=True, help_text='Date and time when the record was deleted', null=True)),
+                ('input_text', models.TextField(help_text='Daily progress note the post was generated from', max_length=2000)),
+                ('content', models.TextField(blank=True, help_text='Generated (and possibly edited) post text')),
+                ('tone', models.CharField(choices=[('professional', 'Professional'), ('casual', 'Casual'), ('motivational', 'Motivational'), ('technical', 'Technical'), ('storytelling', 'Storytelling')], default='professional', max_length=20)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('published', 'Published')], default='draft', max_length=20)),
+                ('model', models.CharField(blank=True, help_text='LLM used to generate the post', max_length=100)),
+                ('input_tokens', models.PositiveIntegerField(default=0)),
+                ('output_tokens', models.PositiveIntegerField(default=0)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('deleted_by', models.ForeignKey(blank=True, help_text='User who deleted this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_deleted', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Post',
+                'verbose_name_plural': 'Posts',
+                'indexes': [models.Index(fields=['user', 'created_at', 'id'], name='post_user_created_idx')],
+            },
+        ),
+    ]
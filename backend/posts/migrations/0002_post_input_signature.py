@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='input_signature',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_post_input_signature'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('suggested', 'Suggested'), ('draft', 'Draft'), ('published', 'Published')], default='draft', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='GenerationBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date and time when the record was created')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Date and time when the record was last updated')),
+                ('provider_batch_id', models.CharField(max_length=100, unique=True)),
+                ('status', models.CharField(choices=[('submitted', 'Submitted'), ('collected', 'Collected'), ('failed', 'Failed')], default='submitted', max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('entries', models.JSONField(default=dict)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('succeeded_count', models.PositiveIntegerField(default=0)),
+                ('errored_count', models.PositiveIntegerField(default=0)),
+                ('collected_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last updated this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(app_label)s_%(class)s_updated', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Generation batch',
+                'verbose_name_plural': 'Generation batches',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='genbatch_status_created_idx')],
+            },
+        ),
+    ]
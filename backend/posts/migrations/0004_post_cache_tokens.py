@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_generationbatch_suggested_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='cache_creation_input_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Prompt tokens written to the prompt cache'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='cache_read_input_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Prompt tokens read from the prompt cache'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='input_tokens',
+            field=models.PositiveIntegerField(default=0, help_text='Prompt tokens not served from the prompt cache'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Full-text search index over posts, see posts.search
+
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE posts_post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(content, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(input_text, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX post_search_idx ON posts_post USING GIN (search_vector) WHERE NOT is_deleted",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS post_search_idx",
+    "ALTER TABLE posts_post DROP COLUMN IF EXISTS search_vector",
+]
+
+# External content: the FTS table stores only the index, text is read from posts_post.
+# Soft-deleted rows are kept out of the index; 'delete' must be given the old values.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        content, input_text, content='posts_post', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post WHEN new.is_deleted = 0 BEGIN
+        INSERT INTO posts_post_fts(rowid, content, input_text) VALUES (new.id, new.content, new.input_text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post WHEN old.is_deleted = 0 BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content, input_text)
+        VALUES ('delete', old.id, old.content, old.input_text);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_update AFTER UPDATE OF content, input_text, is_deleted ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content, input_text)
+        SELECT 'delete', old.id, old.content, old.input_text WHERE old.is_deleted = 0;
+        INSERT INTO posts_post_fts(rowid, content, input_text)
+        SELECT new.id, new.content, new.input_text WHERE new.is_deleted = 0;
+    END
+    """,
+    """
+    INSERT INTO posts_post_fts(rowid, content, input_text)
+    SELECT id, content, input_text FROM posts_post WHERE is_deleted = 0
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS posts_post_fts_insert",
+    "DROP TRIGGER IF EXISTS posts_post_fts_delete",
+    "DROP TRIGGER IF EXISTS posts_post_fts_update",
+    "DROP TABLE IF EXISTS posts_post_fts",
+]
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(option == 'ENABLE_FTS5' for (option,) in cursor.fetchall())
+
+
+def _run(schema_editor, postgres, sqlite):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        statements = postgres
+    elif connection.vendor == 'sqlite' and _sqlite_has_fts5(connection):
+        statements = sqlite
+    else:
+        # posts.search falls back to an unindexed scan
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, POSTGRES_BACKWARD, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_cache_tokens'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,27 @@
+# Monthly partitions for post history on PostgreSQL, see core.partitioning
+
+from django.db import migrations
+
+from core.partitioning import partition_table, unpartition_table
+
+
+def forward(apps, schema_editor):
+    partition_table(schema_editor, 'posts_post', 'created_at')
+
+
+def backward(apps, schema_editor):
+    unpartition_table(schema_editor, 'posts_post')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_publishing'),
+        # Foreign keys can't reference a partitioned table's id alone
+        ('challenges', '0002_checkin_post_no_db_constraint'),
+        ('publishing', '0002_outboxmessage_post_no_db_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
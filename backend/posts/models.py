@@ -0,0 +1,90 @@
+from django.db import models
+from django.contrib.auth.models import User
+from core.models import BaseModel, SoftDeleteModel
+from profiles.models import TONE_CHOICES
+
+
+class Post(SoftDeleteModel):
+    """
+    A LinkedIn post generated from a user's daily progress note
+    """
+    STATUS_CHOICES = [
+        ('suggested', 'Suggested'),
+        ('draft', 'Draft'),
+        ('scheduled', 'Scheduled'),
+        ('published', 'Published'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
+
+    # What the user wrote and what the model produced
+    input_text = models.TextField(max_length=2000, help_text="Daily progress note the post was generated from")
+    content = models.TextField(blank=True, help_text="Generated (and possibly edited) post text")
+    tone = models.CharField(max_length=20, choices=TONE_CHOICES, default='professional')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+
+    # Generation metadata
+    model = models.CharField(max_length=100, blank=True, help_text="LLM used to generate the post")
+    input_tokens = models.PositiveIntegerField(default=0, help_text="Prompt tokens not served from the prompt cache")
+    output_tokens = models.PositiveIntegerField(default=0)
+    cache_read_input_tokens = models.PositiveIntegerField(default=0, help_text="Prompt tokens read from the prompt cache")
+    cache_creation_input_tokens = models.PositiveIntegerField(
+        default=0,
+        help_text="Prompt tokens written to the prompt cache"
+    )
+
+    # LinkedIn publishing, see publishing.outbox
+    scheduled_at = models.DateTimeField(null=True, blank=True, help_text="When the post is due to be published")
+    published_at = models.DateTimeField(null=True, blank=True)
+    linkedin_post_urn = models.CharField(max_length=200, blank=True, null=True)
+
+    # MinHash of input_text for near-duplicate lookups, see posts.similarity
+    input_signature = models.BinaryField(null=True, blank=True, editable=False)
+
+    # Note: audit and soft delete fields are inherited from SoftDeleteModel
+
+    class Meta:
+        verbose_name = "Post"
+        verbose_name_plural = "Posts"
+        indexes = [
+            # Per-user history in keyset pagination order
+            models.Index(fields=['user', 'created_at', 'id'], name='post_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.pk} by user {self.user_id}"
+
+
+class GenerationBatch(BaseModel):
+    """
+    A Message Batch of suggested posts submitted by manage.py pregenerate_drafts
+    """
+    STATUS_SUBMITTED = 'submitted'
+    STATUS_COLLECTED = 'collected'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_SUBMITTED, 'Submitted'),
+        (STATUS_COLLECTED, 'Collected'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    provider_batch_id = models.CharField(max_length=100, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_SUBMITTED)
+    model = models.CharField(max_length=100)
+
+    # custom_id -> {'user_id', 'input_text', 'tone'} for every request in the batch
+    entries = models.JSONField(default=dict)
+    request_count = models.PositiveIntegerField(default=0)
+    succeeded_count = models.PositiveIntegerField(default=0)
+    errored_count = models.PositiveIntegerField(default=0)
+    collected_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Generation batch"
+        verbose_name_plural = "Generation batches"
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='genbatch_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Batch {self.provider_batch_id} ({self.status})"
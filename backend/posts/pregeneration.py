@@ -0,0 +1,250 @@
+"""
+Nightly pre-generation of suggested posts.
+
+Profiles with daily_reminders enabled are streamed in chunks, and each
+user's most recent notes become one request for a suggested post. All
+requests go out through the Message Batches API, which is billed at half
+the per-token price of regular calls and holds no connections open while
+the model works. A later run collects ended batches and stores the results
+as 'suggested' posts, so a reminder can point at a ready draft instead of
+making the user wait on a live generation.
+"""
+import datetime
+import logging
+from collections import defaultdict
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.rollups import record_many
+from core import metrics
+from core.lazy import lazy_import
+from core.metering import meter
+from profiles.models import Profile
+from .generation import get_client, usage_counts
+from .models import GenerationBatch, Post
+from .prompts import build_suggestion_message, build_system_blocks
+from .similarity import compute_signature
+
+# Imported on first use, see core.lazy
+anthropic = lazy_import('anthropic')
+
+logger = logging.getLogger(__name__)
+
+# Profiles (and their recent notes) loaded per query
+CHUNK_SIZE = 500
+
+# Recent notes included in each suggestion request
+MAX_NOTES = 5
+
+# Suggested posts inserted per INSERT when collecting
+INSERT_BATCH_SIZE = 500
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _pending_user_ids():
+    """
+    Users already covered by a batch that has not been collected yet
+    """
+    user_ids = set()
+    submitted = GenerationBatch.objects.filter(status=GenerationBatch.STATUS_SUBMITTED)
+    for entries in submitted.values_list('entries', flat=True):
+        user_ids.update(entry['user_id'] for entry in entries.values())
+    return user_ids
+
+
+def suggestion_candidates(lookback_days=None, now=None):
+    """
+    Yield (profile, recent_notes) for opted-in users who wrote notes recently
+    and have no suggestion for today (in their own time zone) yet. Notes are
+    oldest first.
+    """
+    now = now or timezone.now()
+    lookback_days = lookback_days or settings.POST_PREGENERATION_LOOKBACK_DAYS
+    since = now - datetime.timedelta(days=lookback_days)
+    pending = _pending_user_ids()
+
+    profiles = (
+        Profile.objects.filter(daily_reminders=True, user__is_active=True)
+        .only('id', 'user_id', 'bio', 'preferred_tone', 'timezone', 'updated_at')
+        .order_by('id')
+    )
+    for chunk in _chunks(profiles.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+        user_ids = [profile.user_id for profile in chunk]
+
+        notes = defaultdict(list)
+        rows = (
+            Post.active_objects.filter(user_id__in=user_ids, created_at__gte=since)
+            .exclude(status='suggested')
+            .order_by('user_id', '-created_at')
+            .values_list('user_id', 'input_text')
+        )
+        for user_id, input_text in rows:
+            if len(notes[user_id]) < MAX_NOTES:
+                notes[user_id].append(input_text)
+
+        start_of_day = {profile.user_id: profile.start_of_day(now) for profile in chunk}
+        skip = set(pending)
+        rows = (
+            Post.active_objects.filter(
+                user_id__in=user_ids, status='suggested', created_at__gte=min(start_of_day.values())
+            )
+            .values_list('user_id', 'created_at')
+        )
+        for user_id, created_at in rows:
+            if created_at >= start_of_day[user_id]:
+                skip.add(user_id)
+
+        for profile in chunk:
+            if notes[profile.user_id] and profile.user_id not in skip:
+                yield profile, notes[profile.user_id][::-1]
+
+
+def build_request(profile, recent_notes, model):
+    """
+    A Message Batches request and the entry needed to store its result
+    """
+    input_text = build_suggestion_message(recent_notes)
+    custom_id = f"user-{profile.user_id}"
+    request = {
+        'custom_id': custom_id,
+        'params': {
+            'model': model,
+            'max_tokens': settings.POST_GENERATION_MAX_TOKENS,
+            'system': build_system_blocks(profile, profile.preferred_tone),
+            'messages': [{'role': 'user', 'content': input_text}],
+        },
+    }
+    entry = {'user_id': profile.user_id, 'input_text': input_text, 'tone': profile.preferred_tone}
+    return custom_id, request, entry
+
+
+def submit_batches(batch_size=None, lookback_days=None, model=None, client=None):
+    """
+    Submit suggestion requests for all candidates; return the GenerationBatch rows
+    """
+    batch_size = batch_size or settings.POST_PREGENERATION_BATCH_SIZE
+    model = model or settings.ANTHROPIC_MODEL
+    client = client or get_client()
+
+    batches = []
+    for chunk in _chunks(suggestion_candidates(lookback_days), batch_size):
+        requests = []
+        entries = {}
+        for profile, recent_notes in chunk:
+            custom_id, request, entry = build_request(profile, recent_notes, model)
+            requests.append(request)
+            entries[custom_id] = entry
+
+        provider_batch = client.messages.batches.create(requests=requests)
+        batch = GenerationBatch(
+            provider_batch_id=provider_batch.id,
+            model=model,
+            entries=entries,
+            request_count=len(requests),
+        )
+        batch.save()
+        batches.append(batch)
+        metrics.increment('pregeneration_requests_total', value=len(requests))
+        logger.info(f"Submitted generation batch {provider_batch.id} with {len(requests)} request(s)")
+    return batches
+
+
+def _record_usage(usage):
+    for user_id, counts in usage:
+        meter.record(user_id, counts)
+
+
+def collect_batch(batch, client=None):
+    """
+    Store the results of an ended batch as suggested posts.
+
+    Returns False if the batch is still processing. Posts and the batch's
+    status are written in one transaction, so a failed collection can simply
+    be retried; usage is metered only once that transaction has committed,
+    so a retried collection isn't counted twice.
+    """
+    client = client or get_client()
+    try:
+        provider_batch = client.messages.batches.retrieve(batch.provider_batch_id)
+    except anthropic.NotFoundError:
+        logger.error(f"Generation batch {batch.provider_batch_id} no longer exists")
+        batch.status = GenerationBatch.STATUS_FAILED
+        batch.save(update_fields=['status', 'updated_at'])
+        return True
+    if provider_batch.processing_status != 'ended':
+        return False
+
+    succeeded = errored = 0
+    suggested = []
+    usage = []
+    with transaction.atomic():
+        posts = []
+        for item in client.messages.batches.results(batch.provider_batch_id):
+            entry = batch.entries.get(item.custom_id)
+            if entry is None:
+                continue
+            if item.result.type != 'succeeded':
+                errored += 1
+                continue
+
+            message = item.result.message
+            counts = usage_counts(message.usage)
+            usage.append((entry['user_id'], counts))
+            posts.append(Post(
+                user_id=entry['user_id'],
+                input_text=entry['input_text'],
+                content=''.join(block.text for block in message.content if block.type == 'text').strip(),
+                input_signature=compute_signature(entry['input_text']),
+                tone=entry['tone'],
+                status='suggested',
+                model=message.model,
+                **counts,
+                # bulk_create() skips BaseModel.save(), so set audit fields here
+                created_by_id=entry['user_id'],
+                updated_by_id=entry['user_id'],
+            ))
+            suggested.append((entry['user_id'], 'posts_suggested', 1, None))
+            succeeded += 1
+            if len(posts) >= INSERT_BATCH_SIZE:
+                Post.objects.bulk_create(posts)
+                posts = []
+        if posts:
+            Post.objects.bulk_create(posts)
+
+        batch.status = GenerationBatch.STATUS_COLLECTED
+        batch.succeeded_count = succeeded
+        batch.errored_count = errored
+        batch.collected_at = timezone.now()
+        batch.save(update_fields=['status', 'succeeded_count', 'errored_count', 'collected_at', 'updated_at'])
+        record_many(suggested)
+        transaction.on_commit(partial(_record_usage, usage))
+
+    metrics.increment('pregenerated_posts_total', value=succeeded, result='succeeded')
+    metrics.increment('pregenerated_posts_total', value=errored, result='errored')
+    logger.info(
+        f"Collected generation batch {batch.provider_batch_id}: "
+        f"{succeeded} suggested post(s), {errored} error(s)"
+    )
+    return True
+
+
+def collect_batches(client=None):
+    """
+    Collect every submitted batch that has ended; return (collected, still processing)
+    """
+    collected = pending = 0
+    for batch in GenerationBatch.objects.filter(status=GenerationBatch.STATUS_SUBMITTED).order_by('created_at'):
+        if collect_batch(batch, client=client):
+            collected += 1
+        else:
+            pending += 1
+    return collected, pending
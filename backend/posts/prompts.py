@@ -0,0 +1,187 @@
+"""
+Prompt construction for post generation.
+
+The system prompt is split in two. The prefix (instructions, style
+examples, the author's bio and preferred tone) is identical for every
+generation by a user until their profile changes. It is sent first and
+marked with cache_control, so the provider can serve it from its prompt
+cache instead of reprocessing it. The per-request part (a tone override
+and the note itself) follows it. The prefix is memoized locally per
+(user, profile.updated_at).
+
+Providers only cache prefixes above a minimum length (1024 tokens for
+Sonnet models); the style examples keep the prefix above it.
+
+Bump PROMPT_VERSION whenever the wording below changes in a way that would
+produce different posts for the same input.
+"""
+import threading
+from collections import OrderedDict
+
+PROMPT_VERSION = 'v2'
+
+TONE_INSTRUCTIONS = {
+    'professional': "Write in a clear, professional voice suited to recruiters and peers. Avoid slang.",
+    'casual': "Write in a relaxed, friendly voice, as if telling a friend what you worked on today.",
+    'motivational': "Write in an upbeat, encouraging voice that inspires others to keep going.",
+    'technical': "Write for a technical audience. Name the concrete tools, APIs and concepts involved.",
+    'storytelling': "Tell the day's progress as a short story with a beginning, a struggle and a payoff.",
+}
+
+BASE_INSTRUCTIONS = (
+    "You write LinkedIn posts for developers who are learning in public. "
+    "Turn the user's daily progress note into a single engaging LinkedIn post. "
+    "Keep it under 1300 characters, use short paragraphs, at most a few emojis, "
+    "and end with three to five relevant hashtags. Do not invent accomplishments "
+    "that are not in the note. Reply with the post text only."
+)
+
+
+STYLE_EXAMPLES = [
+    (
+        "Finally got JWT refresh tokens working in my Django API. Spent two hours on a clock skew bug.",
+        "Two hours. One bug. Zero regrets. \U0001f605\n\n"
+        "Today I finished wiring up JWT refresh tokens in my Django REST API. Access tokens now expire "
+        "after an hour and the client quietly swaps in a fresh one using the refresh token.\n\n"
+        "The part that ate my afternoon: tokens were being rejected as \"not yet valid\" on one machine. "
+        "The culprit was clock skew between the server and my laptop. A little leeway in the validation "
+        "settings fixed it, and now I understand the iat and nbf claims far better than I did this morning.\n\n"
+        "Lesson: when auth fails intermittently, check the clocks before you check the code.\n\n"
+        "#Django #Python #WebDevelopment #LearningInPublic",
+    ),
+    (
+        "Solved 3 leetcode mediums on sliding window. Still slow on the last one.",
+        "Three sliding window problems down today. \U0001f4aa\n\n"
+        "The first two clicked quickly once I stopped recomputing the window from scratch and started "
+        "adjusting it one element at a time. The third took me much longer: I kept shrinking the window "
+        "too eagerly and missing valid answers.\n\n"
+        "What finally helped was writing down the invariant the window has to satisfy before touching any "
+        "code. Slow is fine. Slow and understood beats fast and memorised.\n\n"
+        "Tomorrow: two more, with a timer running.\n\n"
+        "#LeetCode #Algorithms #CodingInterview #100DaysOfCode",
+    ),
+    (
+        "Deployed my side project to a VPS with nginx and gunicorn. SSL with certbot. Took all evening.",
+        "My side project has a real home on the internet now. \U0001f680\n\n"
+        "Tonight I moved it off my laptop and onto a small VPS: gunicorn serving the app, nginx in front "
+        "of it handling static files and TLS, and certbot taking care of the certificate.\n\n"
+        "None of the individual steps were hard, but getting them to agree with each other took the whole "
+        "evening. Most of my time went into file permissions and one missing proxy header.\n\n"
+        "If you have been putting off deploying because it feels intimidating: pick the smallest server "
+        "you can find and just start. You will learn more in one evening than in a week of tutorials.\n\n"
+        "#DevOps #Nginx #Deployment #BuildInPublic",
+    ),
+    (
+        "Read the first two chapters of Designing Data-Intensive Applications. Replication lag is scary.",
+        "I started Designing Data-Intensive Applications today and it has already changed how I think "
+        "about databases. \U0001f4da\n\n"
+        "The first two chapters cover reliability, scalability and data models. The idea that stuck with "
+        "me most was replication lag: a user writes something, refreshes the page, and the read goes to a "
+        "replica that has not caught up yet, so their change seems to vanish.\n\n"
+        "I had always treated \"the database\" as one consistent thing. It is not, and designing for "
+        "read-your-own-writes consistency is something I now want to try in my own projects.\n\n"
+        "Next up: chapter three on storage engines.\n\n"
+        "#SystemDesign #Databases #SoftwareEngineering #LearningInPublic",
+    ),
+    (
+        "Refactored my React form into smaller components and added tests. Found two bugs while doing it.",
+        "Refactoring is where the bugs hide. \U0001f50d\n\n"
+        "Today I split a 400-line React form into small components, each with its own tests. Writing the "
+        "tests surfaced two bugs I had never noticed: a validation message that never cleared, and a "
+        "submit button that stayed disabled after a failed request.\n\n"
+        "Neither bug was dramatic, but both would have confused real users. Small components made them "
+        "easy to reproduce, and tests mean they will stay fixed.\n\n"
+        "If a file is too big to test comfortably, it is probably trying to tell you something.\n\n"
+        "#React #JavaScript #Testing #FrontendDevelopment",
+    ),
+]
+
+STYLE_GUIDE = (
+    "Style guidance: open with a short hook line, describe what was actually done in plain language, "
+    "mention one concrete difficulty or lesson, and close with what comes next or a takeaway for readers. "
+    "Prefer specific details from the note over generic motivation. Write in the first person."
+)
+
+# Prefixes memoized per (user id, profile.updated_at)
+PREFIX_MEMO_SIZE = 2048
+_prefix_memo = OrderedDict()
+_prefix_lock = threading.Lock()
+
+
+def build_prompt_prefix(profile):
+    """
+    The stable, cacheable part of a user's system prompt
+    """
+    examples = "\n\n".join(
+        f"Example {number}\nNote: {note}\nPost:\n{post}"
+        for number, (note, post) in enumerate(STYLE_EXAMPLES, start=1)
+    )
+    parts = [
+        BASE_INSTRUCTIONS,
+        STYLE_GUIDE,
+        f"Examples of notes and the posts written from them:\n\n{examples}",
+        TONE_INSTRUCTIONS.get(profile.preferred_tone, TONE_INSTRUCTIONS['professional']),
+    ]
+    if profile.bio:
+        parts.append(f"About the author: {profile.bio}")
+    return "\n\n".join(parts)
+
+
+def get_prompt_prefix(profile):
+    """
+    Memoized build_prompt_prefix(); a profile save changes updated_at and so the key
+    """
+    key = (profile.user_id, profile.updated_at)
+    with _prefix_lock:
+        prefix = _prefix_memo.get(key)
+        if prefix is not None:
+            _prefix_memo.move_to_end(key)
+            return prefix
+
+    prefix = build_prompt_prefix(profile)
+    with _prefix_lock:
+        _prefix_memo[key] = prefix
+        while len(_prefix_memo) > PREFIX_MEMO_SIZE:
+            _prefix_memo.popitem(last=False)
+    return prefix
+
+
+def build_system_blocks(profile, tone):
+    """
+    System prompt content blocks: the cached prefix, then any per-request instructions
+    """
+    blocks = [{'type': 'text', 'text': get_prompt_prefix(profile), 'cache_control': {'type': 'ephemeral'}}]
+    if tone != profile.preferred_tone:
+        # Kept out of the prefix so a one-off tone doesn't invalidate the cached prompt
+        blocks.append({
+            'type': 'text',
+            'text': "For this post, ignore the tone guidance above. "
+                    + TONE_INSTRUCTIONS.get(tone, TONE_INSTRUCTIONS['professional']),
+        })
+    return blocks
+
+
+def system_text(blocks):
+    """
+    Flatten system blocks into plain text, e.g. for cache keys
+    """
+    return "\n\n".join(block['text'] for block in blocks)
+
+
+def build_user_message(input_text):
+    """
+    Wrap the daily progress note as the user turn
+    """
+    return f"Today's progress note:\n\n{input_text.strip()}"
+
+
+def build_suggestion_message(recent_notes):
+    """
+    Ask for a suggested next post based on the user's recent notes, oldest first
+    """
+    notes = "\n".join(f"- {note.strip()}" for note in recent_notes)
+    return (
+        "My recent daily progress notes, oldest first:\n\n"
+        f"{notes}\n\n"
+        "Write a post I could share today summarising this stretch of progress."
+    )
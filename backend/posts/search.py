@@ -0,0 +1,230 @@
+"""
+Full-text search over a user's post history.
+
+The index is maintained by the database itself, so every write path
+(Post.save(), bulk_create() in pregeneration, soft delete and restore)
+keeps it in sync within the writing transaction:
+
+- PostgreSQL: a generated tsvector column, posts_post.search_vector,
+  weighting content above the original note, with a GIN index over the
+  rows that aren't soft-deleted.
+- SQLite: an external-content FTS5 table, posts_post_fts, kept up to date
+  by triggers on posts_post that skip soft-deleted rows.
+
+Both are created by migration 0005. Any other database, or SQLite built
+without FTS5, falls back to an unranked icontains scan. SQLite drops the
+triggers whenever Django rebuilds posts_post for a schema change; run
+manage.py rebuild_search_index after such migrations to restore them.
+
+Results are ranked, scoped to one user and paginated with LIMIT/OFFSET
+(fetching one extra row instead of counting all matches). Snippets are
+HTML-escaped with matches wrapped in <mark>.
+"""
+import functools
+import html
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+from .models import Post
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Placeholders the database wraps matches in; replaced after escaping the snippet
+_START = '\x02'
+_END = '\x03'
+
+SNIPPET_WORDS = 24
+MAX_QUERY_TERMS = 16
+
+HEADLINE_OPTIONS = f'StartSel={_START}, StopSel={_END}, MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2'
+
+_terms = re.compile(r'[^\W_]+')
+
+
+def highlight(snippet):
+    """
+    Escape a database snippet and turn its match placeholders into <mark> tags
+    """
+    return html.escape(snippet or '').replace(_START, HIGHLIGHT_START).replace(_END, HIGHLIGHT_END)
+
+
+class SearchBackend:
+    """
+    Interface of the search backends
+    """
+    vendor = None
+
+    def search(self, user_id, query, limit, offset=0):
+        """
+        Return [(post_id, rank, snippet)] for the user's posts matching
+        `query`, best first. Higher ranks are better.
+        """
+        raise NotImplementedError
+
+    def rebuild(self):
+        """
+        Re-index every post that isn't soft-deleted; return the number indexed
+        """
+        return 0
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector + GIN search; queries use websearch syntax ("quotes", -exclusions, or)
+    """
+    vendor = 'postgresql'
+
+    def search(self, user_id, query, limit, offset=0):
+        # Rank and page first, then build headlines for the page only
+        sql = """
+            SELECT page.id, page.rank, ts_headline('english', page.content, page.query, %s)
+            FROM (
+                SELECT p.id, p.content, q.query, ts_rank_cd(p.search_vector, q.query) AS rank
+                FROM posts_post p, websearch_to_tsquery('english', %s) AS q(query)
+                WHERE p.user_id = %s AND NOT p.is_deleted AND p.search_vector @@ q.query
+                ORDER BY rank DESC, p.id DESC
+                LIMIT %s OFFSET %s
+            ) AS page
+            ORDER BY page.rank DESC, page.id DESC
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [HEADLINE_OPTIONS, query, user_id, limit, offset])
+            return [(post_id, rank, highlight(snippet)) for post_id, rank, snippet in cursor.fetchall()]
+
+
+# Same as migration 0005; 'delete' must be given the row's old values
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert AFTER INSERT ON posts_post WHEN new.is_deleted = 0 BEGIN
+        INSERT INTO posts_post_fts(rowid, content, input_text) VALUES (new.id, new.content, new.input_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete AFTER DELETE ON posts_post WHEN old.is_deleted = 0 BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content, input_text)
+        VALUES ('delete', old.id, old.content, old.input_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_update AFTER UPDATE OF content, input_text, is_deleted ON posts_post
+    BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content, input_text)
+        SELECT 'delete', old.id, old.content, old.input_text WHERE old.is_deleted = 0;
+        INSERT INTO posts_post_fts(rowid, content, input_text)
+        SELECT new.id, new.content, new.input_text WHERE new.is_deleted = 0;
+    END
+    """,
+]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 search; every word must match, and the last one may be a prefix
+    """
+    vendor = 'sqlite'
+
+    @staticmethod
+    def match_expression(query):
+        """
+        Turn free text into an FTS5 query without exposing FTS5 syntax to users
+        """
+        terms = _terms.findall(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return None
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def search(self, user_id, query, limit, offset=0):
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        # bm25() is lower for better matches; content counts double the note
+        sql = f"""
+            SELECT p.id, -bm25(posts_post_fts, 2.0, 1.0) AS rank,
+                   snippet(posts_post_fts, -1, '{_START}', '{_END}', '…', {SNIPPET_WORDS})
+            FROM posts_post_fts
+            JOIN posts_post p ON p.id = posts_post_fts.rowid
+            WHERE posts_post_fts MATCH %s AND p.user_id = %s AND p.is_deleted = 0
+            ORDER BY rank DESC, p.id DESC
+            LIMIT %s OFFSET %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [match, user_id, limit, offset])
+            return [(post_id, rank, highlight(snippet)) for post_id, rank, snippet in cursor.fetchall()]
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for statement in SQLITE_TRIGGERS:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO posts_post_fts(posts_post_fts) VALUES ('delete-all')")
+            cursor.execute(
+                "INSERT INTO posts_post_fts(rowid, content, input_text) "
+                "SELECT id, content, input_text FROM posts_post WHERE is_deleted = 0"
+            )
+            return cursor.rowcount
+
+
+class BasicSearchBackend(SearchBackend):
+    """
+    Unindexed fallback: newest posts containing every word
+    """
+
+    def search(self, user_id, query, limit, offset=0):
+        terms = _terms.findall(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+        posts = Post.active_objects.filter(user_id=user_id)
+        for term in terms:
+            posts = posts.filter(Q(content__icontains=term) | Q(input_text__icontains=term))
+        rows = posts.order_by('-created_at', '-id').values_list('id', 'content')[offset:offset + limit]
+        return [(post_id, 0.0, self._snippet(content, terms)) for post_id, content in rows]
+
+    @staticmethod
+    def _snippet(content, terms):
+        words = content.split()
+        lowered = [term.lower() for term in terms]
+        start = next((i for i, word in enumerate(words) if any(t in word.lower() for t in lowered)), 0)
+        window = words[max(start - SNIPPET_WORDS // 2, 0):start + SNIPPET_WORDS // 2]
+        marked = [
+            f'{_START}{word}{_END}' if any(t in word.lower() for t in lowered) else word
+            for word in window
+        ]
+        return highlight(' '.join(marked))
+
+
+def _has_fts_table():
+    try:
+        return 'posts_post_fts' in connection.introspection.table_names()
+    except DatabaseError:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
+def get_search_backend():
+    """
+    The backend for the default database
+    """
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite' and _has_fts_table():
+        return SQLiteSearchBackend()
+    return BasicSearchBackend()
+
+
+def search_posts(user, query, limit, offset=0):
+    """
+    Return ([(post, rank, snippet)], has_more) for one page of the user's matching posts
+    """
+    rows = get_search_backend().search(user.pk, query, limit + 1, offset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    posts = Post.active_objects.defer('input_signature').in_bulk([post_id for post_id, _rank, _snippet in rows])
+    return [
+        (posts[post_id], rank, snippet)
+        for post_id, rank, snippet in rows
+        if post_id in posts
+    ], has_more
@@ -0,0 +1,113 @@
+from django.conf import settings
+from rest_framework import serializers
+from profiles.models import TONE_CHOICES
+from .models import Post
+
+
+class PostSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a user's post history
+    """
+    class Meta:
+        model = Post
+        fields = [
+            'id',
+            'input_text',
+            'content',
+            'tone',
+            'status',
+            'model',
+            'input_tokens',
+            'output_tokens',
+            'cache_read_input_tokens',
+            'cache_creation_input_tokens',
+            'scheduled_at',
+            'published_at',
+            'linkedin_post_urn',
+            # Audit fields
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = [
+            'id',
+            'input_text',
+            'tone',
+            'model',
+            'input_tokens',
+            'output_tokens',
+            'cache_read_input_tokens',
+            'cache_creation_input_tokens',
+            'scheduled_at',
+            'published_at',
+            'linkedin_post_urn',
+            'created_at',
+            'updated_at',
+        ]
+
+    def validate(self, attrs):
+        # Scheduling goes through the outbox, which snapshots the content
+        if attrs.get('status') == 'scheduled' and (self.instance is None or self.instance.status != 'scheduled'):
+            raise serializers.ValidationError({'status': "Use the publish endpoint to schedule a post."})
+        if self.instance is not None and self.instance.status == 'scheduled' and (
+            attrs.get('content', self.instance.content) != self.instance.content
+            or attrs.get('status', 'scheduled') != 'scheduled'
+        ):
+            raise serializers.ValidationError("Cancel the scheduled publication before editing this post.")
+        return attrs
+
+
+class PublishPostSerializer(serializers.Serializer):
+    """
+    Input for scheduling a post on LinkedIn
+    """
+    scheduled_at = serializers.DateTimeField(required=False, help_text="Defaults to now")
+
+
+class PostSearchResultSerializer(serializers.Serializer):
+    """
+    A post matching a search, with its rank and highlighted snippet
+    """
+    post = PostSerializer()
+    rank = serializers.FloatField()
+    snippet = serializers.CharField(help_text="HTML-escaped excerpt with matches in <mark> tags")
+
+
+class GeneratePostSerializer(serializers.Serializer):
+    """
+    Input for generating a post from a daily progress note
+    """
+    input_text = serializers.CharField(max_length=2000, trim_whitespace=True)
+    tone = serializers.ChoiceField(
+        choices=TONE_CHOICES,
+        required=False,
+        help_text="Defaults to the profile's preferred tone"
+    )
+    reuse = serializers.ChoiceField(
+        choices=[('off', 'Off'), ('suggest', 'Suggest'), ('auto', 'Auto')],
+        default='suggest',
+        help_text="What to do when a similar earlier note exists: suggest it, reuse its post, or ignore it"
+    )
+
+
+class BatchEntrySerializer(serializers.Serializer):
+    """
+    One day's note in a batch generation
+    """
+    input_text = serializers.CharField(max_length=2000, trim_whitespace=True)
+    tone = serializers.ChoiceField(
+        choices=TONE_CHOICES,
+        required=False,
+        help_text="Defaults to the batch tone, then the profile's preferred tone"
+    )
+
+
+class BatchGeneratePostSerializer(serializers.Serializer):
+    """
+    Input for generating posts for several daily notes at once
+    """
+    entries = serializers.ListField(
+        child=BatchEntrySerializer(),
+        min_length=1,
+        max_length=settings.POST_BATCH_MAX_ENTRIES,
+    )
+    tone = serializers.ChoiceField(choices=TONE_CHOICES, required=False)
@@ -0,0 +1,282 @@
+"""
+Near-duplicate detection over a user's past daily notes.
+
+Daily check-ins are repetitive ("did leetcode", "did some leetcode today"),
+so exact-hash caching misses most reuse. Each note is reduced to a set of
+shingles (content words plus character 4-grams, filler words dropped) and a
+32-value MinHash signature, stored on Post.input_signature. Signatures are
+indexed per user and tone with LSH (8 bands of 4 rows), which surfaces
+candidates with an estimated Jaccard similarity above roughly 0.6. Only
+posts in the requested tone are candidates, since a reused post keeps the
+tone it was written in.
+
+Indexes live in-process, are loaded lazily from the database and are
+topped up incrementally with newer posts, so a lookup is a signature
+computation plus a few dict probes and doesn't touch the database unless a
+match is found. With 30,000 notes for one user a lookup takes well under a
+millisecond. A periodic reconciliation against the ids in the database
+picks up signatures that index_post_signatures backfilled for older posts
+and drops posts deleted by other workers.
+"""
+import hashlib
+import operator
+import random
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .cache import normalize_input
+from .models import Post
+
+NUM_PERMUTATIONS = 32
+BANDS = 8
+ROWS = NUM_PERMUTATIONS // BANDS
+
+# Only the most recent entries of each bucket are considered, and only the
+# candidates sharing the most bands are scored. This bounds lookup cost for
+# users who post the same note hundreds of times.
+MAX_CANDIDATES_PER_BAND = 16
+MAX_CANDIDATES = 32
+
+# Seconds between incremental refreshes of a loaded index from the database
+REFRESH_INTERVAL = 5.0
+
+# Seconds between full reconciliations of a loaded index with the database
+RECONCILE_INTERVAL = 60.0
+
+# Signatures fetched per query when reconciling
+LOAD_CHUNK_SIZE = 500
+
+FILLER_WORDS = frozenset("""
+    a about an and at bit did do done for got i in just little me more my of on
+    some the to today todays also worked work working day
+""".split())
+
+# Multiply-shift hashing: the top 32 bits of (a * h + b) mod 2**64, a odd
+_MASK64 = (1 << 64) - 1
+_rng = random.Random(20250531)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERMUTATIONS)]
+_words = re.compile(r'[^\W_]+')
+
+
+def shingles(text):
+    """
+    Content words and their character 4-grams
+    """
+    words = [w for w in _words.findall(normalize_input(text)) if w not in FILLER_WORDS]
+    result = set(words)
+    for word in words:
+        padded = f' {word} '
+        result.update(padded[i:i + 4] for i in range(len(padded) - 3))
+    return result
+
+
+def minhash(text):
+    """
+    MinHash signature of a note as an array of 32-bit values, or None
+    """
+    features = shingles(text)
+    if not features:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'little')
+        for f in features
+    ]
+    return array('I', [
+        min([(a * h + b) & _MASK64 for h in hashes]) >> 32
+        for a, b in _PERMUTATIONS
+    ])
+
+
+def compute_signature(text):
+    """
+    Serialized signature for Post.input_signature
+    """
+    signature = minhash(text)
+    return signature.tobytes() if signature is not None else None
+
+
+def _load_signature(data):
+    signature = array('I')
+    signature.frombytes(bytes(data))
+    return signature
+
+
+def estimate_similarity(a, b):
+    """
+    Fraction of matching MinHash values, an estimate of Jaccard similarity
+    """
+    return sum(map(operator.eq, a, b)) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over the signatures of one user's notes in one tone
+    """
+
+    def __init__(self):
+        self.signatures = {}
+        self.buckets = [{} for _ in range(BANDS)]
+        self.max_id = 0
+        self.refreshed_at = 0.0
+        self.reconciled_at = None
+        self.lock = threading.Lock()
+
+    def add(self, post_id, signature):
+        if post_id in self.signatures:
+            return
+        self.signatures[post_id] = signature
+        for band in range(BANDS):
+            key = tuple(signature[band * ROWS:(band + 1) * ROWS])
+            self.buckets[band].setdefault(key, []).append(post_id)
+        self.max_id = max(self.max_id, post_id)
+
+    def remove(self, post_id):
+        # Bucket entries are skipped lazily once the signature is gone
+        self.signatures.pop(post_id, None)
+
+    def query(self, signature, threshold):
+        """
+        Return (post_id, similarity) of the best match above threshold
+        """
+        band_hits = {}
+        for band in range(BANDS):
+            key = tuple(signature[band * ROWS:(band + 1) * ROWS])
+            for post_id in self.buckets[band].get(key, ())[-MAX_CANDIDATES_PER_BAND:]:
+                band_hits[post_id] = band_hits.get(post_id, 0) + 1
+
+        # Most shared bands first, newest first among equals
+        candidates = sorted(band_hits, key=lambda post_id: (band_hits[post_id], post_id), reverse=True)
+
+        best = None
+        for post_id in candidates[:MAX_CANDIDATES]:
+            stored = self.signatures.get(post_id)
+            if stored is None:
+                continue
+            score = estimate_similarity(signature, stored)
+            if score >= threshold and (best is None or score > best[1]):
+                best = (post_id, score)
+                if score == 1.0:
+                    break
+        return best
+
+    def __len__(self):
+        return len(self.signatures)
+
+
+def _signed_posts(user_id, tone):
+    return Post.active_objects.filter(user_id=user_id, tone=tone, input_signature__isnull=False)
+
+
+def _load(index, queryset):
+    rows = queryset.order_by('id').values_list('id', 'input_signature')
+    for post_id, data in rows.iterator(chunk_size=2000):
+        index.add(post_id, _load_signature(data))
+
+
+def _reconcile(index, user_id, tone):
+    """
+    Bring the index in line with the signed posts in the database
+    """
+    stored = set(_signed_posts(user_id, tone).values_list('id', flat=True))
+    for post_id in index.signatures.keys() - stored:
+        index.remove(post_id)
+    missing = sorted(stored - index.signatures.keys())
+    for start in range(0, len(missing), LOAD_CHUNK_SIZE):
+        _load(index, _signed_posts(user_id, tone).filter(id__in=missing[start:start + LOAD_CHUNK_SIZE]))
+
+
+class IndexRegistry:
+    """
+    Per-(user, tone) indexes kept in an LRU, loaded and refreshed from the database
+    """
+
+    def __init__(self, max_users):
+        self.max_users = max_users
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, tone):
+        key = (user_id, tone)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = NearDuplicateIndex()
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(key)
+
+        with index.lock:
+            now = time.monotonic()
+            if index.reconciled_at is None:
+                _load(index, _signed_posts(user_id, tone))
+                index.reconciled_at = index.refreshed_at = now
+            elif now - index.reconciled_at >= RECONCILE_INTERVAL:
+                _reconcile(index, user_id, tone)
+                index.reconciled_at = index.refreshed_at = now
+            elif now - index.refreshed_at >= REFRESH_INTERVAL:
+                _load(index, _signed_posts(user_id, tone).filter(id__gt=index.max_id))
+                index.refreshed_at = now
+        return index
+
+    def peek(self, user_id, tone):
+        with self._lock:
+            return self._indexes.get((user_id, tone))
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+registry = IndexRegistry(max_users=settings.POST_SIMILARITY_INDEX_MAX_USERS)
+
+
+def find_similar_post(user, input_text, tone, threshold=None):
+    """
+    Return (post, similarity) for the user's closest earlier note in `tone`, or None
+    """
+    threshold = settings.POST_SIMILARITY_THRESHOLD if threshold is None else threshold
+    signature = minhash(input_text)
+    if signature is None:
+        return None
+
+    index = registry.get(user.pk, tone)
+    with index.lock:
+        match = index.query(signature, threshold)
+    if match is None:
+        return None
+
+    post_id, score = match
+    post = Post.active_objects.filter(pk=post_id, user=user, tone=tone).first()
+    if post is None:
+        # Deleted in another worker since the index was loaded
+        with index.lock:
+            index.remove(post_id)
+        return None
+    return post, score
+
+
+def index_post(post):
+    """
+    Add a saved post to its user's index if that index is loaded
+    """
+    index = registry.peek(post.user_id, post.tone)
+    if index is None or not post.input_signature:
+        return
+    with index.lock:
+        index.add(post.pk, _load_signature(post.input_signature))
+
+
+def forget_post(post):
+    """
+    Drop a post from its user's index
+    """
+    index = registry.peek(post.user_id, post.tone)
+    if index is not None:
+        with index.lock:
+            index.remove(post.pk)
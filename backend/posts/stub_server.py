@@ -0,0 +1,308 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Speaks enough of the real wire protocol (including the streaming SSE event
+sequence and the Message Batches endpoints) for the anthropic SDK to talk
+to it, so generation can be developed and tested without network access or
+API spend:
+
+    python manage.py run_anthropic_stub --port 8765
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python manage.py runserver
+"""
+import datetime
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_post(request):
+    """
+    Build a deterministic post from the last user message
+    """
+    messages = request.get('messages') or [{}]
+    content = messages[-1].get('content', '')
+    if isinstance(content, list):
+        content = ' '.join(block.get('text', '') for block in content if isinstance(block, dict))
+    note = content.split('\n\n', 1)[-1].strip() or 'Made progress today'
+    return f"🚀 Another day, another step forward!\n\n{note}\n\nOnward! #100DaysOfCode #BuildInPublic"
+
+
+def count_tokens(text):
+    # Rough approximation, good enough for usage accounting in development
+    return max(1, len(text) // 4)
+
+
+class StubPromptCache:
+    """
+    Mimics provider-side prompt caching for usage reporting.
+
+    The system blocks up to the last one marked with cache_control form the
+    cacheable prefix; prefixes shorter than MIN_TOKENS are never cached.
+    """
+    MIN_TOKENS = 1024
+
+    def __init__(self):
+        self.prefixes = set()
+        self.lock = threading.Lock()
+
+    def usage(self, request):
+        system = request.get('system') or ''
+        blocks = [{'type': 'text', 'text': system}] if isinstance(system, str) else system
+        cut = max((i + 1 for i, block in enumerate(blocks) if block.get('cache_control')), default=0)
+        prefix = ''.join(block.get('text', '') for block in blocks[:cut])
+        rest = ''.join(block.get('text', '') for block in blocks[cut:])
+        rest_tokens = count_tokens(json.dumps(request.get('messages', [])) + rest)
+
+        usage = {'input_tokens': rest_tokens, 'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0}
+        prefix_tokens = len(prefix) // 4
+        if prefix_tokens < self.MIN_TOKENS:
+            usage['input_tokens'] += prefix_tokens
+            return usage
+        with self.lock:
+            if prefix in self.prefixes:
+                usage['cache_read_input_tokens'] = prefix_tokens
+            else:
+                self.prefixes.add(prefix)
+                usage['cache_creation_input_tokens'] = prefix_tokens
+        return usage
+
+
+def split_tokens(text):
+    """
+    Split text into word-sized deltas, keeping whitespace attached
+    """
+    tokens = []
+    current = ''
+    for char in text:
+        current += char
+        if char.isspace():
+            tokens.append(current)
+            current = ''
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+class StubAnthropicHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'AnthropicStub/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('request-id', f"req_stub_{uuid.uuid4().hex[:12]}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_event(self, event, payload):
+        self.send_chunk(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode())
+
+    def send_not_found(self):
+        self.send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'Not found'}})
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if parts[:3] != ['v1', 'messages', 'batches'] or len(parts) not in (4, 5):
+            self.send_not_found()
+            return
+
+        batch = self.server.batches.get(parts[3])
+        if batch is None:
+            self.send_not_found()
+        elif len(parts) == 4:
+            self.send_json(200, batch.to_json(self.server.base_url))
+        elif parts[4] == 'results' and batch.results is not None:
+            body = ''.join(json.dumps(result) + '\n' for result in batch.results).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/binary')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_not_found()
+
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path == '/v1/messages/batches':
+            self.create_batch()
+            return
+        if path != '/v1/messages':
+            self.send_not_found()
+            return
+
+        request = self.read_json()
+        text = fake_post(request)
+
+        if not request.get('stream'):
+            # Take as long as the streamed response would
+            time.sleep(self.server.token_delay * len(split_tokens(text)))
+            self.send_json(200, build_message(request, self.server.prompt_cache, text))
+            return
+
+        message = build_message(request, self.server.prompt_cache)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        self.send_event('message_start', {'type': 'message_start', 'message': message})
+        self.send_event('content_block_start', {
+            'type': 'content_block_start',
+            'index': 0,
+            'content_block': {'type': 'text', 'text': ''},
+        })
+        self.send_event('ping', {'type': 'ping'})
+        for index, token in enumerate(split_tokens(text)):
+            if self.server.fail_after is not None and index >= self.server.fail_after:
+                # What the real API sends when it's overloaded part way through a response
+                self.send_event('error', {
+                    'type': 'error',
+                    'error': {'type': 'overloaded_error', 'message': 'Overloaded'},
+                })
+                self.send_chunk(b'')
+                return
+            time.sleep(self.server.token_delay)
+            self.send_event('content_block_delta', {
+                'type': 'content_block_delta',
+                'index': 0,
+                'delta': {'type': 'text_delta', 'text': token},
+            })
+        self.send_event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+        self.send_event('message_delta', {
+            'type': 'message_delta',
+            'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+            'usage': {'output_tokens': count_tokens(text)},
+        })
+        self.send_event('message_stop', {'type': 'message_stop'})
+        self.send_chunk(b'')
+
+    def create_batch(self):
+        requests = self.read_json().get('requests') or []
+        batch = StubBatch(requests, self.server.prompt_cache)
+        self.server.batches[batch.id] = batch
+        # Process in the background like the real API; results appear once it has ended
+        timer = threading.Timer(self.server.batch_delay, batch.process)
+        timer.daemon = True
+        timer.start()
+        self.send_json(200, batch.to_json(self.server.base_url))
+
+
+class StubBatch:
+    """
+    An in-memory Message Batch
+    """
+
+    def __init__(self, requests, prompt_cache):
+        self.id = f"msgbatch_stub_{uuid.uuid4().hex[:24]}"
+        self.requests = requests
+        self.prompt_cache = prompt_cache
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+        self.ended_at = None
+        self.results = None
+
+    def process(self):
+        results = []
+        for request in self.requests:
+            params = request.get('params') or {}
+            if params.get('messages'):
+                result = {'type': 'succeeded', 'message': build_message(params, self.prompt_cache, fake_post(params))}
+            else:
+                result = {'type': 'errored', 'error': {'type': 'error', 'error': {
+                    'type': 'invalid_request_error',
+                    'message': 'messages: field required',
+                }}}
+            results.append({'custom_id': request.get('custom_id'), 'result': result})
+        self.results = results
+        self.ended_at = datetime.datetime.now(datetime.timezone.utc)
+
+    def to_json(self, base_url):
+        ended = self.results is not None
+        counts = {'processing': 0 if ended else len(self.requests), 'succeeded': 0, 'errored': 0,
+                  'canceled': 0, 'expired': 0}
+        for result in self.results or ():
+            counts[result['result']['type']] += 1
+        return {
+            'id': self.id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': counts,
+            'created_at': self.created_at.isoformat(),
+            'expires_at': (self.created_at + datetime.timedelta(days=1)).isoformat(),
+            'ended_at': self.ended_at.isoformat() if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{base_url}/v1/messages/batches/{self.id}/results" if ended else None,
+        }
+
+
+def build_message(request, prompt_cache, text=None):
+    """
+    A Messages API response body; content is empty when text is None (streaming)
+    """
+    usage = prompt_cache.usage(request)
+    usage['output_tokens'] = count_tokens(text) if text is not None else 0
+    return {
+        'id': f"msg_stub_{uuid.uuid4().hex[:24]}",
+        'type': 'message',
+        'role': 'assistant',
+        'model': request.get('model', 'stub'),
+        'content': [{'type': 'text', 'text': text}] if text is not None else [],
+        'stop_reason': 'end_turn' if text is not None else None,
+        'stop_sequence': None,
+        'usage': usage,
+    }
+
+
+class StubAnthropicServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, token_delay=0.0, batch_delay=1.0, fail_after=None, verbose=False):
+        super().__init__(address, StubAnthropicHandler)
+        self.token_delay = token_delay
+        self.batch_delay = batch_delay
+        # Streams fail with an overloaded_error after this many tokens (None: never)
+        self.fail_after = fail_after
+        self.verbose = verbose
+        self.batches = {}
+        self.prompt_cache = StubPromptCache()
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream is expected (that's what disconnect handling is tested with)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host='127.0.0.1', port=0, token_delay=0.0, batch_delay=0.0, fail_after=None):
+    """
+    Start the stub in a background thread and return the server
+    """
+    server = StubAnthropicServer(
+        (host, port), token_delay=token_delay, batch_delay=batch_delay, fail_after=fail_after
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,62 @@
+"""
+Background job handlers for post generation
+"""
+import logging
+
+from django.contrib.auth.models import User
+
+from core.metering import QuotaExceeded
+from core.ratelimit import RateLimited
+from jobs.registry import PermanentJobError, RetryLater, task
+from .generation import GenerationError, PostGeneration
+from .serializers import PostSerializer
+from .similarity import find_similar_post
+
+logger = logging.getLogger(__name__)
+
+
+@task('posts.generate_post')
+def generate_post(job):
+    """
+    Generate and save a draft post for job.payload:
+    {'input_text', 'tone', 'reuse', 'use_cache'}
+    """
+    payload = job.payload
+    user = User.objects.select_related('profile').filter(pk=job.user_id, is_active=True).first()
+    if user is None:
+        raise PermanentJobError(f"User {job.user_id} no longer exists or is inactive")
+
+    generation = PostGeneration(
+        user.profile,
+        payload['input_text'],
+        tone=payload.get('tone'),
+        use_cache=payload.get('use_cache', True),
+    )
+
+    similarity = None
+    match = find_similar_post(user, generation.input_text, generation.tone) if payload.get('reuse') == 'auto' else None
+    if match is not None:
+        similar, similarity = match
+        generation.reuse(similar)
+    else:
+        try:
+            for _text in generation.stream():
+                pass
+        except RateLimited as e:
+            raise RetryLater(e.retry_after, str(e)) from e
+        except QuotaExceeded as e:
+            raise PermanentJobError(f"Daily token quota of {e.quota} exceeded") from e
+        except GenerationError as e:
+            # Transient provider failure: let the queue retry with backoff
+            raise RuntimeError(f"Post generation failed: {str(e)}") from e
+
+    post = generation.save(user)
+    reused_from = generation.reused_from.pk if generation.reused_from else None
+    logger.info(
+        f"Post generated: {post.pk} for {user.username} by job {job.pk} "
+        f"(cached={generation.cached}, reused_from={reused_from})"
+    )
+    result = {'post': PostSerializer(post).data, 'cached': generation.cached, 'reused_from': reused_from}
+    if similarity is not None:
+        result['similarity'] = round(similarity, 3)
+    return result
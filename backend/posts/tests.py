@@ -0,0 +1,596 @@
+import asyncio
+import base64
+import datetime
+import io
+import json
+import threading
+import time
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import anthropic
+from django.contrib.auth.models import User
+from django.db import connections
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.metering import UsageMeter, quota_tokens
+from core.ratelimit import MemoryBackend, RateLimiter
+from .cache import GenerationCache, LocalLRUCache, generation_cache, generation_cache_key
+from .generation import GenerationError, PostGeneration, get_client
+from .models import GenerationBatch, Post
+from . import prompts
+from .pregeneration import collect_batch, submit_batches, suggestion_candidates
+from .search import BasicSearchBackend, SQLiteSearchBackend, get_search_backend, search_posts
+from .similarity import compute_signature, find_similar_post, registry
+from .stub_server import start_stub_server
+
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'generations': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+
+class StubServerMixin:
+    """
+    Point generation at a local posts.stub_server, with a private limiter and meter
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = start_stub_server()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def setUp(self):
+        self.server.fail_after = None
+        settings = override_settings(
+            ANTHROPIC_BASE_URL=self.server.base_url,
+            ANTHROPIC_API_KEY='test-key',
+            ANTHROPIC_MAX_RETRIES=0,
+            CACHES=TEST_CACHES,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_client.cache_clear()
+        self.addCleanup(get_client.cache_clear)
+
+        self.limiter = RateLimiter(
+            MemoryBackend(), global_rpm=100, global_tpm=100000, user_rpm=100, user_tpm=100000, max_wait=1
+        )
+        self.meter = UsageMeter(flush_interval=3600, max_pending=1000, soft_quota=0, hard_quota=0)
+        for patcher in (
+            mock.patch('posts.generation.llm_limiter', return_value=self.limiter),
+            mock.patch('posts.generation.meter', self.meter),
+            mock.patch.object(UsageMeter, '_start_flusher'),
+            mock.patch.object(self.limiter, 'settle', wraps=self.limiter.settle),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+
+    def generation(self, note="Wrote the streaming tests"):
+        return PostGeneration(self.user.profile, note, use_cache=False)
+
+
+class StreamGenerationTests(StubServerMixin, TestCase):
+    def test_stream_records_usage_and_settles(self):
+        generation = self.generation()
+
+        text = ''.join(generation.stream())
+
+        self.assertIn("Wrote the streaming tests", text)
+        self.assertEqual(generation.content, text.strip())
+        self.assertGreater(generation.output_tokens, 0)
+        self.assertEqual(self.meter.used(self.user.pk), generation.used_tokens())
+        self.limiter.settle.assert_called_once_with(mock.ANY, generation.used_tokens())
+
+    def test_error_mid_stream_records_partial_usage(self):
+        self.server.fail_after = 3
+        generation = self.generation()
+        received = []
+
+        with self.assertRaises(GenerationError):
+            for text in generation.stream():
+                received.append(text)
+
+        self.assertEqual(len(received), 3)
+        self.assertGreater(generation.input_tokens, 0)
+        self.assertEqual(self.meter.used(self.user.pk), generation.used_tokens())
+        self.limiter.settle.assert_called_once_with(mock.ANY, generation.used_tokens())
+
+    def test_disconnect_records_partial_usage(self):
+        generation = self.generation("A much longer note, so the client can leave half way through it")
+        tokens = generation.stream()
+        received = [next(tokens) for _ in range(3)]
+
+        tokens.close()
+
+        self.assertEqual(generation.content, '')
+        self.assertGreaterEqual(generation.output_tokens, len(''.join(received)) // 4)
+        self.assertEqual(self.meter.used(self.user.pk), generation.used_tokens())
+        self.limiter.settle.assert_called_once_with(mock.ANY, generation.used_tokens())
+
+    def test_failure_after_metering_is_not_metered_again(self):
+        generation = self.generation()
+
+        with mock.patch('posts.generation.generation_cache') as cache:
+            cache.set.side_effect = RuntimeError("Cache is down")
+            with self.assertRaises(RuntimeError):
+                ''.join(generation.stream())
+
+        self.assertGreater(generation.used_tokens(), 0)
+        self.assertEqual(self.meter.used(self.user.pk), generation.used_tokens())
+        self.limiter.settle.assert_called_once_with(mock.ANY, generation.used_tokens())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GenerationCacheTests(SimpleTestCase):
+    def test_key_ignores_case_and_whitespace_but_not_tone_or_prompt(self):
+        key = generation_cache_key("Shipped  the\nRelease", 'casual', 'model', 'system')
+
+        self.assertEqual(generation_cache_key("shipped the release ", 'casual', 'model', 'system'), key)
+        self.assertNotEqual(generation_cache_key("Shipped the release", 'technical', 'model', 'system'), key)
+        self.assertNotEqual(generation_cache_key("Shipped the release", 'casual', 'model', 'other bio'), key)
+
+    def test_local_tier_expires_and_evicts_least_recently_used(self):
+        cache = LocalLRUCache(max_bytes=20, ttl=60)
+        with mock.patch('posts.cache.time.monotonic', return_value=1000):
+            cache.set('a', 'A', 10)
+            cache.set('b', 'B', 10)
+            cache.get('a')
+            cache.set('c', 'C', 10)
+            cache.set('huge', 'H', 21)
+
+            self.assertEqual([cache.get(key) for key in ('a', 'b', 'c', 'huge')], ['A', None, 'C', None])
+
+        with mock.patch('posts.cache.time.monotonic', return_value=1061):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 1)
+
+    def test_store_hits_fill_the_local_tier(self):
+        cache = GenerationCache()
+        cache.store.clear()
+        value = {'content': 'A post', 'model': 'model'}
+        cache.store.set('key', value)
+
+        self.assertEqual(cache.get('key'), value)
+        cache.store.clear()
+        self.assertEqual(cache.get('key'), value)
+
+        cache.local.clear()
+        self.assertIsNone(cache.get('key'))
+
+
+class PromptTests(TestCase):
+    def setUp(self):
+        prompts._prefix_memo.clear()
+        self.addCleanup(prompts._prefix_memo.clear)
+        self.profile = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678').profile
+        self.profile.bio = "Backend developer learning Rust"
+        self.profile.preferred_tone = 'casual'
+        self.profile.save()
+
+    def test_prefix_holds_the_stable_parts_and_is_marked_for_caching(self):
+        blocks = prompts.build_system_blocks(self.profile, 'casual')
+
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0]['cache_control'], {'type': 'ephemeral'})
+        self.assertIn("Backend developer learning Rust", blocks[0]['text'])
+        self.assertIn(prompts.TONE_INSTRUCTIONS['casual'], blocks[0]['text'])
+        self.assertNotIn("Today's progress note", blocks[0]['text'])
+
+    def test_tone_override_goes_after_an_unchanged_prefix(self):
+        prefix, override = prompts.build_system_blocks(self.profile, 'technical')
+
+        self.assertEqual(prefix, prompts.build_system_blocks(self.profile, 'casual')[0])
+        self.assertNotIn('cache_control', override)
+        self.assertIn(prompts.TONE_INSTRUCTIONS['technical'], override['text'])
+
+    def test_prefix_is_memoized_until_the_profile_changes(self):
+        with mock.patch('posts.prompts.build_prompt_prefix', wraps=prompts.build_prompt_prefix) as build:
+            first = prompts.get_prompt_prefix(self.profile)
+            self.assertIs(prompts.get_prompt_prefix(self.profile), first)
+            self.assertEqual(build.call_count, 1)
+
+            self.profile.bio = "Backend developer learning Go"
+            self.profile.save()
+            self.assertIn("learning Go", prompts.get_prompt_prefix(self.profile))
+            self.assertEqual(build.call_count, 2)
+
+    def test_memo_is_bounded(self):
+        with mock.patch('posts.prompts.PREFIX_MEMO_SIZE', 2):
+            for minute in range(3):
+                self.profile.updated_at = datetime.datetime(2026, 3, 2, 9, minute, tzinfo=datetime.timezone.utc)
+                prompts.get_prompt_prefix(self.profile)
+
+        self.assertEqual(len(prompts._prefix_memo), 2)
+
+
+class CachedGenerationTests(StubServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        generation_cache.store.clear()
+        generation_cache.local.clear()
+        self.addCleanup(generation_cache.local.clear)
+
+    def generate(self, use_cache):
+        generation = PostGeneration(self.user.profile, "Wrote the cache tests", use_cache=use_cache)
+        return generation, ''.join(generation.stream())
+
+    def test_repeated_note_is_served_from_the_cache(self):
+        first, text = self.generate(use_cache=True)
+
+        second, cached_text = self.generate(use_cache=True)
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(cached_text, first.content)
+        self.assertEqual(second.used_tokens(), 0)
+        self.assertEqual(self.meter.used(self.user.pk), first.used_tokens())
+
+    def test_fresh_calls_the_model_and_refreshes_the_cache(self):
+        first, _text = self.generate(use_cache=True)
+
+        fresh, _text = self.generate(use_cache=False)
+
+        self.assertFalse(fresh.cached)
+        self.assertGreater(fresh.used_tokens(), 0)
+        self.assertEqual(self.meter.used(self.user.pk), first.used_tokens() + fresh.used_tokens())
+        self.assertTrue(self.generate(use_cache=True)[0].cached)
+
+
+class StreamViewTests(StubServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def post(self):
+        return self.api.post(
+            '/api/v1/posts/generate/stream/?fresh=1',
+            {'input_text': "Wrote the streaming tests", 'reuse': 'off'},
+            format='json',
+        )
+
+    def test_stream_saves_the_post(self):
+        body = b''.join(self.post().streaming_content).decode()
+
+        self.assertIn('event: done', body)
+        self.assertEqual(Post.objects.get().input_text, "Wrote the streaming tests")
+
+    def test_error_mid_stream_sends_an_error_event(self):
+        self.server.fail_after = 2
+
+        body = b''.join(self.post().streaming_content).decode()
+
+        self.assertIn('event: error', body)
+        self.assertFalse(Post.objects.exists())
+        self.limiter.settle.assert_called_once()
+
+    def test_disconnect_settles_the_reservation(self):
+        response = self.post()
+        events = iter(response.streaming_content)
+        next(events)  # start
+        next(events)  # first token
+
+        response.close()
+
+        self.limiter.settle.assert_called_once()
+        self.assertGreater(self.meter.used(self.user.pk), 0)
+        self.assertFalse(Post.objects.exists())
+
+
+class AsyncGenerationTests(StubServerMixin, TransactionTestCase):
+    # agenerate runs the meter and limiter in executor threads, which need committed rows
+
+    def agenerate(self, generation, base_url=None):
+        async def run():
+            client = anthropic.AsyncAnthropic(
+                api_key='test-key', base_url=base_url or self.server.base_url, max_retries=0
+            )
+            try:
+                await generation.agenerate(client)
+            finally:
+                await client.close()
+
+        asyncio.run(run())
+
+    def test_generate_records_usage_and_settles(self):
+        generation = self.generation()
+
+        self.agenerate(generation)
+
+        self.assertIn("Wrote the streaming tests", generation.content)
+        self.assertGreater(generation.output_tokens, 0)
+        self.assertEqual(self.meter.used(self.user.pk), generation.used_tokens())
+        self.limiter.settle.assert_called_once_with(mock.ANY, generation.used_tokens())
+
+    def test_database_work_shares_one_thread_that_closes_once(self):
+        threads = []
+
+        def on_thread(func):
+            def run(*args):
+                threads.append(threading.current_thread())
+                return func(*args)
+            return run
+
+        close_all = on_thread(connections.close_all)
+        with mock.patch.object(self.meter, 'check_quota', on_thread(self.meter.check_quota)), \
+                mock.patch.object(self.meter, 'record', on_thread(self.meter.record)), \
+                mock.patch.object(connections, 'close_all', close_all):
+            self.agenerate(self.generation())
+            threads[0].join(timeout=5)
+
+        # check_quota, record, then close_all as the thread's last job
+        self.assertEqual(len(threads), 3)
+        self.assertEqual(len(set(threads)), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+        self.assertFalse(threads[0].is_alive())
+
+    def test_failed_generate_settles_its_reservation(self):
+        generation = self.generation()
+
+        # Nothing listens on the discard port, so the call fails to connect
+        with self.assertRaises(GenerationError):
+            self.agenerate(generation, base_url='http://127.0.0.1:9')
+
+        self.assertEqual(generation.used_tokens(), 0)
+        self.limiter.settle.assert_called_once_with(mock.ANY, 0)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+        posts = [Post.objects.create(user=self.user, input_text=f'Note {n}', content=f'Post {n}') for n in range(7)]
+        # Four posts share a created_at, so only the id orders them
+        start = timezone.now() - datetime.timedelta(hours=1)
+        for post, minutes in zip(posts, [0, 1, 2, 2, 2, 2, 5]):
+            Post.objects.filter(pk=post.pk).update(created_at=start + datetime.timedelta(minutes=minutes))
+        self.expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def get(self, url):
+        response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, page):
+        return [post['id'] for post in page['results']]
+
+    def test_forward_then_back_visits_every_post_once(self):
+        pages = [self.get('/api/v1/posts/?page_size=3')]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+
+        self.assertEqual([id for page in pages for id in self.ids(page)], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.get(backwards[-1]['previous']))
+        self.assertEqual([self.ids(page) for page in reversed(backwards)], [self.ids(page) for page in pages])
+
+    def test_tampered_cursor_is_not_found(self):
+        page = self.get('/api/v1/posts/?page_size=3')
+        token = parse_qs(urlsplit(page['next']).query)['cursor'][0]
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+
+        wrong_length = {'p': payload['p'][:1]}
+        wrong_type = {'p': ['yesterday', payload['p'][1]]}
+        for cursor in (
+            token[:-4] + '!!!!',
+            base64.urlsafe_b64encode(json.dumps(wrong_length).encode()).decode(),
+            base64.urlsafe_b64encode(json.dumps(wrong_type).encode()).decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.api.get('/api/v1/posts/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class SimilarityTests(TestCase):
+    NOTE = "Solved three leetcode graph problems with BFS"
+
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+
+    def post(self, tone='casual', note=NOTE, signed=True):
+        return Post.objects.create(
+            user=self.user,
+            input_text=note,
+            content=f'{tone} post',
+            tone=tone,
+            input_signature=compute_signature(note) if signed else None,
+        )
+
+    def test_only_posts_in_the_same_tone_match(self):
+        casual = self.post('casual')
+
+        self.assertEqual(find_similar_post(self.user, "solved 3 leetcode graph problems using BFS", 'casual')[0], casual)
+        self.assertIsNone(find_similar_post(self.user, self.NOTE, 'technical'))
+
+    def test_auto_reuse_keeps_the_reused_posts_tone(self):
+        self.post('casual')
+        technical = self.post('technical')
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.post(
+            '/api/v1/posts/generate/stream/',
+            {'input_text': self.NOTE, 'tone': 'technical', 'reuse': 'auto'},
+            format='json',
+        )
+        body = b''.join(response.streaming_content).decode()
+
+        self.assertIn('event: done', body)
+        saved = Post.objects.latest('id')
+        self.assertEqual((saved.tone, saved.content), ('technical', technical.content))
+
+    def test_backfilled_signatures_are_picked_up(self):
+        older = self.post(note="Refactored the billing service retries", signed=False)
+        self.post(note="Wrote documentation for the API")
+        self.assertIsNone(find_similar_post(self.user, "Refactored the billing service retries", 'casual'))
+
+        call_command('index_post_signatures', stdout=io.StringIO())
+        with mock.patch('posts.similarity.RECONCILE_INTERVAL', 0):
+            match = find_similar_post(self.user, "Refactored the billing service retries", 'casual')
+
+        self.assertEqual(match[0], older)
+
+    def test_posts_deleted_elsewhere_are_dropped_on_reconcile(self):
+        post = self.post()
+        find_similar_post(self.user, self.NOTE, 'casual')
+        Post.objects.filter(pk=post.pk).update(is_deleted=True)
+
+        with mock.patch('posts.similarity.RECONCILE_INTERVAL', 0):
+            self.assertIsNone(find_similar_post(self.user, self.NOTE, 'casual'))
+        self.assertEqual(len(registry.peek(self.user.pk, 'casual')), 0)
+
+
+class PregenerationTests(StubServerMixin, TestCase):
+    # Tuesday 12:00 UTC is already Wednesday 01:00 in Auckland
+    NOW = datetime.datetime(2026, 3, 3, 12, 0, tzinfo=datetime.timezone.utc)
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('posts.pregeneration.meter', self.meter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        Post.objects.create(user=self.user, input_text="Wrote the batch tests", content="A post")
+
+    def submit_and_wait(self):
+        batch, = submit_batches()
+        self.assertEqual(batch.request_count, 1)
+        for _ in range(100):
+            with self.captureOnCommitCallbacks() as callbacks:
+                if collect_batch(batch):
+                    return callbacks
+            time.sleep(0.02)
+        self.fail("The stub batch never ended")
+
+    def test_collect_signs_posts_and_meters_after_commit(self):
+        callbacks = self.submit_and_wait()
+
+        suggested = Post.objects.get(status='suggested')
+        self.assertEqual(bytes(suggested.input_signature), compute_signature(suggested.input_text))
+        self.assertEqual(GenerationBatch.objects.get().status, GenerationBatch.STATUS_COLLECTED)
+        self.assertEqual(self.meter.used(self.user.pk), 0)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self.meter.used(self.user.pk), quota_tokens(
+            suggested.input_tokens, suggested.cache_creation_input_tokens, suggested.output_tokens
+        ))
+        self.assertGreater(self.meter.used(self.user.pk), 0)
+
+    def test_suggested_today_is_judged_in_the_users_time_zone(self):
+        auckland = User.objects.create_user('grace', 'grace@example.com', 'pw-12345678')
+        auckland.profile.timezone = 'Pacific/Auckland'
+        auckland.profile.save()
+        Post.objects.create(user=auckland, input_text="Wrote the time zone tests", content="A post")
+        for user in (self.user, auckland):
+            Post.objects.create(user=user, input_text="Earlier suggestion", content="A post", status='suggested')
+        # 10:00 UTC: today in UTC, but still yesterday (23:00) in Auckland
+        Post.objects.filter(status='suggested').update(created_at=self.NOW - datetime.timedelta(hours=2))
+        Post.objects.exclude(status='suggested').update(created_at=self.NOW - datetime.timedelta(days=1))
+
+        candidates = [profile.user_id for profile, _notes in suggestion_candidates(now=self.NOW)]
+
+        self.assertEqual(candidates, [auckland.pk])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        get_search_backend.cache_clear()
+        self.addCleanup(get_search_backend.cache_clear)
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        self.other = User.objects.create_user('grace', 'grace@example.com', 'pw-12345678')
+
+    def post(self, content, input_text="Daily note", user=None):
+        return Post.objects.create(user=user or self.user, input_text=input_text, content=content)
+
+    def search(self, query, limit=10, offset=0):
+        results, _has_more = search_posts(self.user, query, limit, offset)
+        return [post for post, _rank, _snippet in results]
+
+    def test_sqlite_uses_fts5(self):
+        self.assertIsInstance(get_search_backend(), SQLiteSearchBackend)
+
+    def test_content_matches_rank_above_note_matches(self):
+        in_note = self.post("Spent the day on other things", input_text="Migrated postgres to version 16")
+        in_content = self.post("Migrated our postgres cluster and wrote about postgres upgrades")
+        self.post("Migrated postgres too", user=self.other)
+
+        self.assertEqual(self.search("postgres"), [in_content, in_note])
+        # The last word matches as a prefix
+        self.assertEqual(self.search("migrated postg"), [in_content, in_note])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        self.post("Learned that <script> tags need escaping in templates")
+
+        (_post, _rank, snippet), = search_posts(self.user, "escaping", 10)[0]
+
+        self.assertIn('<mark>escaping</mark>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+
+    def test_index_follows_edits_soft_deletes_and_restores(self):
+        post = self.post("Wrote a parser in Rust")
+
+        post.content = "Wrote a parser in Go"
+        post.save()
+        self.assertEqual(self.search("rust"), [])
+        self.assertEqual(self.search("go"), [post])
+
+        post.delete()
+        self.assertEqual(self.search("parser"), [])
+
+        post.restore()
+        self.assertEqual(self.search("parser"), [post])
+
+    def test_pages_fetch_one_extra_row_for_has_more(self):
+        posts = [self.post(f"Kubernetes day {n}") for n in range(3)]
+
+        first, has_more = search_posts(self.user, "kubernetes", 2)
+        rest, has_more_after = search_posts(self.user, "kubernetes", 2, offset=2)
+
+        self.assertTrue(has_more)
+        self.assertFalse(has_more_after)
+        self.assertEqual({post for post, _rank, _snippet in first + rest}, set(posts))
+
+    def test_fallback_matches_every_word_newest_first(self):
+        older = self.post("Docker compose for the Redis cache")
+        newer = self.post("Redis streams, then Docker networking")
+        self.post("Only redis here")
+        deleted = self.post("Docker and Redis again")
+        deleted.delete()
+
+        with mock.patch('posts.search.get_search_backend', return_value=BasicSearchBackend()):
+            results, has_more = search_posts(self.user, "docker REDIS", 10)
+
+        self.assertEqual([post for post, _rank, _snippet in results], [newer, older])
+        self.assertFalse(has_more)
+        self.assertIn('<mark>Docker</mark>', results[1][2])
+
+    def test_view_validates_and_paginates(self):
+        for n in range(3):
+            self.post(f"Terraform module {n}")
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        self.assertEqual(api.get('/api/v1/posts/search/').status_code, 400)
+        self.assertEqual(api.get('/api/v1/posts/search/', {'q': 'terraform', 'page': 21}).status_code, 400)
+
+        page = api.get('/api/v1/posts/search/', {'q': 'terraform', 'page_size': 2}).data
+        self.assertEqual(len(page['results']), 2)
+        last = api.get(page['next']).data
+        self.assertEqual((len(last['results']), last['next']), (1, None))
+        self.assertIsNotNone(last['previous'])
@@ -0,0 +1,17 @@
+from django.urls import path
+from . import views
+
+app_name = 'posts'
+
+urlpatterns = [
+    # Post history
+    path('', views.PostListView.as_view(), name='post_list'),
+    path('<int:pk>/', views.PostDetailView.as_view(), name='post_detail'),
+    path('search/', views.PostSearchView.as_view(), name='post_search'),
+    path('<int:pk>/publish/', views.PublishPostView.as_view(), name='post_publish'),
+
+    # AI generation
+    path('generate/', views.GeneratePostView.as_view(), name='generate'),
+    path('generate/stream/', views.GeneratePostStreamView.as_view(), name='generate_stream'),
+    path('generate/batch/', views.BatchGeneratePostView.as_view(), name='generate_batch'),
+]
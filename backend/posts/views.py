@@ -0,0 +1,428 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import generics, status, permissions
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.views import APIView
+import logging
+import math
+from contextlib import closing
+
+from analytics.rollups import record
+from core.idempotency import idempotent
+from core.metering import QuotaExceeded
+from core.ratelimit import RateLimited
+from core.sse import sse_event, sse_response
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from publishing.outbox import PublishError, cancel_publication, schedule_publication
+from .batch import generate_batch
+from .generation import GenerationError, PostGeneration
+from .models import Post
+from .search import search_posts
+from .serializers import (
+    BatchGeneratePostSerializer,
+    GeneratePostSerializer,
+    PostSearchResultSerializer,
+    PostSerializer,
+    PublishPostSerializer,
+)
+from .similarity import find_similar_post, forget_post
+
+logger = logging.getLogger(__name__)
+
+
+class PostListView(generics.ListAPIView):
+    """
+    List the current user's posts, newest first (keyset paginated)
+
+    Pass ?status=suggested for the drafts pre-generated overnight.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = PostSerializer
+
+    def get_queryset(self):
+        queryset = Post.active_objects.filter(user=self.request.user).defer('input_signature')
+        post_status = self.request.query_params.get('status')
+        if post_status:
+            queryset = queryset.filter(status=post_status)
+        return queryset
+
+
+class PostDetailView(APIView):
+    """
+    Get/Update/Delete a single post
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_post(self, request, pk):
+        return get_object_or_404(Post.active_objects, pk=pk, user=request.user)
+
+    def get(self, request, pk):
+        """
+        Get a post
+        """
+        post = self.get_post(request, pk)
+        return Response({
+            'post': PostSerializer(post).data
+        }, status=status.HTTP_200_OK)
+
+    def put(self, request, pk):
+        """
+        Edit a post's content or status
+        """
+        post = self.get_post(request, pk)
+        was_published = post.status == 'published'
+        serializer = PostSerializer(post, data=request.data, partial=True)
+
+        if serializer.is_valid():
+            # Publishing by hand records when, like the outbox does
+            if serializer.validated_data.get('status') == 'published' and not was_published:
+                serializer.save(published_at=post.published_at or timezone.now())
+            else:
+                serializer.save()
+            if post.status == 'published' and not was_published:
+                record(request.user.pk, 'posts_published')
+            logger.info(f"Post updated: {post.pk} by {request.user.username}")
+            return Response({
+                'message': 'Post updated successfully',
+                'post': serializer.data
+            }, status=status.HTTP_200_OK)
+
+        return Response({
+            'error': 'Post update failed',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        """
+        Soft delete a post
+        """
+        post = self.get_post(request, pk)
+        with transaction.atomic():
+            post.delete(user=request.user)
+            # A deleted post must not go out to LinkedIn
+            cancel_publication(post)
+        forget_post(post)
+        logger.info(f"Post deleted: {post.pk} by {request.user.username}")
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PublishPostView(APIView):
+    """
+    Schedule a post for publishing on LinkedIn, or cancel it
+
+    Publishing happens in the background (manage.py dispatch_outbox); the
+    post turns 'published' once LinkedIn has accepted it, or back to
+    'draft' if it can't be published.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        """
+        Schedule the post (now, or at scheduled_at)
+        """
+        post = get_object_or_404(Post.active_objects.defer('input_signature'), pk=pk, user=request.user)
+        serializer = PublishPostSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Publishing failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            schedule_publication(post, request.user, when=serializer.validated_data.get('scheduled_at'))
+        except PublishError as e:
+            return Response({
+                'error': 'Publishing failed',
+                'details': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Post scheduled for LinkedIn: {post.pk} by {request.user.username}")
+        return Response({
+            'message': 'Post scheduled for publishing',
+            'post': PostSerializer(post).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+    def delete(self, request, pk):
+        """
+        Cancel a scheduled post that hasn't been published yet
+        """
+        post = get_object_or_404(Post.active_objects.defer('input_signature'), pk=pk, user=request.user)
+        if not cancel_publication(post):
+            return Response({
+                'error': 'Cancel failed',
+                'details': 'Post is not waiting to be published'
+            }, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Post publication cancelled: {post.pk} by {request.user.username}")
+        return Response({
+            'message': 'Publication cancelled',
+            'post': PostSerializer(post).data
+        }, status=status.HTTP_200_OK)
+
+
+class PostSearchView(APIView):
+    """
+    Full-text search over the current user's posts, best matches first
+
+    Query parameters:
+        q:         search text (PostgreSQL also accepts "phrases", -exclusions and or)
+        page:      1-based page number
+        page_size: results per page (max MAX_PAGE_SIZE)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    MAX_PAGE_SIZE = 50
+    # Deep OFFSET pages get slow; nobody reads 20 pages of search results
+    MAX_PAGE = 20
+
+    def get(self, request):
+        """
+        Search posts
+        """
+        query = request.query_params.get('q', '').strip()
+        try:
+            page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', api_settings.PAGE_SIZE))
+        except ValueError:
+            page, page_size = 0, 0
+        if not query or not 1 <= page <= self.MAX_PAGE or not 1 <= page_size <= self.MAX_PAGE_SIZE:
+            return Response({
+                'error': 'Search failed',
+                'details': 'q is required; page must be 1-{} and page_size 1-{}'.format(
+                    self.MAX_PAGE, self.MAX_PAGE_SIZE
+                )
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results, has_more = search_posts(request.user, query, limit=page_size, offset=(page - 1) * page_size)
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if has_more and page < self.MAX_PAGE:
+            next_url = replace_query_param(url, 'page', page + 1)
+        if page == 2:
+            previous_url = remove_query_param(url, 'page')
+        elif page > 2:
+            previous_url = replace_query_param(url, 'page', page - 1)
+
+        return Response({
+            'next': next_url,
+            'previous': previous_url,
+            'results': PostSearchResultSerializer(
+                [{'post': post, 'rank': rank, 'snippet': snippet} for post, rank, snippet in results],
+                many=True,
+            ).data
+        }, status=status.HTTP_200_OK)
+
+
+class GeneratePostView(APIView):
+    """
+    Queue a post generation as a background job
+
+    Returns 202 with the job; poll GET /api/v1/jobs/<id>/ or stream
+    /api/v1/jobs/<id>/stream/ until it finishes. The job's result holds
+    {"post": ..., "cached": bool, "reused_from": id|null}.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        """
+        Queue generation of a post from a daily progress note
+
+        Send an Idempotency-Key header so a retried request returns the
+        original job instead of queueing (and paying for) another one.
+        """
+        serializer = GeneratePostSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Post generation failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue('posts.generate_post', {
+            'input_text': serializer.validated_data['input_text'],
+            'tone': serializer.validated_data.get('tone'),
+            'reuse': serializer.validated_data['reuse'],
+            'use_cache': request.query_params.get('fresh', '').lower() not in ('1', 'true', 'yes'),
+        }, user=request.user)
+        logger.info(f"Post generation queued: job {job.pk} for {request.user.username}")
+
+        return Response({
+            'message': 'Post generation queued',
+            'job': JobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED, headers={
+            'Location': reverse('jobs:job_detail', kwargs={'pk': job.pk})
+        })
+
+
+class GeneratePostStreamView(APIView):
+    """
+    Generate a post and stream it back as Server-Sent Events
+
+    Events:
+        start:   generation accepted, model call in flight
+        similar: {"post": ..., "similarity": ...} an earlier post for a near-duplicate note
+        token:   {"text": ...} for every text delta from the model
+        done:    {"post": ..., "cached": bool, "reused_from": id|null} once the post has been saved as a draft
+        error:   {"error": ...} if the model call fails, with "retry_after" (seconds) when rate limited
+                 or over the daily token quota
+
+    Repeated notes are served from the generation cache; pass ?fresh=1 to
+    bypass it. With reuse=auto, a near-duplicate note reuses the text of an
+    earlier post in the same tone instead of calling the model.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """
+        Generate a post from a daily progress note
+        """
+        serializer = GeneratePostSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Post generation failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        generation = PostGeneration(
+            request.user.profile,
+            serializer.validated_data['input_text'],
+            tone=serializer.validated_data.get('tone'),
+            use_cache=request.query_params.get('fresh', '').lower() not in ('1', 'true', 'yes'),
+        )
+        return sse_response(self.event_stream(request.user, generation, serializer.validated_data['reuse']))
+
+    def event_stream(self, user, generation, reuse):
+        """
+        Relay model output to the client as it arrives
+        """
+        # Sent before the model call so the client gets its first byte immediately
+        yield sse_event('start', {'tone': generation.tone, 'model': generation.model})
+
+        match = find_similar_post(user, generation.input_text, generation.tone) if reuse != 'off' else None
+        if match is not None:
+            similar, similarity = match
+            if reuse == 'auto':
+                generation.reuse(similar)
+                yield sse_event('token', {'text': generation.content})
+                yield self.finish(user, generation, similarity=similarity)
+                return
+            yield sse_event('similar', {'post': PostSerializer(similar).data, 'similarity': round(similarity, 3)})
+
+        try:
+            # Closed explicitly so a disconnect settles the reservation right away
+            with closing(generation.stream()) as tokens:
+                for text in tokens:
+                    yield sse_event('token', {'text': text})
+        except RateLimited as e:
+            yield sse_event('error', {'error': 'Rate limit exceeded', 'retry_after': math.ceil(e.retry_after)})
+            return
+        except QuotaExceeded as e:
+            yield sse_event('error', {'error': 'Daily token quota exceeded', 'retry_after': math.ceil(e.retry_after)})
+            return
+        except GenerationError:
+            yield sse_event('error', {'error': 'Post generation failed'})
+            return
+
+        yield self.finish(user, generation)
+
+    def finish(self, user, generation, similarity=None):
+        """
+        Save the generation and build the final event
+        """
+        post = generation.save(user)
+        reused_from = generation.reused_from.pk if generation.reused_from else None
+        logger.info(
+            f"Post generated: {post.pk} for {user.username} "
+            f"(cached={generation.cached}, reused_from={reused_from})"
+        )
+        payload = {'post': PostSerializer(post).data, 'cached': generation.cached, 'reused_from': reused_from}
+        if similarity is not None:
+            payload['similarity'] = round(similarity, 3)
+        return sse_event('done', payload)
+
+
+class BatchGeneratePostView(APIView):
+    """
+    Generate posts for several daily notes concurrently, streamed as Server-Sent Events
+
+    Events:
+        start:  {"count": n} once the batch has been accepted
+        result: {"index": i, "post": ..., "cached": bool} as each entry completes
+        failed: {"index": i, "error": ...} for entries whose generation failed,
+                with "retry_after" (seconds) when refused by the rate limiter or quota
+        done:   {"succeeded": n, "failed": n, "results": [...]} with one item per entry, in input order
+
+    Entries are generated in parallel (up to POST_BATCH_CONCURRENCY at a
+    time), so results arrive in completion order; use index to match them
+    to the input. Pass ?fresh=1 to bypass the generation cache.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """
+        Generate posts for a list of daily progress notes
+        """
+        serializer = BatchGeneratePostSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'error': 'Batch generation failed',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        use_cache = request.query_params.get('fresh', '').lower() not in ('1', 'true', 'yes')
+        profile = request.user.profile
+        generations = [
+            PostGeneration(
+                profile,
+                entry['input_text'],
+                tone=entry.get('tone') or serializer.validated_data.get('tone'),
+                use_cache=use_cache,
+            )
+            for entry in serializer.validated_data['entries']
+        ]
+        return sse_response(self.event_stream(request.user, generations))
+
+    def event_stream(self, user, generations):
+        """
+        Save and relay each generation as soon as it completes
+        """
+        yield sse_event('start', {'count': len(generations)})
+
+        results = [None] * len(generations)
+        for index, generation, error in generate_batch(generations):
+            if isinstance(error, (RateLimited, QuotaExceeded)):
+                results[index] = {
+                    'index': index,
+                    'post_id': None,
+                    'error': 'Rate limit exceeded' if isinstance(error, RateLimited) else 'Daily token quota exceeded',
+                    'retry_after': math.ceil(error.retry_after),
+                }
+                yield sse_event('failed', results[index])
+                continue
+            if error is not None:
+                results[index] = {'index': index, 'post_id': None, 'error': 'Post generation failed'}
+                yield sse_event('failed', results[index])
+                continue
+            post = generation.save(user)
+            results[index] = {'index': index, 'post_id': post.pk, 'error': None}
+            yield sse_event('result', {
+                'index': index,
+                'post': PostSerializer(post).data,
+                'cached': generation.cached,
+            })
+
+        succeeded = sum(1 for result in results if result['error'] is None)
+        logger.info(
+            f"Batch generated for {user.username}: "
+            f"{succeeded} succeeded, {len(results) - succeeded} failed"
+        )
+        yield sse_event('done', {
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results,
+        })
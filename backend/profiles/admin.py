@@ -1,9 +1,103 @@
-# profiles/admin.py - Minimal version to get migrations working
+from django.contrib import admin, messages
+from django.utils import timezone
 
-from django.contrib import admin
+from core.pagination import EstimatedCountPaginator
 from .models import Profile
 
-# Simple registration without inline for now
-admin.site.register(Profile)
 
-# You can add the fancy admin configurations after migrations are done
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    """
+    Admin for Profile, tuned for large user tables
+    """
+    list_display = (
+        'username',
+        'email',
+        'preferred_tone',
+        'linkedin_connected',
+        'email_notifications',
+        'daily_reminders',
+        'created_at',
+    )
+    list_filter = ('preferred_tone', 'linkedin_connected', 'email_notifications', 'daily_reminders')
+    list_select_related = ('user',)
+    ordering = ('-created_at', '-id')
+
+    # '^' makes these prefix (istartswith) lookups, which can use the
+    # UPPER(...) pattern indexes created in migration 0003 on Postgres
+    search_fields = ('^user__username', '^user__email')
+    search_help_text = 'Search by username or email prefix'
+
+    # Avoid COUNT(*) over the whole table on every changelist render
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    autocomplete_fields = ('user', 'created_by', 'updated_by')
+    readonly_fields = ('send_hour', 'created_at', 'updated_at')
+    fieldsets = (
+        (None, {
+            'fields': ('user', 'bio', 'location', 'website'),
+        }),
+        ('LinkedIn', {
+            'fields': ('linkedin_profile', 'linkedin_connected'),
+        }),
+        ('Preferences', {
+            'fields': ('preferred_tone', 'email_notifications'),
+        }),
+        ('Reminders', {
+            'description': 'send_hour is the UTC hour of the local reminder hour; it is recomputed on save.',
+            'fields': ('daily_reminders', 'timezone', 'reminder_hour', 'send_hour'),
+        }),
+        ('Audit', {
+            'classes': ('collapse',),
+            'fields': ('created_at', 'updated_at', 'created_by', 'updated_by'),
+        }),
+    )
+
+    actions = (
+        'enable_daily_reminders',
+        'disable_daily_reminders',
+        'disable_email_notifications',
+        'disconnect_linkedin',
+    )
+
+    @admin.display(description='Username', ordering='user__username')
+    def username(self, obj):
+        return obj.user.username
+
+    @admin.display(description='Email', ordering='user__email')
+    def email(self, obj):
+        return obj.user.email
+
+    def _bulk_update(self, request, queryset, message, **values):
+        """
+        Apply a single UPDATE to the selection.
+
+        QuerySet.update() bypasses BaseModel.save(), so audit fields are
+        set explicitly here.
+        """
+        updated = queryset.update(updated_at=timezone.now(), updated_by=request.user, **values)
+        self.message_user(request, f"{updated} profile(s) {message}.", messages.SUCCESS)
+
+    @admin.action(description='Enable daily reminders')
+    def enable_daily_reminders(self, request, queryset):
+        self._bulk_update(request, queryset, 'now receive daily reminders', daily_reminders=True)
+
+    @admin.action(description='Disable daily reminders')
+    def disable_daily_reminders(self, request, queryset):
+        self._bulk_update(request, queryset, 'no longer receive daily reminders', daily_reminders=False)
+
+    @admin.action(description='Disable email notifications')
+    def disable_email_notifications(self, request, queryset):
+        self._bulk_update(request, queryset, 'no longer receive email notifications', email_notifications=False)
+
+    @admin.action(description='Disconnect LinkedIn')
+    def disconnect_linkedin(self, request, queryset):
+        self._bulk_update(
+            request,
+            queryset,
+            'disconnected from LinkedIn',
+            linkedin_connected=False,
+            linkedin_access_token=None,
+            linkedin_member_id=None,
+        )
@@ -0,0 +1,173 @@
+"""
+Streaming export of User + Profile rows.
+
+Rows are read with a single joined query through .iterator(), so memory use
+stays constant regardless of how many users are exported, and output is
+produced in buffered chunks that can be fed to a StreamingHttpResponse or
+written to a file.
+"""
+import csv
+import datetime
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Profile
+
+# (column name, ORM lookup) - linkedin_access_token is deliberately excluded
+EXPORT_FIELDS = [
+    ('user_id', 'user__id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('is_active', 'user__is_active'),
+    ('date_joined', 'user__date_joined'),
+    ('last_login', 'user__last_login'),
+    ('profile_id', 'id'),
+    ('bio', 'bio'),
+    ('location', 'location'),
+    ('website', 'website'),
+    ('linkedin_profile', 'linkedin_profile'),
+    ('linkedin_connected', 'linkedin_connected'),
+    ('preferred_tone', 'preferred_tone'),
+    ('email_notifications', 'email_notifications'),
+    ('daily_reminders', 'daily_reminders'),
+    ('timezone', 'timezone'),
+    ('reminder_hour', 'reminder_hour'),
+    ('send_hour', 'send_hour'),
+    # Audit fields
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('created_by', 'created_by__username'),
+    ('updated_by', 'updated_by__username'),
+]
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Flush output once this many bytes are buffered
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_export_datetime(value):
+    """
+    Parse an ISO-8601 date or datetime, treating naive values as local time
+    """
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(f"Invalid date/time: {value}")
+        parsed = datetime.datetime.combine(parsed_date, datetime.time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_queryset(updated_since=None, updated_until=None):
+    """
+    Build the export query, optionally limited to an updated_at window.
+
+    values() walks the same joins select_related would (user, created_by,
+    updated_by) but skips building model instances for every row.
+    """
+    queryset = Profile.objects.all()
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    if updated_until is not None:
+        queryset = queryset.filter(updated_at__lt=updated_until)
+    return queryset.order_by('id').values_list(*[lookup for _name, lookup in EXPORT_FIELDS])
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield export rows as dicts, fetching chunk_size rows at a time
+    """
+    names = [name for name, _lookup in EXPORT_FIELDS]
+    for values in queryset.iterator(chunk_size=chunk_size):
+        yield dict(zip(names, values))
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def ndjson_lines(rows):
+    """
+    Yield one JSON document per row
+    """
+    for row in rows:
+        yield json.dumps(row, default=_encode_value, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """
+    File-like object that hands csv.writer output straight back
+    """
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """
+    Yield a header line followed by one CSV line per row
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _lookup in EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow([_encode_value(value) for value in row.values()])
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """
+    Join text lines into UTF-8 byte chunks of roughly `size` bytes
+    """
+    buffer = []
+    buffered_bytes = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        buffered_bytes += len(data)
+        if buffered_bytes >= size:
+            yield b''.join(buffer)
+            buffer = []
+            buffered_bytes = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compress a byte stream on the fly into a single gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(output='ndjson', updated_since=None, updated_until=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE, compress=False):
+    """
+    Return an iterator of byte chunks for the requested export
+    """
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {output}")
+
+    rows = iter_rows(export_queryset(updated_since, updated_until), chunk_size=chunk_size)
+    lines = ndjson_lines(rows) if output == 'ndjson' else csv_lines(rows)
+    chunks = buffered(lines)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_stream, parse_export_datetime
+
+
+class Command(BaseCommand):
+    help = "Stream a User + Profile dump as NDJSON or CSV to a file or stdout"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='output', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--updated-since', help="Only profiles updated at or after this ISO-8601 date/time")
+        parser.add_argument('--updated-until', help="Only profiles updated before this ISO-8601 date/time")
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Rows fetched from the database per round trip")
+        parser.add_argument('--output', dest='path', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for option in ('updated_since', 'updated_until'):
+            if options[option]:
+                try:
+                    bounds[option] = parse_export_datetime(options[option])
+                except ValueError as e:
+                    raise CommandError(str(e))
+
+        chunks = export_stream(
+            output=options['output'],
+            chunk_size=options['chunk_size'],
+            compress=options['gzip'],
+            **bounds
+        )
+
+        if options['path']:
+            with open(options['path'], 'wb') as f:
+                written = self._write(chunks, f)
+            self.stderr.write(f"Wrote {written} bytes to {options['path']}")
+        else:
+            self._write(chunks, sys.stdout.buffer)
+
+    @staticmethod
+    def _write(chunks, f):
+        written = 0
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+        f.flush()
+        return written
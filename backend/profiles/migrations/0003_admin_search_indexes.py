@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 23:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Prefix search in ProfileAdmin ('^user__username') compiles to
+# UPPER("username"::text) LIKE UPPER('foo%') on Postgres; these expression
+# indexes let it use an index range scan instead of a sequential scan.
+AUTH_USER_PREFIX_INDEXES = [
+    ('profiles_auth_user_username_prefix', 'username'),
+    ('profiles_auth_user_email_prefix', 'email'),
+]
+
+
+def create_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, column in AUTH_USER_PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON auth_user (UPPER({column}::text) text_pattern_ops)'
+        )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _column in AUTH_USER_PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_created_id_idx'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['preferred_tone', 'created_at'], name='profile_tone_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(condition=models.Q(('linkedin_connected', True)), fields=['created_at'], name='profile_linkedin_idx'),
+        ),
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_profile_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='linkedin_member_id',
+            field=models.CharField(blank=True, help_text='LinkedIn member id posts are authored as; looked up on first publish', max_length=100, null=True),
+        ),
+    ]
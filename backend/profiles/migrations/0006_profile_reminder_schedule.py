@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 00:35
+
+import django.core.validators
+import profiles.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_profile_linkedin_member_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='reminder_hour',
+            field=models.PositiveSmallIntegerField(default=9, help_text='Local hour the daily reminder is sent at', validators=[django.core.validators.MaxValueValidator(23)]),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='send_hour',
+            field=models.PositiveSmallIntegerField(default=9, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='timezone',
+            field=models.CharField(default='UTC', help_text='IANA time zone, e.g. Europe/Berlin', max_length=64, validators=[profiles.models.validate_timezone]),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['daily_reminders', 'send_hour', 'id'], name='profile_reminder_bucket_idx'),
+        ),
+    ]
@@ -1,9 +1,30 @@
+import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from core.models import BaseModel
 
+TONE_CHOICES = [
+    ('professional', 'Professional'),
+    ('casual', 'Casual'),
+    ('motivational', 'Motivational'),
+    ('technical', 'Technical'),
+    ('storytelling', 'Storytelling'),
+]
+
+
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"'{value}' is not a known time zone")
+
 
 class Profile(BaseModel):
     """
@@ -20,54 +41,99 @@ class Profile(BaseModel):
     linkedin_profile = models.URLField(blank=True, null=True, help_text="LinkedIn profile URL")
     linkedin_access_token = models.TextField(blank=True, null=True, help_text="LinkedIn OAuth token")
     linkedin_connected = models.BooleanField(default=False)
+    linkedin_member_id = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text="LinkedIn member id posts are authored as; looked up on first publish"
+    )
 
     # User preferences
     preferred_tone = models.CharField(
         max_length=20,
-        choices=[
-            ('professional', 'Professional'),
-            ('casual', 'Casual'),
-            ('motivational', 'Motivational'),
-            ('technical', 'Technical'),
-            ('storytelling', 'Storytelling'),
-        ],
+        choices=TONE_CHOICES,
         default='professional'
     )
 
     # Notification preferences
     email_notifications = models.BooleanField(default=True)
     daily_reminders = models.BooleanField(default=True)
+    timezone = models.CharField(
+        max_length=64,
+        default='UTC',
+        validators=[validate_timezone],
+        help_text="IANA time zone, e.g. Europe/Berlin"
+    )
+    reminder_hour = models.PositiveSmallIntegerField(
+        default=9,
+        validators=[MaxValueValidator(23)],
+        help_text="Local hour the daily reminder is sent at"
+    )
+    # UTC hour of the next reminder; reminders.dispatch sends one bucket per hour
+    send_hour = models.PositiveSmallIntegerField(default=9, editable=False)
 
     # Note: created_at, updated_at, created_by, updated_by are inherited from BaseModel
 
     class Meta:
         verbose_name = "Profile"
         verbose_name_plural = "Profiles"
+        indexes = [
+            # Keyset pagination order, see core.pagination.KeysetPagination
+            models.Index(fields=['created_at', 'id'], name='profile_created_id_idx'),
+            # Incremental exports filter on updated_at, see profiles.export
+            models.Index(fields=['updated_at'], name='profile_updated_idx'),
+            # Admin changelist filters
+            models.Index(fields=['preferred_tone', 'created_at'], name='profile_tone_created_idx'),
+            models.Index(
+                fields=['created_at'],
+                name='profile_linkedin_idx',
+                condition=models.Q(linkedin_connected=True),
+            ),
+            # Hourly reminder buckets, streamed in id order, see reminders.dispatch
+            models.Index(fields=['daily_reminders', 'send_hour', 'id'], name='profile_reminder_bucket_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    def save(self, *args, **kwargs):
+        self.send_hour = utc_send_hour(self.timezone, self.reminder_hour)
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         """Return the user's full name"""
         return f"{self.user.first_name} {self.user.last_name}".strip() or self.user.username
 
+    def local_date(self, at=None):
+        """The date in the user's time zone at `at` (now by default)"""
+        return (at or timezone.now()).astimezone(ZoneInfo(self.timezone)).date()
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+    def start_of_day(self, at=None):
+        """Midnight in the user's time zone on the day of `at` (now by default)"""
+        return datetime.datetime.combine(self.local_date(at), datetime.time(), tzinfo=ZoneInfo(self.timezone))
+
+
+def utc_send_hour(tz_name, local_hour, at=None):
     """
-    Signal to automatically create a profile when a user is created
+    UTC hour at which `local_hour` in `tz_name` falls on the day of `at` (now by default).
+
+    Half-hour zones round up, so a reminder is never sent early.
     """
-    if created:
-        Profile.objects.create(user=instance)
+    tz = ZoneInfo(tz_name)
+    day = (at or timezone.now()).astimezone(tz).date()
+    local = datetime.datetime.combine(day, datetime.time(local_hour), tzinfo=tz)
+    utc = local.astimezone(datetime.timezone.utc)
+    return (utc.hour + (1 if utc.minute or utc.second else 0)) % 24
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def create_user_profile(sender, instance, created, **kwargs):
     """
-    Signal to save the profile when user is saved
+    Signal to automatically create a profile when a user is created.
+
+    Kept synchronous: the rest of the app expects every user to have a
+    profile. Other follow-up work subscribes to core.events instead.
     """
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
+    if created:
         Profile.objects.create(user=instance)
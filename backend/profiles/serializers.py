@@ -23,6 +23,8 @@ class ProfileSerializer(serializers.ModelSerializer):
             'preferred_tone',
             'email_notifications',
             'daily_reminders',
+            'timezone',
+            'reminder_hour',
             # Audit fields
             'created_at',
             'updated_at',
@@ -1,3 +1,99 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .export import buffered, export_queryset, export_stream, iter_rows, ndjson_lines
+from .models import Profile
+
+
+class ReminderSettingsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        profile = self.user.profile
+        profile.timezone = 'Asia/Kolkata'
+        profile.reminder_hour = 9
+        profile.save()
+
+    def test_export_includes_reminder_settings(self):
+        row = json.loads(b''.join(export_stream('ndjson')))
+
+        self.assertEqual(row['timezone'], 'Asia/Kolkata')
+        self.assertEqual(row['reminder_hour'], 9)
+        # 09:00 in UTC+5:30 is 03:30 UTC, rounded up so it is never early
+        self.assertEqual(row['send_hour'], 4)
+
+    def test_admin_shows_reminder_settings(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw-12345678')
+        self.client.force_login(admin)
+
+        response = self.client.get(f'/admin/profiles/profile/{self.user.profile.pk}/change/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'name="timezone"')
+        self.assertContains(response, 'name="reminder_hour"')
+        self.assertContains(response, 'Send hour')
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{n}', f'user{n}@example.com', 'pw-12345678') for n in range(3)]
+        profile = self.users[0].profile
+        profile.bio = 'Builds "things", then writes about them\non two lines'
+        profile.linkedin_access_token = 'secret-token'
+        profile.save()
+
+    def ndjson(self, **kwargs):
+        return [json.loads(line) for line in b''.join(export_stream('ndjson', **kwargs)).splitlines()]
+
+    def test_ndjson_has_one_document_per_profile_in_id_order(self):
+        rows = self.ndjson()
+
+        self.assertEqual([row['username'] for row in rows], ['user0', 'user1', 'user2'])
+        self.assertEqual(rows[0]['bio'], self.users[0].profile.bio)
+        self.assertNotIn('linkedin_access_token', rows[0])
+        self.assertNotIn('secret-token', json.dumps(rows))
+        self.assertEqual(datetime.datetime.fromisoformat(rows[0]['date_joined']), self.users[0].date_joined)
+
+    def test_csv_has_a_header_and_quoted_rows(self):
+        rows = list(csv.DictReader(io.StringIO(b''.join(export_stream('csv')).decode())))
+
+        self.assertEqual([row['username'] for row in rows], ['user0', 'user1', 'user2'])
+        self.assertEqual(rows[0]['bio'], self.users[0].profile.bio)
+
+    def test_updated_window_limits_the_rows(self):
+        cutoff = datetime.datetime(2026, 3, 1, tzinfo=datetime.timezone.utc)
+        Profile.objects.filter(user=self.users[1]).update(updated_at=cutoff - datetime.timedelta(days=1))
+        Profile.objects.exclude(user=self.users[1]).update(updated_at=cutoff + datetime.timedelta(days=1))
+
+        self.assertEqual([row['username'] for row in self.ndjson(updated_until=cutoff)], ['user1'])
+        self.assertEqual([row['username'] for row in self.ndjson(updated_since=cutoff)], ['user0', 'user2'])
+
+    def test_output_is_streamed_in_chunks_and_can_be_gzipped(self):
+        rows = iter_rows(export_queryset(), chunk_size=1)
+        chunks = list(buffered(ndjson_lines(rows), size=1))
+        self.assertEqual(len(chunks), 3)
+
+        self.assertEqual(gzip.decompress(b''.join(export_stream('ndjson', compress=True))), b''.join(chunks))
+
+    def test_view_streams_for_admins_only(self):
+        api = APIClient()
+        api.force_authenticate(self.users[1])
+        self.assertEqual(api.get('/api/v1/profiles/export/').status_code, 403)
+
+        api.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pw-12345678'))
+        self.assertEqual(api.get('/api/v1/profiles/export/', {'output': 'xml'}).status_code, 400)
+        self.assertEqual(api.get('/api/v1/profiles/export/', {'updated_since': 'yesterday'}).status_code, 400)
+
+        response = api.get('/api/v1/profiles/export/', {'output': 'csv', 'gzip': '1'})
 
-# Create your tests here.
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertRegex(response['Content-Disposition'], r'filename="profiles-\d{8}T\d{6}\.csv\.gz"')
+        header = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()[0]
+        self.assertTrue(header.startswith('user_id,username,email'))
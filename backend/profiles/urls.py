@@ -8,11 +8,10 @@ urlpatterns = [
     # path('me/', views.CurrentUserProfileView.as_view(), name='current_user_profile'),
     # path('me/update/', views.UpdateProfileView.as_view(), name='update_profile'),
 
-    # For now, we'll keep this empty but with proper structure
-    # Add profile-specific endpoints here when needed
+    # Bulk data export (admin only)
+    path('export/', views.ProfileExportView.as_view(), name='profile_export'),
 ]
 
-# Note: Currently empty but properly structured
 # Profile functionality is handled through authentication app's profile endpoints
 # This separation allows for future profile-specific features like:
 # - Public profile views
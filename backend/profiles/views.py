@@ -1,3 +1,64 @@
-from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import logging
 
-# Create your views here.
+from .export import EXPORT_FORMATS, export_stream, parse_export_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileExportView(APIView):
+    """
+    Stream a User + Profile dump as NDJSON or CSV (admin only)
+
+    Query parameters:
+        output: ndjson (default) or csv
+        updated_since / updated_until: ISO-8601 bounds on Profile.updated_at
+        gzip: 1 to gzip the stream on the fly
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Export profiles
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response({
+                'error': 'Export failed',
+                'details': {'output': [f"Must be one of: {', '.join(EXPORT_FORMATS)}."]}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for param in ('updated_since', 'updated_until'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                bounds[param] = parse_export_datetime(value)
+            except ValueError as e:
+                return Response({
+                    'error': 'Export failed',
+                    'details': {param: [str(e)]}
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+        filename = f"profiles-{timezone.now():%Y%m%dT%H%M%S}.{output}"
+        content_type = EXPORT_FORMATS[output]
+        if compress:
+            filename += '.gz'
+            content_type = 'application/gzip'
+
+        logger.info(f"Profile export started by {request.user.username} ({output}, {bounds or 'full'})")
+
+        response = StreamingHttpResponse(
+            export_stream(output=output, compress=compress, **bounds),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
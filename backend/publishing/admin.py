@@ -0,0 +1,28 @@
+from django.contrib import admin, messages
+
+from core.pagination import EstimatedCountPaginator
+from .models import OutboxMessage
+from .outbox import requeue_dead_messages
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """
+    Admin for the LinkedIn outbox and its dead letters
+    """
+    list_display = ('id', 'post', 'user', 'status', 'attempts', 'available_at', 'sent_at')
+    list_filter = ('status',)
+    list_select_related = ('user', 'post')
+    ordering = ('-created_at', '-id')
+    search_fields = ('^user__username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    autocomplete_fields = ('user', 'created_by', 'updated_by')
+    raw_id_fields = ('post',)
+    readonly_fields = ('locked_by', 'locked_until', 'sent_at', 'external_id', 'created_at', 'updated_at')
+    actions = ('requeue',)
+
+    @admin.action(description='Requeue dead messages')
+    def requeue(self, request, queryset):
+        requeued = requeue_dead_messages(queryset)
+        self.message_user(request, f"{requeued} message(s) requeued.", messages.SUCCESS)
@@ -0,0 +1,138 @@
+"""
+Drains the LinkedIn outbox with bounded concurrency.
+
+A single loop claims due messages, never more than there are free worker
+threads (so leases don't tick away while messages wait in a local queue),
+and hands them to a thread pool that shares one pooled LinkedIn client.
+Before each call the member token's bucket is checked (core.ratelimit
+buckets, LINKEDIN_TOKEN_REQUESTS_PER_HOUR with a burst of
+LINKEDIN_TOKEN_BURST); a token that is out of budget defers its message
+instead of blocking a thread.
+"""
+import logging
+import os
+import socket
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from core import metrics
+from core.ratelimit import BACKENDS, Limit, RateLimited, plan_reservation
+from posts.models import Post
+from profiles.models import Profile
+from .linkedin import LinkedInPermanentError, LinkedInError, LinkedInRateLimited, build_client
+from .outbox import claim_messages, defer, drop, mark_failed, mark_sent, token_key
+
+logger = logging.getLogger(__name__)
+
+
+class Dispatcher:
+    """
+    Claims due outbox messages and publishes them on `concurrency` threads
+    """
+
+    def __init__(self, concurrency=None, poll_interval=None, lease=None, burst=False, client=None):
+        self.concurrency = concurrency or settings.OUTBOX_CONCURRENCY
+        self.poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+        self.lease = lease or settings.OUTBOX_LEASE
+        self.burst = burst
+        self.dispatcher_id = f"{socket.gethostname()}:{os.getpid()}:outbox"
+        self.client = client or build_client(max_connections=self.concurrency)
+        self.rate_backend = BACKENDS[settings.LINKEDIN_RATE_LIMIT_BACKEND]()
+        self.processed = 0
+
+    def _reserve(self, access_token):
+        """
+        Take one request from the token's bucket; raise RateLimited if it's empty
+        """
+        per_hour = settings.LINKEDIN_TOKEN_REQUESTS_PER_HOUR
+        limit = Limit(token_key(access_token), 'token', settings.LINKEDIN_TOKEN_BURST, per_hour / 3600)
+        self.rate_backend.transact(
+            [limit.key],
+            lambda states, now: plan_reservation([limit], [1], states, now, max_wait=0),
+        )
+
+    def deliver(self, message):
+        """
+        Publish one claimed message and record the outcome
+        """
+        # The post may have been deleted or cancelled since the message was claimed
+        post = Post.objects.filter(pk=message.post_id).values('is_deleted', 'status').first()
+        if post is None or post['is_deleted'] or post['status'] != 'scheduled':
+            return drop(message, self.dispatcher_id, "Post was deleted or is no longer scheduled")
+
+        try:
+            profile = message.user.profile
+        except Profile.DoesNotExist:
+            profile = None
+        if profile is None or not profile.linkedin_connected or not profile.linkedin_access_token:
+            return mark_failed(message, self.dispatcher_id, "LinkedIn account is not connected", permanent=True)
+
+        token = profile.linkedin_access_token
+        try:
+            self._reserve(token)
+        except RateLimited as e:
+            metrics.increment('outbox_rate_limited_total', source='token_bucket')
+            return defer(message, self.dispatcher_id, e.retry_after, "Per-token rate limit")
+
+        try:
+            if not profile.linkedin_member_id:
+                profile.linkedin_member_id = self.client.member_id(token)
+                Profile.objects.filter(pk=profile.pk).update(linkedin_member_id=profile.linkedin_member_id)
+            urn = self.client.create_post(
+                token,
+                profile.linkedin_member_id,
+                message.payload['text'],
+                visibility=message.payload.get('visibility', 'PUBLIC'),
+            )
+        except LinkedInRateLimited as e:
+            metrics.increment('outbox_rate_limited_total', source='linkedin')
+            return defer(message, self.dispatcher_id, e.retry_after, str(e))
+        except LinkedInPermanentError as e:
+            return mark_failed(message, self.dispatcher_id, str(e), permanent=True)
+        except LinkedInError as e:
+            return mark_failed(message, self.dispatcher_id, str(e))
+        return mark_sent(message, self.dispatcher_id, urn)
+
+    def _run_one(self, message):
+        try:
+            outcome = self.deliver(message)
+            logger.info(f"Outbox message {message.pk} (post {message.post_id}) {outcome}")
+            return outcome
+        except Exception:
+            logger.exception(f"Outbox message {message.pk} crashed the dispatcher thread; its lease will expire")
+            return 'crashed'
+        finally:
+            connections.close_all()
+
+    def run(self, stop_event):
+        """
+        Dispatch until stop_event is set (or nothing is due in burst mode)
+        """
+        inflight = set()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='outbox') as pool:
+                while not stop_event.is_set():
+                    free = self.concurrency - len(inflight)
+                    if free:
+                        close_old_connections()
+                        for message in claim_messages(self.dispatcher_id, free, lease=self.lease):
+                            inflight.add(pool.submit(self._run_one, message))
+                    metrics.set_gauge('outbox_inflight', len(inflight))
+
+                    if not inflight:
+                        if self.burst:
+                            break
+                        stop_event.wait(self.poll_interval)
+                        continue
+                    # Wake up when a slot frees; with slots to spare, also poll for newly due messages
+                    done, inflight = wait(
+                        inflight,
+                        timeout=None if len(inflight) >= self.concurrency else self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    self.processed += len(done)
+        finally:
+            connections.close_all()
+            self.client.close()
@@ -0,0 +1,119 @@
+"""
+Minimal LinkedIn client for publishing posts.
+
+One httpx.Client is shared by every dispatcher thread: its connection pool
+keeps TLS connections to LinkedIn alive between posts and is sized to the
+dispatcher's concurrency, so no request waits for a connection and no
+connection is opened per post.
+
+Errors are classified for the outbox: LinkedInRateLimited (429, retry
+after the given delay without using an attempt), LinkedInPermanentError
+(other 4xx, including a revoked token, no point retrying) and
+LinkedInError (5xx and network failures, retried with backoff).
+
+LinkedIn has no idempotency keys, so a post whose response was lost (a
+timeout after LinkedIn accepted it) can be published twice on retry.
+"""
+import httpx
+from django.conf import settings
+
+
+class LinkedInError(Exception):
+    """
+    A failure worth retrying
+    """
+
+
+class LinkedInPermanentError(LinkedInError):
+    """
+    A failure retrying won't fix
+    """
+
+
+class LinkedInRateLimited(LinkedInError):
+    def __init__(self, retry_after, message):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class LinkedInClient:
+    """
+    The two LinkedIn calls publishing needs, over a pooled keep-alive client
+    """
+
+    def __init__(self, base_url, version, timeout, max_connections):
+        self.http = httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            ),
+            headers={
+                'LinkedIn-Version': version,
+                'X-Restli-Protocol-Version': '2.0.0',
+            },
+        )
+
+    def close(self):
+        self.http.close()
+
+    def _request(self, method, path, access_token, **kwargs):
+        try:
+            response = self.http.request(
+                method,
+                path,
+                headers={'Authorization': f'Bearer {access_token}'},
+                **kwargs,
+            )
+        except httpx.HTTPError as e:
+            raise LinkedInError(f"{type(e).__name__}: {str(e)}") from e
+
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('Retry-After', 60))
+            except ValueError:
+                retry_after = 60.0
+            raise LinkedInRateLimited(retry_after, "LinkedIn rate limit reached")
+        if response.status_code >= 500:
+            raise LinkedInError(f"LinkedIn returned {response.status_code}: {response.text[:500]}")
+        if response.status_code >= 400:
+            raise LinkedInPermanentError(f"LinkedIn returned {response.status_code}: {response.text[:500]}")
+        return response
+
+    def member_id(self, access_token):
+        """
+        The id of the member the token belongs to (OpenID Connect userinfo)
+        """
+        return self._request('GET', '/v2/userinfo', access_token).json()['sub']
+
+    def create_post(self, access_token, member_id, text, visibility='PUBLIC'):
+        """
+        Publish a text post as the member; return the new post's URN
+        """
+        response = self._request('POST', '/rest/posts', access_token, json={
+            'author': f'urn:li:person:{member_id}',
+            'commentary': text,
+            'visibility': visibility,
+            'distribution': {
+                'feedDistribution': 'MAIN_FEED',
+                'targetEntities': [],
+                'thirdPartyDistributionChannels': [],
+            },
+            'lifecycleState': 'PUBLISHED',
+            'isReshareDisabledByAuthor': False,
+        })
+        return response.headers.get('x-restli-id', '')
+
+
+def build_client(max_connections):
+    """
+    A client configured by the LINKEDIN_* settings with a pool of `max_connections`
+    """
+    return LinkedInClient(
+        base_url=settings.LINKEDIN_API_BASE_URL,
+        version=settings.LINKEDIN_API_VERSION,
+        timeout=settings.LINKEDIN_TIMEOUT,
+        max_connections=max_connections,
+    )
@@ -0,0 +1,36 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from publishing.dispatcher import Dispatcher
+
+
+class Command(BaseCommand):
+    help = "Publish scheduled posts from the LinkedIn outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help="Concurrent LinkedIn calls (and pooled connections)")
+        parser.add_argument('--poll-interval', type=float, help="Seconds between checks for due messages")
+        parser.add_argument('--lease', type=int, help="Seconds a claimed message stays leased")
+        parser.add_argument('--burst', action='store_true', help="Exit once nothing is due")
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            lease=options['lease'],
+            burst=options['burst'],
+        )
+        stop_event = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after in-flight posts are published...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f"Dispatching outbox with concurrency {dispatcher.concurrency}")
+        dispatcher.run(stop_event)
+        self.stdout.write(self.style.SUCCESS(f"Dispatcher stopped after {dispatcher.processed} message(s)."))
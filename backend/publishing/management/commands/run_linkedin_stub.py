@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from publishing.stub_server import StubLinkedInServer
+
+
+class Command(BaseCommand):
+    help = "Run a local stand-in for the LinkedIn posts API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--latency', type=float, default=0.2, help="Seconds to take per post")
+        parser.add_argument('--fail-rate', type=float, default=0.0, help="Share of posts answered with 503")
+        parser.add_argument('--rate-limit', type=int, default=0,
+                            help="Requests per token per minute before answering 429 (0 disables)")
+
+    def handle(self, *args, **options):
+        server = StubLinkedInServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            fail_rate=options['fail_rate'],
+            rate_limit=options['rate_limit'],
+            verbose=True,
+        )
+        self.stdout.write(f"LinkedIn stub listening on {server.base_url}")
+        self.stdout.write(f"Set LINKEDIN_API_BASE_URL={server.base_url} to use it.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
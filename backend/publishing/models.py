@@ -0,0 +1,61 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils import timezone
+from core.models import BaseModel
+
+
+class OutboxMessage(BaseModel):
+    """
+    A post waiting to be published to LinkedIn, see publishing.outbox.
+
+    Written in the same transaction that schedules the post, so a post is
+    never marked scheduled without a message to publish it (or the other
+    way round). manage.py dispatch_outbox drains due messages.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='outbox_messages')
+    # posts_post is partitioned on PostgreSQL, see core.partitioning
+    post = models.ForeignKey(
+        'posts.Post',
+        on_delete=models.CASCADE,
+        related_name='outbox_messages',
+        db_constraint=False,
+    )
+    payload = models.JSONField(default=dict, help_text="Snapshot of what to publish, taken when scheduled")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+
+    # Delivery and retries
+    available_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the message may be sent")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=8)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=200, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    external_id = models.CharField(max_length=200, blank=True, help_text="URN of the published LinkedIn post")
+
+    # Note: created_at, updated_at, created_by, updated_by are inherited from BaseModel
+
+    class Meta:
+        verbose_name = "Outbox message"
+        verbose_name_plural = "Outbox messages"
+        indexes = [
+            # Dispatcher claims: due pending messages and expired leases
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+            models.Index(fields=['status', 'locked_until'], name='outbox_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"Outbox message {self.pk} for post {self.post_id} ({self.status})"
@@ -0,0 +1,295 @@
+"""
+Transactional outbox for LinkedIn publishing.
+
+schedule_publication() marks a post scheduled and writes its OutboxMessage
+in one transaction; nothing talks to LinkedIn on the request path. The
+dispatcher (publishing.dispatcher) claims due messages, publishes them and
+records the outcome:
+
+- success: the message is sent and the post published, in one transaction
+- LinkedIn rate limit (429) or our own per-token limit: deferred without
+  using an attempt
+- transient failure: retried with exponential backoff and jitter
+- permanent failure, or max_attempts used up: dead-lettered, and the post
+  goes back to draft so the user can fix and reschedule it
+- post deleted, or no longer scheduled, by the time it's claimed: dropped
+  (cancelled) without calling LinkedIn. Deleting a post cancels its pending
+  message in the same transaction.
+
+Claims work like jobs.queue: SELECT ... FOR UPDATE SKIP LOCKED where
+supported, a compare-and-set UPDATE on SQLite, and a lease after which an
+abandoned message can be claimed again.
+"""
+import datetime
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from analytics.rollups import record
+from core import metrics
+from core.retry import backoff_delay
+from posts.models import Post
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class PublishError(Exception):
+    """
+    Raised when a post can't be scheduled
+    """
+
+
+def schedule_publication(post, user, when=None):
+    """
+    Schedule the post for publishing at `when` (now by default); return the outbox message
+    """
+    profile = getattr(user, 'profile', None)
+    if not profile or not profile.linkedin_connected or not profile.linkedin_access_token:
+        raise PublishError("Connect your LinkedIn account before publishing")
+    if post.status in ('scheduled', 'published'):
+        raise PublishError(f"Post is already {post.status}")
+    if not post.content.strip():
+        raise PublishError("Post has no content to publish")
+
+    when = when or timezone.now()
+    with transaction.atomic():
+        updated = Post.active_objects.filter(pk=post.pk).exclude(status__in=('scheduled', 'published')).update(
+            status='scheduled',
+            scheduled_at=when,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            raise PublishError("Post is already scheduled")
+        message = OutboxMessage(
+            user=user,
+            post=post,
+            payload={'text': post.content, 'visibility': 'PUBLIC'},
+            available_at=when,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        )
+        message.save(user=user)
+    post.status, post.scheduled_at = 'scheduled', when
+    metrics.increment('outbox_messages_total', event='scheduled')
+    return message
+
+
+def cancel_publication(post):
+    """
+    Cancel a scheduled post that hasn't been sent yet; return True if cancelled
+    """
+    with transaction.atomic():
+        cancelled = OutboxMessage.objects.filter(post=post, status=OutboxMessage.STATUS_PENDING).update(
+            status=OutboxMessage.STATUS_CANCELLED,
+            updated_at=timezone.now(),
+        )
+        if not cancelled:
+            return False
+        Post.objects.filter(pk=post.pk, status='scheduled').update(
+            status='draft',
+            scheduled_at=None,
+            updated_at=timezone.now(),
+        )
+    post.status, post.scheduled_at = 'draft', None
+    metrics.increment('outbox_messages_total', event='cancelled')
+    return True
+
+
+def token_key(access_token):
+    """
+    Rate limit key for a member token that doesn't keep the token itself in memory
+    """
+    return 'linkedin:token:' + hashlib.sha256(access_token.encode()).hexdigest()[:32]
+
+
+def _due_filter(now):
+    return (
+        Q(status=OutboxMessage.STATUS_PENDING, available_at__lte=now)
+        | Q(status=OutboxMessage.STATUS_SENDING, locked_until__lt=now)
+    )
+
+
+def claim_messages(dispatcher_id, limit, lease=None):
+    """
+    Lease up to `limit` due messages to the dispatcher and return them with their profiles
+    """
+    lease = lease or settings.OUTBOX_LEASE
+    now = timezone.now()
+    values = {
+        'status': OutboxMessage.STATUS_SENDING,
+        'locked_by': dispatcher_id,
+        'locked_until': now + datetime.timedelta(seconds=lease),
+        'attempts': F('attempts') + 1,
+        'updated_at': now,
+    }
+    connection = connections[router.db_for_write(OutboxMessage)]
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                OutboxMessage.objects.select_for_update(skip_locked=True)
+                .filter(_due_filter(now))
+                .order_by('available_at', 'id')
+                .values_list('id', flat=True)[:limit]
+            )
+            if ids:
+                OutboxMessage.objects.filter(pk__in=ids).update(**values)
+    else:
+        candidates = (
+            OutboxMessage.objects.filter(_due_filter(now))
+            .order_by('available_at', 'id')
+            .values_list('id', 'status', 'locked_until')[:limit * 4]
+        )
+        ids = []
+        for pk, status, locked_until in candidates:
+            if OutboxMessage.objects.filter(pk=pk, status=status, locked_until=locked_until).update(**values):
+                ids.append(pk)
+                if len(ids) >= limit:
+                    break
+
+    if not ids:
+        return []
+    return list(
+        OutboxMessage.objects.filter(pk__in=ids, locked_by=dispatcher_id)
+        .select_related('user__profile')
+        .order_by('available_at', 'id')
+    )
+
+
+def _leased(message, dispatcher_id):
+    return OutboxMessage.objects.filter(
+        pk=message.pk,
+        locked_by=dispatcher_id,
+        status=OutboxMessage.STATUS_SENDING,
+    )
+
+
+def mark_sent(message, dispatcher_id, external_id):
+    """
+    Record a successful publish on the message and its post
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = _leased(message, dispatcher_id).update(
+            status=OutboxMessage.STATUS_SENT,
+            external_id=external_id,
+            sent_at=now,
+            locked_until=None,
+            updated_at=now,
+        )
+        if not updated:
+            # Our lease expired and another dispatcher took over; it records the outcome
+            logger.warning(f"Outbox message {message.pk} sent after its lease was lost")
+            return 'lost'
+        Post.objects.filter(pk=message.post_id).update(
+            status='published',
+            published_at=now,
+            linkedin_post_urn=external_id,
+            updated_at=now,
+        )
+        record(message.user_id, 'posts_published')
+    metrics.increment('outbox_messages_total', event='sent')
+    return 'sent'
+
+
+def mark_failed(message, dispatcher_id, error, permanent=False):
+    """
+    Schedule a retry with backoff, or dead-letter the message and return the post to draft
+    """
+    now = timezone.now()
+    values = {'last_error': error[-4000:], 'locked_until': None, 'updated_at': now}
+    if permanent or message.attempts >= message.max_attempts:
+        with transaction.atomic():
+            if _leased(message, dispatcher_id).update(status=OutboxMessage.STATUS_DEAD, **values):
+                Post.objects.filter(pk=message.post_id, status='scheduled').update(
+                    status='draft',
+                    scheduled_at=None,
+                    updated_at=now,
+                )
+        outcome = 'dead'
+        logger.error(f"Outbox message {message.pk} dead-lettered after {message.attempts} attempt(s): {error}")
+    else:
+        delay = backoff_delay(message.attempts, base=settings.OUTBOX_RETRY_BASE_DELAY,
+                              cap=settings.OUTBOX_RETRY_MAX_DELAY)
+        _leased(message, dispatcher_id).update(
+            status=OutboxMessage.STATUS_PENDING,
+            available_at=now + datetime.timedelta(seconds=delay),
+            **values,
+        )
+        outcome = 'retried'
+        logger.warning(f"Outbox message {message.pk} failed on attempt {message.attempts}, retrying in {delay:.0f}s")
+    metrics.increment('outbox_messages_total', event=outcome)
+    return outcome
+
+
+def defer(message, dispatcher_id, delay, reason):
+    """
+    Put a leased message back without using up an attempt
+    """
+    now = timezone.now()
+    _leased(message, dispatcher_id).update(
+        status=OutboxMessage.STATUS_PENDING,
+        available_at=now + datetime.timedelta(seconds=delay),
+        attempts=F('attempts') - 1,
+        last_error=reason,
+        locked_until=None,
+        updated_at=now,
+    )
+    metrics.increment('outbox_messages_total', event='deferred')
+    return 'deferred'
+
+
+def drop(message, dispatcher_id, reason):
+    """
+    Cancel a leased message whose post was deleted or is no longer waiting to be published
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if _leased(message, dispatcher_id).update(
+            status=OutboxMessage.STATUS_CANCELLED,
+            last_error=reason,
+            locked_until=None,
+            updated_at=now,
+        ):
+            Post.objects.filter(pk=message.post_id, status='scheduled', is_deleted=True).update(
+                status='draft',
+                scheduled_at=None,
+                updated_at=now,
+            )
+    metrics.increment('outbox_messages_total', event='dropped')
+    return 'dropped'
+
+
+def requeue_dead_messages(queryset):
+    """
+    Give dead-lettered messages a fresh set of attempts (their posts are scheduled again).
+
+    Only the latest dead message of a post that is still an undeleted draft is
+    requeued: a post rescheduled or published since has a message of its own,
+    and requeueing the old one would publish it twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        latest = {}
+        dead = (
+            queryset.filter(status=OutboxMessage.STATUS_DEAD)
+            .filter(post_id__in=Post.active_objects.filter(status='draft').values('pk'))
+            .values_list('post_id', 'id')
+        )
+        for post_id, pk in dead:
+            latest[post_id] = max(pk, latest.get(post_id, pk))
+        post_ids = list(
+            Post.active_objects.select_for_update().filter(pk__in=latest, status='draft').values_list('pk', flat=True)
+        )
+        Post.objects.filter(pk__in=post_ids).update(status='scheduled', updated_at=now)
+        requeued = [latest[post_id] for post_id in post_ids]
+        return OutboxMessage.objects.filter(pk__in=requeued, status=OutboxMessage.STATUS_DEAD).update(
+            status=OutboxMessage.STATUS_PENDING,
+            attempts=0,
+            available_at=now,
+            updated_at=now,
+        )
@@ -0,0 +1,167 @@
+"""
+Local stand-in for the LinkedIn APIs used by publishing.
+
+Implements GET /v2/userinfo and POST /rest/posts closely enough for
+publishing.linkedin, plus knobs for exercising the outbox: response
+latency, a share of transient 503s, a per-token rate limit answered with
+429 + Retry-After, and tokens starting with "revoked" answered with 401.
+GET /stub/stats reports posts, requests and TCP connections accepted, so
+connection reuse can be checked:
+
+    python manage.py run_linkedin_stub --port 8766
+    LINKEDIN_API_BASE_URL=http://127.0.0.1:8766 python manage.py dispatch_outbox
+"""
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLinkedInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'LinkedInStub/1.0'
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message, headers=None):
+        self.send_json(status, {'status': status, 'message': message}, headers)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def authorize(self):
+        """
+        Return the bearer token, or answer the request and return None
+        """
+        header = self.headers.get('Authorization', '')
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else ''
+        if not token or token.startswith('revoked'):
+            self.send_error_json(401, 'Invalid access token')
+            return None
+        retry_after = self.server.rate_limited(token)
+        if retry_after:
+            self.send_error_json(429, 'Too many requests', {'Retry-After': str(retry_after)})
+            return None
+        return token
+
+    def do_GET(self):
+        self.server.count('requests')
+        path = self.path.split('?')[0]
+        if path == '/stub/stats':
+            self.send_json(200, self.server.stats())
+            return
+        if path != '/v2/userinfo':
+            self.send_error_json(404, 'Not found')
+            return
+        token = self.authorize()
+        if token is not None:
+            self.send_json(200, {'sub': member_id(token), 'name': 'Stub Member'})
+
+    def do_POST(self):
+        self.server.count('requests')
+        if self.path.split('?')[0] != '/rest/posts':
+            self.send_error_json(404, 'Not found')
+            return
+        body = self.read_json()
+        token = self.authorize()
+        if token is None:
+            return
+        time.sleep(self.server.latency)
+        if random.random() < self.server.fail_rate:
+            self.send_error_json(503, 'Service unavailable')
+            return
+        if body.get('author') != f'urn:li:person:{member_id(token)}':
+            self.send_error_json(403, 'Author does not match the access token')
+            return
+        if not body.get('commentary'):
+            self.send_error_json(422, 'commentary is required')
+            return
+        urn = self.server.publish(body)
+        self.send_json(201, {}, {'x-restli-id': urn})
+
+
+def member_id(token):
+    return hashlib.sha256(token.encode()).hexdigest()[:10]
+
+
+class StubLinkedInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, fail_rate=0.0, rate_limit=0, verbose=False):
+        super().__init__(address, StubLinkedInHandler)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        # Requests per token per minute; 0 disables
+        self.rate_limit = rate_limit
+        self.verbose = verbose
+        self.posts = []
+        self.counters = defaultdict(int)
+        self.recent = defaultdict(deque)
+        self.ids = itertools.count(7000000000000000000)
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def rate_limited(self, token):
+        """
+        Seconds until the token may call again, or 0
+        """
+        if not self.rate_limit:
+            return 0
+        now = time.monotonic()
+        with self.lock:
+            recent = self.recent[token]
+            while recent and recent[0] <= now - 60:
+                recent.popleft()
+            if len(recent) >= self.rate_limit:
+                self.counters['rate_limited'] += 1
+                return max(1, int(recent[0] + 60 - now) + 1)
+            recent.append(now)
+            return 0
+
+    def publish(self, body):
+        with self.lock:
+            urn = f"urn:li:share:{next(self.ids)}"
+            self.posts.append({'urn': urn, **body})
+            return urn
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, 'posts': len(self.posts)}
+
+
+def start_stub_server(host='127.0.0.1', port=0, **options):
+    """
+    Start the stub in a background thread and return the server
+    """
+    server = StubLinkedInServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,140 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from .dispatcher import Dispatcher
+from .linkedin import LinkedInError, LinkedInPermanentError, LinkedInRateLimited
+from .models import OutboxMessage
+from .outbox import cancel_publication, claim_messages, requeue_dead_messages, schedule_publication
+
+
+class FakeLinkedInClient:
+    """
+    Stands in for publishing.linkedin.LinkedInClient; `error` is raised by create_post
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+        self.posts = []
+
+    def member_id(self, access_token):
+        return 'member-1'
+
+    def create_post(self, access_token, member_id, text, visibility='PUBLIC'):
+        if self.error:
+            raise self.error
+        self.posts.append(text)
+        return f'urn:li:share:{len(self.posts)}'
+
+    def close(self):
+        pass
+
+
+@override_settings(LINKEDIN_RATE_LIMIT_BACKEND='memory', OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw-12345678')
+        profile = self.user.profile
+        profile.linkedin_connected = True
+        profile.linkedin_access_token = 'token-ada'
+        profile.save()
+        self.post = Post.objects.create(user=self.user, input_text='Note', content='Shipped the outbox')
+
+    def dispatch(self, client):
+        dispatcher = Dispatcher(concurrency=1, client=client)
+        return [dispatcher.deliver(message) for message in claim_messages(dispatcher.dispatcher_id, 10)]
+
+    def make_due(self):
+        OutboxMessage.objects.update(available_at=timezone.now() - datetime.timedelta(seconds=1))
+
+    def test_scheduled_post_is_sent_and_published(self):
+        schedule_publication(self.post, self.user)
+        client = FakeLinkedInClient()
+
+        self.assertEqual(self.dispatch(client), ['sent'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'published')
+        self.assertEqual(self.post.linkedin_post_urn, 'urn:li:share:1')
+        self.assertEqual(client.posts, ['Shipped the outbox'])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_SENT)
+
+    def test_transient_failures_retry_then_dead_letter(self):
+        schedule_publication(self.post, self.user)
+        client = FakeLinkedInClient(error=LinkedInError("503 from LinkedIn"))
+
+        self.assertEqual(self.dispatch(client), ['retried'])
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.STATUS_PENDING, 1))
+        self.assertGreater(message.available_at, timezone.now())
+        self.assertEqual(self.dispatch(client), [])
+
+        self.make_due()
+        self.assertEqual(self.dispatch(client), ['dead'])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_DEAD)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'draft')
+
+    def test_permanent_failure_dead_letters_at_once(self):
+        schedule_publication(self.post, self.user)
+        self.assertEqual(self.dispatch(FakeLinkedInClient(error=LinkedInPermanentError("401"))), ['dead'])
+
+    def test_rate_limit_defers_without_using_an_attempt(self):
+        schedule_publication(self.post, self.user)
+        self.assertEqual(self.dispatch(FakeLinkedInClient(error=LinkedInRateLimited(30, "429"))), ['deferred'])
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), (OutboxMessage.STATUS_PENDING, 0))
+
+    def test_cancel_returns_post_to_draft(self):
+        schedule_publication(self.post, self.user)
+        self.assertTrue(cancel_publication(self.post))
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_CANCELLED)
+        self.assertEqual(self.dispatch(FakeLinkedInClient()), [])
+
+    def test_deleting_a_scheduled_post_cancels_its_message(self):
+        schedule_publication(self.post, self.user)
+        api = APIClient()
+        api.force_authenticate(self.user)
+
+        response = api.delete(f'/api/v1/posts/{self.post.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_CANCELLED)
+        client = FakeLinkedInClient()
+        self.assertEqual(self.dispatch(client), [])
+        self.assertEqual(client.posts, [])
+
+    def test_claimed_message_of_deleted_post_is_dropped(self):
+        schedule_publication(self.post, self.user)
+        dispatcher = Dispatcher(concurrency=1, client=FakeLinkedInClient())
+        message, = claim_messages(dispatcher.dispatcher_id, 10)
+        Post.objects.filter(pk=self.post.pk).update(is_deleted=True)
+
+        self.assertEqual(dispatcher.deliver(message), 'dropped')
+        self.assertEqual(dispatcher.client.posts, [])
+        self.assertEqual(OutboxMessage.objects.get().status, OutboxMessage.STATUS_CANCELLED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'draft')
+
+    def test_requeue_dead_message(self):
+        schedule_publication(self.post, self.user)
+        self.dispatch(FakeLinkedInClient(error=LinkedInPermanentError("401")))
+
+        self.assertEqual(requeue_dead_messages(OutboxMessage.objects.all()), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, 'scheduled')
+        self.assertEqual(self.dispatch(FakeLinkedInClient()), ['sent'])
+
+    def test_requeue_skips_posts_rescheduled_or_published_since(self):
+        schedule_publication(self.post, self.user)
+        self.dispatch(FakeLinkedInClient(error=LinkedInPermanentError("401")))
+        self.post.refresh_from_db()
+        schedule_publication(self.post, self.user)
+
+        self.assertEqual(requeue_dead_messages(OutboxMessage.objects.all()), 0)
+        self.assertEqual(self.dispatch(FakeLinkedInClient()), ['sent'])
+        self.assertEqual(requeue_dead_messages(OutboxMessage.objects.all()), 0)
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING).count(), 0)
@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import ReminderRun
+
+
+@admin.register(ReminderRun)
+class ReminderRunAdmin(admin.ModelAdmin):
+    """
+    Read-only view of reminder run progress (written by manage.py send_reminders)
+    """
+    list_display = ('run_date', 'send_hour', 'status', 'sent', 'skipped', 'failed', 'last_profile_id', 'finished_at')
+    list_filter = ('status',)
+    ordering = ('-run_date', '-send_hour')
+    date_hierarchy = 'run_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,251 @@
+"""
+Daily check-in reminders, sent one hourly bucket at a time.
+
+Profile.send_hour is the UTC hour a user's local reminder_hour falls on,
+so `send_reminders` run every hour only reads the bucket that is due:
+opted-in profiles with that send_hour, streamed in id order with
+.iterator() over the (daily_reminders, send_hour, id) index. Each batch
+drops users who already checked in that local day (a challenge check-in or
+a daily note), sends the rest over one email connection that stays open
+for the whole run, and moves the ReminderRun cursor forward. A run that
+dies part way is resumed from the cursor by the next invocation for the
+same bucket; at most the batch in flight is sent twice.
+
+Daylight saving moves the UTC hour of a local reminder twice a year, so
+refresh_send_hours() recomputes send_hour for every (timezone,
+reminder_hour) pair. The command runs it with the 00:00 UTC bucket.
+"""
+import datetime
+import logging
+import os
+import socket
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from challenges.models import CheckIn
+from core import metrics
+from posts.models import Post
+from profiles.models import Profile, utc_send_hour
+from .models import ReminderRun
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_send_hours(at=None):
+    """
+    Recompute send_hour for the day of `at` (now by default); return the number of profiles moved
+    """
+    moved = 0
+    pairs = (
+        Profile.objects.filter(daily_reminders=True)
+        .values_list('timezone', 'reminder_hour')
+        .distinct()
+    )
+    for tz_name, reminder_hour in pairs:
+        send_hour = utc_send_hour(tz_name, reminder_hour, at)
+        moved += (
+            Profile.objects.filter(timezone=tz_name, reminder_hour=reminder_hour)
+            .exclude(send_hour=send_hour)
+            .update(send_hour=send_hour)
+        )
+    if moved:
+        logger.info(f"Moved {moved} profile(s) to a new reminder hour")
+    return moved
+
+
+def bucket_queryset(send_hour):
+    """
+    Profiles due a reminder at `send_hour` UTC, in cursor order
+    """
+    return (
+        Profile.objects.filter(daily_reminders=True, send_hour=send_hour)
+        .filter(email_notifications=True, user__is_active=True)
+        .exclude(user__email='')
+        .select_related('user')
+        .only('id', 'timezone', 'user__email', 'user__username', 'user__first_name')
+        .order_by('id')
+    )
+
+
+def claim_run(run_date, send_hour, dispatcher_id, lease=None):
+    """
+    Lease the bucket's ReminderRun, creating it on first use; None if it's done or leased elsewhere
+    """
+    lease = lease or settings.REMINDER_LEASE
+    now = timezone.now()
+    run, _ = ReminderRun.objects.get_or_create(run_date=run_date, send_hour=send_hour)
+    claimed = (
+        ReminderRun.objects.filter(pk=run.pk, status=ReminderRun.STATUS_RUNNING)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now) | Q(locked_by=dispatcher_id))
+        .update(locked_by=dispatcher_id, locked_until=now + datetime.timedelta(seconds=lease), updated_at=now)
+    )
+    if not claimed:
+        return None
+    run.refresh_from_db()
+    return run
+
+
+def _local_dates(profiles, slot, zones):
+    """
+    Map profile id to the local date of the reminder slot
+    """
+    dates = {}
+    for profile in profiles:
+        if profile.timezone not in zones:
+            zones[profile.timezone] = ZoneInfo(profile.timezone)
+        dates[profile.pk] = slot.astimezone(zones[profile.timezone]).date()
+    return dates
+
+
+def checked_in_user_ids(profiles, local_dates, zones):
+    """
+    Users among `profiles` who checked in or wrote a daily note on their local date
+    """
+    wanted = {profile.user_id: local_dates[profile.pk] for profile in profiles}
+    if not wanted:
+        return set()
+    done = {
+        user_id
+        for user_id, date in CheckIn.active_objects.filter(
+            user_id__in=wanted,
+            date__in=set(wanted.values()),
+        ).values_list('user_id', 'date')
+        if wanted[user_id] == date
+    }
+
+    # Daily notes: one range covering every local day in the batch, then an exact check per user
+    tz_by_user = {profile.user_id: zones[profile.timezone] for profile in profiles}
+    day_start = {
+        user_id: datetime.datetime.combine(date, datetime.time.min, tzinfo=tz_by_user[user_id])
+        for user_id, date in wanted.items()
+        if user_id not in done
+    }
+    if day_start:
+        notes = (
+            Post.active_objects.filter(
+                user_id__in=day_start,
+                created_at__gte=min(day_start.values()),
+                created_at__lt=max(day_start.values()) + datetime.timedelta(days=1),
+            )
+            .exclude(status='suggested')
+            .values_list('user_id', 'created_at')
+        )
+        for user_id, created_at in notes:
+            if day_start[user_id] <= created_at < day_start[user_id] + datetime.timedelta(days=1):
+                done.add(user_id)
+    return done
+
+
+def build_message(profile, local_date):
+    name = profile.user.first_name or profile.user.username
+    body = (
+        f"Hi {name},\n\n"
+        f"You haven't checked in yet today ({local_date:%A, %B} {local_date.day}). "
+        f"Take a minute to note what you worked on and we'll turn it into a post:\n\n"
+        f"{settings.REMINDER_CHECK_IN_URL}\n\n"
+        f"You can turn these reminders off in your profile settings.\n"
+    )
+    return EmailMessage(
+        subject="Time for today's check-in",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[profile.user.email],
+    )
+
+
+def send_batch(connection, messages):
+    """
+    Send messages over the open connection; return (sent, failed).
+
+    A failed message gets one more try on a fresh connection, so a dropped
+    SMTP session costs a reconnect rather than the rest of the batch.
+    """
+    sent = failed = 0
+    for message in messages:
+        message.connection = connection
+        try:
+            sent += connection.send_messages([message])
+            continue
+        except Exception as e:
+            logger.warning(f"Reminder to {message.to[0]} failed, reconnecting: {type(e).__name__}: {str(e)}")
+        try:
+            connection.close()
+            connection.open()
+            sent += connection.send_messages([message])
+        except Exception as e:
+            failed += 1
+            logger.error(f"Reminder to {message.to[0]} failed: {type(e).__name__}: {str(e)}")
+    return sent, failed
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def dispatch_reminders(send_hour=None, run_date=None, batch_size=None, lease=None, connection=None):
+    """
+    Send the reminders of one hourly bucket (the current UTC hour by default).
+
+    Returns the bucket's ReminderRun, or None if it was already completed or
+    another process holds it.
+    """
+    now = timezone.now()
+    send_hour = now.hour if send_hour is None else send_hour
+    run_date = run_date or now.date()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    lease = lease or settings.REMINDER_LEASE
+    dispatcher_id = f"{socket.gethostname()}:{os.getpid()}:reminders"
+    slot = datetime.datetime.combine(run_date, datetime.time(send_hour), tzinfo=datetime.timezone.utc)
+
+    run = claim_run(run_date, send_hour, dispatcher_id, lease)
+    if run is None:
+        return None
+    if run.last_profile_id:
+        logger.info(f"Resuming {run} after profile {run.last_profile_id}")
+
+    profiles = bucket_queryset(send_hour).filter(id__gt=run.last_profile_id).iterator(chunk_size=batch_size)
+    connection = connection or get_connection()
+    zones = {}
+    try:
+        connection.open()
+        for batch in _batches(profiles, batch_size):
+            local_dates = _local_dates(batch, slot, zones)
+            done = checked_in_user_ids(batch, local_dates, zones)
+            due = [profile for profile in batch if profile.user_id not in done]
+            sent, failed = send_batch(connection, [build_message(p, local_dates[p.pk]) for p in due])
+            skipped = len(batch) - len(due)
+
+            now = timezone.now()
+            advanced = ReminderRun.objects.filter(pk=run.pk, locked_by=dispatcher_id).update(
+                last_profile_id=batch[-1].pk,
+                sent=F('sent') + sent,
+                skipped=F('skipped') + skipped,
+                failed=F('failed') + failed,
+                locked_until=now + datetime.timedelta(seconds=lease),
+                updated_at=now,
+            )
+            metrics.increment('reminders_total', sent, outcome='sent')
+            metrics.increment('reminders_total', skipped, outcome='skipped')
+            metrics.increment('reminders_total', failed, outcome='failed')
+            if not advanced:
+                logger.warning(f"Lost the lease on {run}; stopping after profile {batch[-1].pk}")
+                return run
+    finally:
+        connection.close()
+
+    ReminderRun.objects.filter(pk=run.pk, locked_by=dispatcher_id).update(
+        status=ReminderRun.STATUS_COMPLETED,
+        locked_until=None,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    run.refresh_from_db()
+    logger.info(f"{run}: {run.sent} sent, {run.skipped} already checked in, {run.failed} failed")
+    return run
@@ -0,0 +1,43 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reminders.dispatch import dispatch_reminders, refresh_send_hours
+
+
+class Command(BaseCommand):
+    help = "Email check-in reminders to users whose local reminder time falls in this UTC hour (run hourly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hour', type=int, help="UTC hour bucket to send (default: the current hour)")
+        parser.add_argument('--date', help="UTC date of the bucket, YYYY-MM-DD (default: today)")
+        parser.add_argument('--batch-size', type=int, help="Profiles per batch and progress checkpoint")
+        parser.add_argument(
+            '--refresh-send-hours',
+            action='store_true',
+            help="Recompute every profile's UTC send hour first (done automatically for the 00:00 bucket)",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        hour = now.hour if options['hour'] is None else options['hour']
+        if not 0 <= hour <= 23:
+            raise CommandError("--hour must be between 0 and 23")
+        try:
+            run_date = datetime.date.fromisoformat(options['date']) if options['date'] else now.date()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD")
+
+        if options['refresh_send_hours'] or hour == 0:
+            at = datetime.datetime.combine(run_date, datetime.time(hour), tzinfo=datetime.timezone.utc)
+            moved = refresh_send_hours(at)
+            self.stdout.write(f"Recomputed send hours; {moved} profile(s) moved.")
+
+        run = dispatch_reminders(send_hour=hour, run_date=run_date, batch_size=options['batch_size'])
+        if run is None:
+            self.stdout.write(f"Reminders for {run_date} {hour:02d}:00 UTC are already sent or in progress elsewhere.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{run}: {run.sent} sent, {run.skipped} already checked in, {run.failed} failed."
+        ))
@@ -0,0 +1,44 @@
+from django.db import models
+
+from core.models import BaseModel
+
+
+class ReminderRun(BaseModel):
+    """
+    Progress of one hourly reminder bucket, so an interrupted run resumes
+    after the last profile it got through instead of starting over
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    # The bucket: reminders due at send_hour (UTC) on run_date (UTC)
+    run_date = models.DateField()
+    send_hour = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+
+    # Keyset cursor: profiles with a larger id haven't been handled yet
+    last_profile_id = models.BigIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0, help_text="Already checked in that day")
+    failed = models.PositiveIntegerField(default=0)
+
+    # Lease held by the process working through the bucket
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Note: created_at, updated_at, created_by, updated_by are inherited from BaseModel
+
+    class Meta:
+        verbose_name = "Reminder run"
+        verbose_name_plural = "Reminder runs"
+        constraints = [
+            models.UniqueConstraint(fields=['run_date', 'send_hour'], name='reminder_run_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Reminders {self.run_date} {self.send_hour:02d}:00 UTC ({self.status})"
@@ -0,0 +1,80 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase
+
+from challenges.models import Challenge
+from challenges.streaks import record_check_in
+from .dispatch import dispatch_reminders
+from .models import ReminderRun
+
+RUN_DATE = datetime.date(2026, 3, 2)
+
+
+class Crash(BaseException):
+    """
+    Kills a run part way, like the process being stopped
+    """
+
+
+class CrashingBackend(locmem.EmailBackend):
+    def __init__(self, crash_after, **kwargs):
+        super().__init__(**kwargs)
+        self.crash_after = crash_after
+
+    def send_messages(self, messages):
+        if len(mail.outbox) >= self.crash_after:
+            raise Crash()
+        return super().send_messages(messages)
+
+
+class ReminderRunTests(TestCase):
+    def setUp(self):
+        # Default profile: UTC, reminder_hour 9, so send_hour 9
+        self.users = [
+            User.objects.create_user(f'user{n}', f'user{n}@example.com', 'pw-12345678') for n in range(5)
+        ]
+
+    def dispatch(self, connection=None):
+        return dispatch_reminders(send_hour=9, run_date=RUN_DATE, batch_size=2, connection=connection)
+
+    def recipients(self):
+        return [message.to[0] for message in mail.outbox]
+
+    def test_sends_each_due_user_once_and_skips_checked_in(self):
+        challenge = Challenge.objects.create(name='100 Days of Code', slug='100-days', hashtag='#100DaysOfCode')
+        record_check_in(self.users[1], challenge, RUN_DATE)
+
+        run = self.dispatch()
+
+        self.assertEqual((run.status, run.sent, run.skipped, run.failed), (ReminderRun.STATUS_COMPLETED, 4, 1, 0))
+        self.assertNotIn('user1@example.com', self.recipients())
+        self.assertIsNone(self.dispatch())
+
+    def test_interrupted_run_resumes_from_its_cursor(self):
+        with self.assertRaises(Crash):
+            self.dispatch(connection=CrashingBackend(crash_after=2))
+
+        run = ReminderRun.objects.get()
+        self.assertEqual(run.status, ReminderRun.STATUS_RUNNING)
+        self.assertEqual(run.last_profile_id, self.users[1].profile.pk)
+        self.assertEqual(run.sent, 2)
+
+        run = self.dispatch()
+
+        self.assertEqual(run.status, ReminderRun.STATUS_COMPLETED)
+        self.assertEqual(run.sent, 5)
+        self.assertEqual(self.recipients(), [user.email for user in self.users])
+
+    def test_only_the_batch_in_flight_is_sent_twice(self):
+        with self.assertRaises(Crash):
+            self.dispatch(connection=CrashingBackend(crash_after=3))
+
+        self.dispatch()
+
+        recipients = self.recipients()
+        self.assertEqual(recipients.count('user2@example.com'), 2)
+        self.assertEqual(sorted(set(recipients)), [user.email for user in self.users])
+        self.assertEqual(len(recipients), 6)